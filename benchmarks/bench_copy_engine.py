@@ -0,0 +1,112 @@
+import argparse
+import io
+import os
+import sys
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.utilities.dbConnection import DatabaseConnection, DbConstants
+
+COLUMNS = ["id", "amount", "amount_type", "account_id", "transaction_date"]
+DTYPES = {"id": "int64", "amount": "float64", "amount_type": "object", "account_id": "object"}
+BENCH_TABLE = "bench_copy_amounts"
+
+
+def timed(function, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def bench_postgres(rows, repeat):
+    database_config = {
+        "user": os.environ[DbConstants.PSQL_USER],
+        "password": os.environ[DbConstants.PSQL_PWD],
+        "host": os.environ[DbConstants.PSQL_HOST],
+        "port": os.environ[DbConstants.PSQL_PORT],
+        "database": os.environ[DbConstants.PSQL_DATABASE]
+    }
+    db_connection = DatabaseConnection(database_config)
+
+    connection = db_connection._connect()
+    cursor = connection.cursor()
+    cursor.execute(f"DROP TABLE IF EXISTS {BENCH_TABLE};")
+    cursor.execute(f"""CREATE UNLOGGED TABLE {BENCH_TABLE} AS
+                       SELECT i AS id,
+                              (random() * 10000)::numeric(18, 2) AS amount,
+                              (ARRAY['debit', 'credit'])[1 + i % 2] AS amount_type,
+                              'account_' || (i % 500) AS account_id,
+                              DATE '2020-01-01' + (i % 365) AS transaction_date
+                       FROM generate_series(1, {rows}) AS i;""")
+    connection.commit()
+
+    query = f"SELECT {', '.join(COLUMNS)} FROM {BENCH_TABLE};"
+    try:
+        fetchall_time, _ = timed(lambda: db_connection.execute_queries([query]), repeat)
+        copy_time, _ = timed(lambda: db_connection.execute_query_copy(query, dtypes=DTYPES, parse_dates=["transaction_date"]), repeat)
+        arrow_time, _ = timed(lambda: db_connection.execute_query_arrow_frame(query), repeat)
+    finally:
+        cursor.execute(f"DROP TABLE IF EXISTS {BENCH_TABLE};")
+        connection.commit()
+        connection.close()
+
+    return fetchall_time, copy_time, arrow_time
+
+
+def bench_in_process(rows, repeat):
+    random_state = np.random.RandomState(0)
+    amounts = random_state.uniform(0, 10000, rows).round(2)
+    first_date = date(2020, 1, 1)
+    records = [(i, Decimal(str(amounts[i])), "debit" if i % 2 else "credit", f"account_{i % 500}",
+                first_date + timedelta(days=i % 365)) for i in range(rows)]
+
+    csv_buffer = io.BytesIO()
+    pd.DataFrame(records, columns=COLUMNS).to_csv(csv_buffer, index=False)
+    csv_bytes = csv_buffer.getvalue()
+
+    def fetchall_to_frame():
+        df = pd.DataFrame(records, columns=COLUMNS).set_index("id")
+        df["amount"] = df["amount"].astype("float64")
+        df["transaction_date"] = pd.to_datetime(df["transaction_date"])
+        return df
+
+    # Row decoding by psycopg2 is not part of this mode, so it understates the fetchall cost.
+    fetchall_time, _ = timed(fetchall_to_frame, repeat)
+    copy_time, _ = timed(lambda: pd.read_csv(io.BytesIO(csv_bytes), dtype=DTYPES, parse_dates=["transaction_date"],
+                                             keep_default_na=False, na_values=[""]).set_index("id"), repeat)
+
+    from pyarrow import csv
+    arrow_time, _ = timed(lambda: DatabaseConnection.arrow_to_frame(csv.read_csv(io.BytesIO(csv_bytes))), repeat)
+
+    return fetchall_time, copy_time, arrow_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the fetchall, COPY and Arrow fetch engines.")
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--in-process", action="store_true",
+                        help="Only time the client-side conversion, without a Postgres server.")
+    args = parser.parse_args()
+
+    use_postgres = not args.in_process and DbConstants.PSQL_HOST in os.environ
+    bench = bench_postgres if use_postgres else bench_in_process
+    fetchall_time, copy_time, arrow_time = bench(args.rows, args.repeat)
+
+    print(f"mode: {'postgres' if use_postgres else 'in-process'}, rows: {args.rows}")
+    print(f"fetchall: {fetchall_time:.3f}s")
+    print(f"copy:     {copy_time:.3f}s ({fetchall_time / copy_time:.1f}x)")
+    print(f"arrow:    {arrow_time:.3f}s ({fetchall_time / arrow_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from benchmarks.synthetic_data import TENANT_ID, drop_from_postgres, generate_dataset, load_into_postgres
+from src.data.dataHelpers import DataHelper, OverlapModes
+from src.data.referenceCache import NoReferenceCache
+from src.utilities.dbConnection import DatabaseConnection, DbConstants
+
+DEFAULT_SCALES = "10000,100000,1000000"
+ENV_CONFIG_KEYS = [DbConstants.PSQL_USER, DbConstants.PSQL_PWD, DbConstants.PSQL_HOST, DbConstants.PSQL_PORT,
+                   DbConstants.PSQL_DATABASE]
+
+
+# Answers the DataHelper queries from the synthetic tables, so only client-side costs are timed.
+class InProcessDatabase:
+    def __init__(self, dataset):
+        self.pool = None
+        self.observers = []
+        self.dataset = {table: df.set_index("id") for table, df in dataset.items()}
+
+        amounts = dataset["accounting_amounts"]
+        accounts = self.dataset["accounting_accounts"]
+        entries = self.dataset["accounting_entries"]
+        self.amount_rows = pd.DataFrame({"id": amounts["id"],
+                                         "tenant_id": amounts["tenant_id"],
+                                         "amount": amounts["amount"],
+                                         "amount_description": amounts["description"],
+                                         "amount_type": amounts["type"],
+                                         "account_id": amounts["account_id"],
+                                         "account_description": accounts["name"].reindex(amounts["account_id"]).to_numpy(),
+                                         "account_currency": accounts["currency"].reindex(amounts["account_id"]).to_numpy(),
+                                         "transaction_id": amounts["entry_id"],
+                                         "transaction_context": entries["context"].reindex(amounts["entry_id"]).to_numpy(),
+                                         "transaction_date": entries["date"].reindex(amounts["entry_id"]).to_numpy(),
+                                         "transaction_external_date": entries["external_created_at"].reindex(amounts["entry_id"]).to_numpy(),
+                                         "transaction_discarded_at": entries["discarded_at"].reindex(amounts["entry_id"]).to_numpy()})
+        self.amount_dates = pd.to_datetime(self.amount_rows["transaction_date"]).to_numpy()
+
+    def execute_queries(self, queries, id_column="id"):
+        return [self._answer(*DatabaseConnection._split_query(query)) for query in queries]
+
+    def execute_batch(self, queries, id_column="id", columns=None, parse_dates=None):
+        return self.execute_queries(queries, id_column)
+
+    def execute_query(self, query, id_column="id", engine=None, **engine_options):
+        return self.execute_queries([query], id_column)[0]
+
+    def close(self):
+        pass
+
+    def _answer(self, query, params):
+        query_text = query if isinstance(query, str) else query.as_string(None)
+        params = params or {}
+
+        if "FROM accounting_amounts" in query_text:
+            return self._answer_amounts(query_text, params)
+        if "FROM engagements" in query_text:
+            engagement_ids = (self._parse_array(params["engagement_ids"]) if "engagement_ids" in params
+                              else [params["engagement_id"]])
+            return self.dataset["engagements"].loc[engagement_ids].copy()
+        if "FROM organizations" in query_text:
+            return self.dataset["organizations"].loc[[params["organization_id"]]].copy()
+        if "FROM account_mappings" in query_text:
+            account_mappings = self.dataset["account_mappings"]
+            return account_mappings[account_mappings["engagement_id"] == params["engagement_id"]][["account_id", "fsli_id"]].copy()
+        if "FROM accounting_fslis" in query_text:
+            return self.dataset["accounting_fslis"].copy()
+
+        raise ValueError(f"The in-process database cannot answer: {query_text}")
+
+    def _answer_amounts(self, query_text, params):
+        amount_rows = self.amount_rows[self.amount_rows["tenant_id"] == params["tenant_id"]]
+        amount_dates = self.amount_dates[(self.amount_rows["tenant_id"] == params["tenant_id"]).to_numpy()]
+
+        if "unnest(" in query_text and "engagement_ids" in params:
+            periods = zip(self._parse_array(params["engagement_ids"]), self._parse_array(params["period_starts"]),
+                          self._parse_array(params["period_ends"]))
+            engagement_rows = []
+            for engagement_id, period_start, period_end in periods:
+                in_period = (amount_dates >= np.datetime64(period_start)) & (amount_dates <= np.datetime64(period_end))
+                engagement_rows.append(amount_rows[in_period].assign(engagement_id=engagement_id))
+            amount_rows = pd.concat(engagement_rows)
+        elif "range_starts" in params:
+            in_ranges = np.zeros(len(amount_rows), dtype=bool)
+            for range_start, range_end in zip(self._parse_array(params["range_starts"]), self._parse_array(params["range_ends"])):
+                in_ranges |= (amount_dates >= np.datetime64(range_start)) & (amount_dates <= np.datetime64(range_end))
+            amount_rows = amount_rows[in_ranges]
+        elif "period_start" in params:
+            in_period = ((amount_dates >= np.datetime64(params["period_start"]))
+                         & (amount_dates <= np.datetime64(params["period_end"])))
+            amount_rows = amount_rows[in_period]
+
+        return amount_rows.drop(columns="tenant_id").set_index("id")
+
+    @staticmethod
+    def _parse_array(array_parameter):
+        return [value.strip('"') for value in array_parameter.strip("{}").split(",")] if array_parameter != "{}" else []
+
+
+def timed(function, repeat, setup=None):
+    timings = []
+    for _ in range(repeat):
+        arguments = setup() if setup is not None else ()
+        start = time.perf_counter()
+        function(*arguments)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def make_postgres_data_helper(dataset, schema):
+    os.environ["PGOPTIONS"] = f"-c search_path={schema},public"
+    data_helper = DataHelper(reference_cache=NoReferenceCache())
+    connection = data_helper.db_connection._connect()
+    try:
+        load_into_postgres(connection, dataset, schema)
+    finally:
+        connection.close()
+    return data_helper
+
+
+def make_in_process_data_helper(dataset):
+    for key in ENV_CONFIG_KEYS:
+        os.environ.setdefault(key, "in-process")
+    data_helper = DataHelper(reference_cache=NoReferenceCache())
+    data_helper.db_connection = InProcessDatabase(dataset)
+    return data_helper
+
+
+def run_scale(data_helper, dataset, repeat, use_postgres):
+    engagement_ids = dataset["engagements"]["id"].tolist()
+    engagement_id = engagement_ids[0]
+    amounts_df = data_helper.get_amount_table(TENANT_ID, engagement_ids)
+    engagement_amounts_df = data_helper.get_amount_table(TENANT_ID, [engagement_id])
+
+    benchmarks = {
+        "get_amount_table": timed(lambda: data_helper.get_amount_table(TENANT_ID, engagement_ids), repeat),
+        "get_amount_table_deduplicated": timed(
+            lambda: data_helper.get_amount_table(TENANT_ID, engagement_ids, overlap=OverlapModes.DEDUPLICATE), repeat),
+        "add_date_info": timed(lambda df: data_helper.add_date_info(df, "transaction_date"), repeat,
+                               setup=lambda: (amounts_df.copy(),)),
+        "make_fsli_mappings": timed(lambda df: data_helper.make_fsli_mappings(df, engagement_id, unmapped="keep"), repeat,
+                                    setup=lambda: (engagement_amounts_df.copy(),)),
+        "get_flipping_id_amounts": timed(lambda: data_helper.get_flipping_id_amounts(engagement_amounts_df, engagement_id), repeat),
+    }
+    if use_postgres:
+        benchmarks["get_fsli_amount_table"] = timed(
+            lambda: data_helper.get_fsli_amount_table(TENANT_ID, engagement_id, unmapped="keep"), repeat)
+        benchmarks["get_flipping_amount_table"] = timed(
+            lambda: data_helper.get_flipping_amount_table(TENANT_ID, engagement_id), repeat)
+
+    return {name: {"min": min(timings), "median": statistics.median(timings), "max": max(timings), "timings": timings,
+                   "result_rows": len(amounts_df) if name in ("get_amount_table", "get_amount_table_deduplicated", "add_date_info") else len(engagement_amounts_df)}
+            for name, timings in benchmarks.items()}
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=os.path.dirname(os.path.abspath(__file__)),
+                                       stderr=subprocess.DEVNULL).decode("utf-8").strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare_with_baseline(results, baseline_path, tolerance):
+    with open(baseline_path) as baseline_file:
+        baseline = json.load(baseline_file)
+
+    baseline_timings = {(entry["benchmark"], entry["rows"]): entry["median"] for entry in baseline["results"]}
+    regressions = []
+    for entry in results:
+        baseline_median = baseline_timings.get((entry["benchmark"], entry["rows"]))
+        if baseline_median is None or baseline_median == 0:
+            continue
+
+        ratio = entry["median"] / baseline_median
+        print(f"{entry['benchmark']:>30} {entry['rows']:>9} rows: {ratio:.2f}x baseline")
+        if ratio > 1 + tolerance:
+            regressions.append(entry)
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the DataHelper hot paths on synthetic data.")
+    parser.add_argument("--scales", default=DEFAULT_SCALES, help="Comma separated accounting_amounts row counts (10000 to 10000000).")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--in-process", action="store_true", help="Answer queries in memory instead of using Postgres.")
+    parser.add_argument("--output", default="bench_data_helpers.json", help="Where to write the JSON results.")
+    parser.add_argument("--baseline", help="JSON results of a previous run to compare against.")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed median slowdown against the baseline.")
+    args = parser.parse_args()
+
+    use_postgres = not args.in_process and DbConstants.PSQL_HOST in os.environ
+    results = []
+    for rows in [int(scale) for scale in args.scales.split(",")]:
+        dataset = generate_dataset(rows, seed=args.seed)
+        if use_postgres:
+            schema = f"bench_{uuid.uuid4().hex[:8]}"
+            data_helper = make_postgres_data_helper(dataset, schema)
+        else:
+            data_helper = make_in_process_data_helper(dataset)
+
+        try:
+            scale_results = run_scale(data_helper, dataset, args.repeat, use_postgres)
+        finally:
+            if use_postgres:
+                connection = data_helper.db_connection._connect()
+                drop_from_postgres(connection, schema)
+                connection.close()
+            data_helper.db_connection.close()
+
+        for name, timings in scale_results.items():
+            results.append({"benchmark": name, "rows": rows, **timings})
+            print(f"{name:>30} {rows:>9} rows: median {timings['median']:.4f}s (min {timings['min']:.4f}s)")
+
+    report = {"created_at": datetime.now(timezone.utc).isoformat(),
+              "git_revision": git_revision(),
+              "mode": "postgres" if use_postgres else "in-process",
+              "repeat": args.repeat,
+              "seed": args.seed,
+              "python": platform.python_version(),
+              "pandas": pd.__version__,
+              "numpy": np.__version__,
+              "results": results}
+    with open(args.output, "w") as output_file:
+        json.dump(report, output_file, indent=2)
+
+    if args.baseline is not None:
+        regressions = compare_with_baseline(results, args.baseline, args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} benchmark(s) regressed by more than {args.tolerance:.0%}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from benchmarks.bench_data_helpers import ENV_CONFIG_KEYS, git_revision
+from src.utilities.dbConnection import DbConstants
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Runs in a fresh interpreter so every module import is paid again. In-process mode loads pandas while building the
+# stand-in database, so its import cost shows up in in_process_setup rather than first_query.
+STARTUP_PROBE = """
+import json, os, sys, time
+started_at = time.perf_counter()
+from src.data.dataHelpers import DataHelper
+imported_at = time.perf_counter()
+heavy_modules = sorted(name for name in ("pandas", "numpy", "pyarrow") if name in sys.modules)
+data_helper = DataHelper()
+constructed_at = time.perf_counter()
+if os.environ.get("BENCH_STARTUP_IN_PROCESS"):
+    from benchmarks.bench_data_helpers import InProcessDatabase
+    from benchmarks.synthetic_data import TENANT_ID, generate_dataset
+    dataset = generate_dataset(1000)
+    data_helper.db_connection = InProcessDatabase(dataset)
+    engagement_ids = dataset["engagements"]["id"].tolist()[:1]
+    setup_time = time.perf_counter() - constructed_at
+else:
+    from benchmarks.synthetic_data import TENANT_ID
+    engagement_ids = None
+    setup_time = 0.0
+query_started_at = time.perf_counter()
+data_helper.get_amount_table(TENANT_ID, engagement_ids)
+finished_at = time.perf_counter()
+print(json.dumps({"import": imported_at - started_at,
+                  "construct": constructed_at - imported_at,
+                  "first_query": finished_at - query_started_at,
+                  "in_process_setup": setup_time,
+                  "total": finished_at - started_at,
+                  "heavy_modules_after_import": heavy_modules}))
+"""
+
+
+def run_probe(in_process):
+    environment = dict(os.environ)
+    if in_process:
+        environment["BENCH_STARTUP_IN_PROCESS"] = "1"
+        for key in ENV_CONFIG_KEYS:
+            environment.setdefault(key, "in-process")
+
+    output = subprocess.check_output([sys.executable, "-c", STARTUP_PROBE], cwd=REPO_ROOT, env=environment)
+    return json.loads(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time a cold import of the data package and its first query.")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--in-process", action="store_true", help="Answer the first query in memory instead of using Postgres.")
+    parser.add_argument("--output", default="bench_startup.json", help="Where to write the JSON results.")
+    args = parser.parse_args()
+
+    in_process = args.in_process or DbConstants.PSQL_HOST not in os.environ
+    runs = [run_probe(in_process) for _ in range(args.repeat)]
+
+    results = {}
+    for phase in ("import", "construct", "in_process_setup", "first_query", "total"):
+        timings = [run[phase] for run in runs]
+        results[phase] = {"min": min(timings), "median": statistics.median(timings), "max": max(timings), "timings": timings}
+        print(f"{phase:>16}: median {results[phase]['median']:.4f}s (min {results[phase]['min']:.4f}s)")
+
+    report = {"created_at": datetime.now(timezone.utc).isoformat(),
+              "git_revision": git_revision(),
+              "mode": "in-process" if in_process else "postgres",
+              "repeat": args.repeat,
+              "python": platform.python_version(),
+              "heavy_modules_after_import": runs[0]["heavy_modules_after_import"],
+              "results": results}
+    with open(args.output, "w") as output_file:
+        json.dump(report, output_file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
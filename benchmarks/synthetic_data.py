@@ -0,0 +1,127 @@
+import io
+
+import numpy as np
+import pandas as pd
+
+TENANT_ID = "bench_tenant"
+ORGANIZATION_ID = "bench_organization"
+FIRST_YEAR = 2019
+ENGAGEMENT_YEARS = 4
+FSLI_COUNT = 200
+FLIPPING_FSLI_SHARE = 0.2
+DISCARDED_ENTRY_SHARE = 0.01
+
+TABLE_SCHEMAS = {
+    "organizations": """id text PRIMARY KEY, financial_year_end_day integer, financial_year_end_month integer,
+                        business_type text""",
+    "engagements": """id text PRIMARY KEY, period_start date, period_end date, type text, organization_id text,
+                      multi_currency boolean, tax_services boolean, materiality numeric(18, 2)""",
+    "accounting_fslis": "id text PRIMARY KEY, reverse_fsli_id text",
+    "accounting_accounts": "id text PRIMARY KEY, tenant_id text, name text, currency text",
+    "account_mappings": "id text PRIMARY KEY, engagement_id text, account_id text, fsli_id text",
+    "accounting_entries": """id text PRIMARY KEY, tenant_id text, date date, context text, external_created_at timestamptz,
+                             discarded_at timestamptz""",
+    "accounting_amounts": """id text PRIMARY KEY, tenant_id text, entry_id text, account_id text, amount numeric(18, 2),
+                             description text, type text""",
+}
+TABLE_INDEXES = {
+    "account_mappings": ["engagement_id"],
+    "accounting_entries": ["tenant_id, date"],
+    "accounting_amounts": ["tenant_id", "entry_id", "account_id"],
+}
+
+
+def _ids(prefix, count):
+    return prefix + pd.Series(np.arange(count)).astype(str)
+
+
+def generate_dataset(amount_rows, seed=0) -> dict:
+    random_state = np.random.RandomState(seed)
+    account_count = int(min(5000, max(50, amount_rows // 2000)))
+    entry_count = max(1, amount_rows // 2)
+
+    engagement_starts = pd.to_datetime([f"{FIRST_YEAR + year}-01-01" for year in range(ENGAGEMENT_YEARS)])
+    engagements = pd.DataFrame({"id": _ids("engagement_", ENGAGEMENT_YEARS),
+                                "period_start": engagement_starts.date,
+                                "period_end": (engagement_starts + pd.offsets.YearEnd(0)).date,
+                                "type": "audit",
+                                "organization_id": ORGANIZATION_ID,
+                                "multi_currency": False,
+                                "tax_services": False,
+                                "materiality": 10000.0})
+    organizations = pd.DataFrame({"id": [ORGANIZATION_ID], "financial_year_end_day": [31], "financial_year_end_month": [3],
+                                  "business_type": ["retail"]})
+
+    fsli_ids = _ids("fsli_", FSLI_COUNT)
+    flipping = random_state.rand(FSLI_COUNT) < FLIPPING_FSLI_SHARE
+    reverse_fsli_ids = fsli_ids.sample(frac=1, random_state=random_state).to_numpy()
+    accounting_fslis = pd.DataFrame({"id": fsli_ids, "reverse_fsli_id": np.where(flipping, reverse_fsli_ids, None)})
+
+    account_ids = _ids("account_", account_count)
+    accounting_accounts = pd.DataFrame({"id": account_ids,
+                                        "tenant_id": TENANT_ID,
+                                        "name": "Account " + account_ids,
+                                        "currency": random_state.choice(["EUR", "USD", "GBP"], account_count, p=[0.8, 0.15, 0.05])})
+
+    account_mappings = pd.DataFrame({"id": _ids("mapping_", account_count * ENGAGEMENT_YEARS),
+                                     "engagement_id": np.repeat(engagements["id"].to_numpy(), account_count),
+                                     "account_id": np.tile(account_ids.to_numpy(), ENGAGEMENT_YEARS),
+                                     "fsli_id": random_state.choice(fsli_ids.to_numpy(), account_count * ENGAGEMENT_YEARS)})
+
+    first_day = pd.Timestamp(f"{FIRST_YEAR}-01-01")
+    day_count = (pd.Timestamp(f"{FIRST_YEAR + ENGAGEMENT_YEARS}-01-01") - first_day).days
+    entry_dates = first_day + pd.to_timedelta(random_state.randint(0, day_count, entry_count), unit="D")
+    external_created_at = (entry_dates + pd.to_timedelta(random_state.randint(0, 72 * 3600, entry_count), unit="s")).tz_localize("UTC")
+    discarded = random_state.rand(entry_count) < DISCARDED_ENTRY_SHARE
+    accounting_entries = pd.DataFrame({"id": _ids("entry_", entry_count),
+                                       "tenant_id": TENANT_ID,
+                                       "date": entry_dates.date,
+                                       "context": random_state.choice(["manual", "import", "bank"], entry_count),
+                                       "external_created_at": external_created_at,
+                                       "discarded_at": pd.Series(external_created_at).where(discarded)})
+
+    accounting_amounts = pd.DataFrame({"id": _ids("amount_", amount_rows),
+                                       "tenant_id": TENANT_ID,
+                                       "entry_id": "entry_" + pd.Series(random_state.randint(0, entry_count, amount_rows)).astype(str),
+                                       "account_id": account_ids.to_numpy()[random_state.randint(0, account_count, amount_rows)],
+                                       "amount": random_state.uniform(-10000, 10000, amount_rows).round(2),
+                                       "description": "Line " + pd.Series(random_state.randint(0, 1000, amount_rows)).astype(str),
+                                       "type": random_state.choice(["debit", "credit"], amount_rows)})
+
+    return {"organizations": organizations,
+            "engagements": engagements,
+            "accounting_fslis": accounting_fslis,
+            "accounting_accounts": accounting_accounts,
+            "account_mappings": account_mappings,
+            "accounting_entries": accounting_entries,
+            "accounting_amounts": accounting_amounts}
+
+
+def load_into_postgres(connection, dataset, schema, chunk_rows=500000):
+    cursor = connection.cursor()
+    cursor.execute(f"DROP SCHEMA IF EXISTS {schema} CASCADE;")
+    cursor.execute(f"CREATE SCHEMA {schema};")
+
+    for table, columns in TABLE_SCHEMAS.items():
+        cursor.execute(f"CREATE UNLOGGED TABLE {schema}.{table} ({columns});")
+
+        df = dataset[table]
+        for start in range(0, len(df), chunk_rows):
+            csv_buffer = io.StringIO()
+            df.iloc[start:start + chunk_rows].to_csv(csv_buffer, index=False, header=False)
+            csv_buffer.seek(0)
+            cursor.copy_expert(f"COPY {schema}.{table} ({', '.join(df.columns)}) FROM STDIN WITH (FORMAT csv)", csv_buffer)
+
+        for index_columns in TABLE_INDEXES.get(table, []):
+            cursor.execute(f"CREATE INDEX ON {schema}.{table} ({index_columns});")
+        cursor.execute(f"ANALYZE {schema}.{table};")
+
+    connection.commit()
+    cursor.close()
+
+
+def drop_from_postgres(connection, schema):
+    cursor = connection.cursor()
+    cursor.execute(f"DROP SCHEMA IF EXISTS {schema} CASCADE;")
+    connection.commit()
+    cursor.close()
@@ -0,0 +1,173 @@
+from typing import List
+
+from ..data.amountSchema import AmountSchema
+from ..data.dataHelpers import DataHelper, UnmappedAccountError, UnmappedAccounts
+from src.utilities.dbConnection import FetchEngine
+from src.utilities.lazyImport import lazy_import
+
+pd = lazy_import("pandas")
+
+
+class PipelineSteps:
+    MAP_FSLIS="map_fslis"
+    ADD_DATE_INFO="add_date_info"
+    FLIPPING_ONLY="flipping_only"
+    SELECT="select"
+
+
+def select_alias(select: str) -> str:
+    return select.split()[-1].split(".")[-1]
+
+
+class AmountPlan:
+    def __init__(self, selects: List[str], output_columns: List[str], date_steps: List[dict], unmapped: str = None,
+                 flipping_only: bool = False, raise_unmapped: bool = False):
+        self.selects = selects
+        self.output_columns = output_columns
+        self.date_steps = date_steps
+        self.unmapped = unmapped
+        self.flipping_only = flipping_only
+        self.raise_unmapped = raise_unmapped
+
+    @property
+    def columns(self) -> List[str]:
+        return [select_alias(select) for select in self.selects]
+
+    @property
+    def fiscal(self) -> bool:
+        return any(part in DataHelper.FISCAL_DATE_PARTS for date_step in self.date_steps for part in date_step["parts"])
+
+    def to_dict(self) -> dict:
+        return {"columns": self.columns,
+                "output_columns": self.output_columns,
+                "date_steps": self.date_steps,
+                "unmapped": self.unmapped,
+                "flipping_only": self.flipping_only,
+                "raise_unmapped": self.raise_unmapped}
+
+
+# Records amount transformations without running them; collect() optimizes the whole chain into a single query.
+class AmountPipeline:
+    FLIPPING_OR_UNMAPPED_CONSTRAINT = "(fsli_mappings.reverse_fsli_id IS NOT NULL OR fsli_mappings.account_id IS NULL)"
+
+    def __init__(self, data_helper: DataHelper, tenant_id: str, engagement_id: str, steps: tuple = ()):
+        self.data_helper = data_helper
+        self.tenant_id = tenant_id
+        self.engagement_id = engagement_id
+        self.steps = tuple(steps)
+
+    def map_fslis(self, unmapped: str = UnmappedAccounts.RAISE) -> "AmountPipeline":
+        if unmapped not in (UnmappedAccounts.RAISE, UnmappedAccounts.KEEP, UnmappedAccounts.DROP):
+            raise ValueError(f"Unknown unmapped accounts policy: {unmapped}")
+
+        return self._then(PipelineSteps.MAP_FSLIS, {"unmapped": unmapped})
+
+    def add_date_info(self, date_column: str = "transaction_date", parts: List[str] = None,
+                      fiscal: bool = False) -> "AmountPipeline":
+        if parts is None:
+            parts = DataHelper.DEFAULT_DATE_PARTS + (DataHelper.FISCAL_DATE_PARTS if fiscal else [])
+
+        unknown_parts = set(parts) - set(DataHelper.DATE_PART_DTYPES)
+        if unknown_parts:
+            raise ValueError(f"Unknown date parts: {sorted(unknown_parts)}")
+
+        if any(part in DataHelper.FISCAL_DATE_PARTS for part in parts) and not fiscal:
+            raise ValueError("Fiscal date parts require fiscal=True")
+
+        return self._then(PipelineSteps.ADD_DATE_INFO, {"date_column": date_column, "parts": list(parts)})
+
+    def flipping_only(self) -> "AmountPipeline":
+        return self._then(PipelineSteps.FLIPPING_ONLY, {})
+
+    def select(self, columns: List[str]) -> "AmountPipeline":
+        return self._then(PipelineSteps.SELECT, {"columns": list(columns)})
+
+    def plan(self) -> AmountPlan:
+        columns = [select_alias(select) for select in DataHelper.AMOUNT_SELECTS if select_alias(select) != "id"]
+        unmapped = None
+        flipping_only = False
+        raise_unmapped = False
+        date_steps = []
+
+        for step, options in self.steps:
+            if step == PipelineSteps.MAP_FSLIS:
+                if unmapped is not None:
+                    raise ValueError("FSLI mappings can only be applied once per pipeline")
+                unmapped = options["unmapped"]
+                # Flipping amounts filtered before the mapping are all mapped, so there is nothing left to raise on.
+                raise_unmapped = unmapped == UnmappedAccounts.RAISE and not flipping_only
+                columns.append("fsli_id")
+            elif step == PipelineSteps.ADD_DATE_INFO:
+                if options["date_column"] not in columns:
+                    raise KeyError(f"Unknown date column: {options['date_column']}")
+                date_steps.append(options)
+                part_columns = [f"{options['date_column']}_{part}" for part in options["parts"]]
+                columns.extend(column for column in part_columns if column not in columns)
+            elif step == PipelineSteps.FLIPPING_ONLY:
+                flipping_only = True
+            elif step == PipelineSteps.SELECT:
+                missing_columns = [column for column in options["columns"] if column not in columns]
+                if missing_columns:
+                    raise KeyError(f"Unknown amount columns: {missing_columns}")
+                columns = options["columns"]
+
+        # Date parts nobody reads are skipped, and only the amount columns still needed are fetched.
+        needed_date_steps = []
+        for date_step in date_steps:
+            parts = [part for part in date_step["parts"] if f"{date_step['date_column']}_{part}" in columns]
+            if parts:
+                needed_date_steps.append({"date_column": date_step["date_column"], "parts": parts})
+
+        amount_columns = set(columns) | {date_step["date_column"] for date_step in needed_date_steps} | {"id"}
+        if raise_unmapped:
+            amount_columns.add("account_id")
+        selects = [select for select in DataHelper.AMOUNT_SELECTS if select_alias(select) in amount_columns]
+        if unmapped is not None and "fsli_id" in columns:
+            selects.append(self._fsli_mapping_select("fsli_id"))
+        if raise_unmapped:
+            selects.append(self._fsli_mapping_select("mapped_account_id"))
+
+        return AmountPlan(selects, list(columns), needed_date_steps, unmapped, flipping_only, raise_unmapped)
+
+    def explain(self) -> dict:
+        return self.plan().to_dict()
+
+    def collect(self, engine: str = FetchEngine.FETCHALL, schema: AmountSchema = None) -> "pd.DataFrame":
+        plan = self.plan()
+        amounts_df = self.data_helper._execute_amount_query(self._build_query(plan), engine, schema, plan.columns)
+
+        if plan.raise_unmapped:
+            unmapped_mask = amounts_df.pop("mapped_account_id").isna().to_numpy()
+            if unmapped_mask.any():
+                raise UnmappedAccountError(pd.unique(amounts_df["account_id"].to_numpy()[unmapped_mask]).tolist())
+
+        organization_info = self.data_helper.get_engagement_context(self.engagement_id)[1] if plan.fiscal else None
+        for date_step in plan.date_steps:
+            amounts_df = DataHelper.add_date_info(amounts_df, date_step["date_column"], date_step["parts"], organization_info)
+
+        return amounts_df[plan.output_columns]
+
+    def _build_query(self, plan: AmountPlan) -> tuple:
+        if plan.unmapped is None and not plan.flipping_only:
+            engagement_info = self.data_helper.get_engagement_info(self.engagement_id)
+            engagement_dates = (engagement_info["period_start"].strftime("%Y-%m-%d"),
+                                engagement_info["period_end"].strftime("%Y-%m-%d"))
+            return self.data_helper._build_engagement_amounts_query(self.tenant_id, engagement_dates, selects=plan.selects)
+
+        mapped_only = plan.flipping_only or plan.unmapped == UnmappedAccounts.DROP
+        flipping_only = plan.flipping_only
+        extra_constraints = []
+        if plan.flipping_only and plan.raise_unmapped:
+            # Unmapped rows still have to come back so they raise like make_fsli_mappings would.
+            mapped_only, flipping_only = False, False
+            extra_constraints.append(self.FLIPPING_OR_UNMAPPED_CONSTRAINT)
+
+        return self.data_helper._build_fsli_amounts_query(self.tenant_id, self.engagement_id, mapped_only, flipping_only,
+                                                          plan.selects, extra_constraints)
+
+    def _then(self, step: str, options: dict) -> "AmountPipeline":
+        return AmountPipeline(self.data_helper, self.tenant_id, self.engagement_id, self.steps + ((step, options),))
+
+    @staticmethod
+    def _fsli_mapping_select(alias: str) -> str:
+        return next(select for select in DataHelper.FSLI_MAPPING_SELECTS if select_alias(select) == alias)
@@ -0,0 +1,108 @@
+from decimal import Decimal, ROUND_HALF_UP
+from typing import List
+
+from src.utilities.lazyImport import lazy_import
+
+pd = lazy_import("pandas")
+
+
+class AmountTypes:
+    FLOAT="float64"
+    SCALED_INT="scaled_int64"
+
+
+class AmountSchema:
+    CATEGORY_COLUMNS = ["amount_type", "account_id", "account_currency", "transaction_context"]
+    AMOUNT_COLUMN = "amount"
+    DATE_COLUMNS = ["transaction_date", "transaction_external_date", "transaction_discarded_at"]
+
+    def __init__(self, amount_type: str = AmountTypes.FLOAT, amount_scale: int = 2, category_columns: List[str] = None,
+                 date_columns: List[str] = None):
+        if amount_type not in (AmountTypes.FLOAT, AmountTypes.SCALED_INT):
+            raise ValueError(f"Unknown amount type: {amount_type}")
+
+        self.amount_type = amount_type
+        self.amount_scale = amount_scale
+        self.category_columns = category_columns if category_columns is not None else list(self.CATEGORY_COLUMNS)
+        self.date_columns = date_columns if date_columns is not None else list(self.DATE_COLUMNS)
+
+    def apply(self, amounts_df: "pd.DataFrame") -> "pd.DataFrame":
+        columns = {}
+
+        for column in self.category_columns:
+            if column in amounts_df.columns and not isinstance(amounts_df[column].dtype, pd.CategoricalDtype):
+                columns[column] = amounts_df[column].astype("category")
+
+        if self.AMOUNT_COLUMN in amounts_df.columns:
+            columns[self.AMOUNT_COLUMN] = self._convert_amounts(amounts_df[self.AMOUNT_COLUMN])
+
+        for column in self.date_columns:
+            if column in amounts_df.columns and not pd.api.types.is_datetime64_any_dtype(amounts_df[column]):
+                columns[column] = pd.to_datetime(amounts_df[column], utc=self._is_tz_aware(amounts_df[column]))
+
+        if not columns:
+            return amounts_df
+
+        return amounts_df.assign(**columns)
+
+    def copy_dtypes(self, dtypes: dict) -> dict:
+        copy_dtypes = {**dtypes, **{column: "category" for column in self.category_columns}}
+        if self.amount_type == AmountTypes.SCALED_INT and self.AMOUNT_COLUMN in copy_dtypes:
+            # Read the amount text as is so it is scaled exactly instead of going through float64.
+            copy_dtypes[self.AMOUNT_COLUMN] = "object"
+
+        return copy_dtypes
+
+    def to_amount(self, amounts: "pd.Series") -> "pd.Series":
+        if self.amount_type == AmountTypes.FLOAT:
+            return amounts
+
+        return amounts / 10 ** self.amount_scale
+
+    def _convert_amounts(self, amounts: "pd.Series") -> "pd.Series":
+        if self.amount_type == AmountTypes.FLOAT:
+            return amounts if amounts.dtype == "float64" else amounts.astype("float64")
+
+        if pd.api.types.is_integer_dtype(amounts):
+            return amounts
+
+        scale = Decimal(10) ** self.amount_scale
+        scaled_amounts = [self._scale_amount(amount, scale) for amount in amounts.to_numpy()]
+        dtype = "Int64" if any(amount is None for amount in scaled_amounts) else "int64"
+
+        return pd.Series(scaled_amounts, index=amounts.index, name=amounts.name, dtype=dtype)
+
+    # Decimal arithmetic keeps scaled amounts exact and rounds half away from zero; floats go through their shortest repr.
+    @staticmethod
+    def _scale_amount(amount, scale: Decimal):
+        if amount is None or pd.isna(amount):
+            return None
+
+        if not isinstance(amount, Decimal):
+            amount = Decimal(str(amount))
+
+        return int((amount * scale).to_integral_value(rounding=ROUND_HALF_UP))
+
+    @staticmethod
+    def _is_tz_aware(dates: "pd.Series") -> bool:
+        first_valid = dates.first_valid_index()
+        if first_valid is None:
+            return False
+
+        first_date = dates.loc[first_valid]
+        if isinstance(first_date, pd.Series):
+            first_date = first_date.iloc[0]
+
+        return getattr(first_date, "tzinfo", None) is not None
+
+
+def memory_report(df: "pd.DataFrame") -> "pd.DataFrame":
+    memory_usage = df.memory_usage(index=True, deep=True)
+    dtypes = pd.Series({"Index": df.index.dtype, **df.dtypes.to_dict()})
+
+    report = pd.DataFrame({"dtype": dtypes.astype(str).reindex(memory_usage.index),
+                           "bytes": memory_usage.astype("int64")})
+    report["share"] = report["bytes"] / report["bytes"].sum() if report["bytes"].sum() else 0.0
+    report.loc["total"] = ["", report["bytes"].sum(), 1.0 if report["bytes"].sum() else 0.0]
+
+    return report
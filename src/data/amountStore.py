@@ -0,0 +1,132 @@
+from typing import List
+
+from ..data.dataHelpers import DataHelper, UnmappedAccounts
+from src.utilities.lazyImport import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+
+class AmountKeys:
+    ACCOUNT="account_id"
+    FSLI="fsli_id"
+
+
+# Rows of one key column sorted by (key, date), with per-key offsets and prefix sums of the amounts.
+class SortedAmountIndex:
+    def __init__(self, keys: "np.ndarray", dates: "np.ndarray", amounts: "np.ndarray"):
+        codes, uniques = pd.factorize(keys, sort=True)
+        self.positions = np.lexsort((dates, codes))
+        self.dates = dates[self.positions]
+        self.cumulative_amounts = np.concatenate([np.zeros(1, dtype=amounts.dtype), np.cumsum(amounts[self.positions])])
+
+        boundaries = np.searchsorted(codes[self.positions], np.arange(len(uniques) + 1))
+        self.offsets = {key: (boundaries[code], boundaries[code + 1]) for code, key in enumerate(uniques)}
+
+    def bounds(self, key, start=None, end=None) -> tuple:
+        key_start, key_end = self.offsets.get(key, (0, 0))
+        key_dates = self.dates[key_start:key_end]
+        low = key_start + (np.searchsorted(key_dates, start, side="left") if start is not None else 0)
+        high = key_start + (np.searchsorted(key_dates, end, side="right") if end is not None else len(key_dates))
+
+        return key_start, low, max(low, high)
+
+
+class AmountStore:
+    def __init__(self, amounts_df: "pd.DataFrame", mapping_table: "pd.DataFrame" = None,
+                 unmapped: str = UnmappedAccounts.KEEP, date_column: str = "transaction_date", amount_column: str = "amount"):
+        self.mapping_table = mapping_table
+        self.unmapped = unmapped
+        self.date_column = date_column
+        self.amount_column = amount_column
+
+        self._pending = []
+        self._build(self._map_fslis(amounts_df))
+
+    @classmethod
+    def from_engagement(cls, data_helper: DataHelper, tenant_id: str, engagement_id: str,
+                        unmapped: str = UnmappedAccounts.KEEP, **amount_options) -> "AmountStore":
+        amounts_df = data_helper.get_amount_table(tenant_id, [engagement_id], **amount_options)
+
+        return cls(amounts_df, data_helper.get_fsli_mapping_table(engagement_id), unmapped)
+
+    def __len__(self):
+        self._flush()
+        return len(self.amounts_df)
+
+    def keys(self, key_column: str = AmountKeys.ACCOUNT) -> List:
+        self._flush()
+        return list(self._index(key_column).offsets)
+
+    def select(self, account_id=None, fsli_id=None, start=None, end=None) -> "pd.DataFrame":
+        index, key = self._lookup(account_id, fsli_id)
+        _, low, high = index.bounds(key, self._to_date(start), self._to_date(end))
+
+        return self.amounts_df.iloc[index.positions[low:high]]
+
+    def total(self, account_id=None, fsli_id=None, start=None, end=None):
+        index, key = self._lookup(account_id, fsli_id)
+        _, low, high = index.bounds(key, self._to_date(start), self._to_date(end))
+
+        return index.cumulative_amounts[high] - index.cumulative_amounts[low]
+
+    def running_balance(self, account_id=None, fsli_id=None, start=None, end=None) -> "pd.Series":
+        index, key = self._lookup(account_id, fsli_id)
+        key_start, low, high = index.bounds(key, self._to_date(start), self._to_date(end))
+        balances = index.cumulative_amounts[low + 1:high + 1] - index.cumulative_amounts[key_start]
+
+        return pd.Series(balances, index=self.amounts_df.index[index.positions[low:high]], name="running_balance")
+
+    # Appended rows replace stored rows with the same id; the indexes are rebuilt once, on the next read.
+    def append(self, amounts_df: "pd.DataFrame"):
+        self._pending.append(self._map_fslis(amounts_df))
+
+    def _flush(self):
+        if not self._pending:
+            return
+
+        changes_df = pd.concat(self._pending) if len(self._pending) > 1 else self._pending[0]
+        changes_df = changes_df[~changes_df.index.duplicated(keep="last")]
+        self._pending = []
+        self._build(pd.concat([self.amounts_df[~self.amounts_df.index.isin(changes_df.index)], changes_df]))
+
+    def _build(self, amounts_df: "pd.DataFrame"):
+        dates = pd.to_datetime(amounts_df[self.date_column]).to_numpy().astype("datetime64[ns]")
+        amounts = amounts_df[self.amount_column].fillna(0)
+        amounts = amounts.to_numpy(dtype="int64" if pd.api.types.is_integer_dtype(amounts) else "float64")
+
+        account_index = SortedAmountIndex(amounts_df[AmountKeys.ACCOUNT].to_numpy(), dates, amounts)
+        sorted_amounts = amounts[account_index.positions]
+        self.amounts_df = amounts_df.iloc[account_index.positions]
+        account_index.positions = np.arange(len(amounts_df))
+        self.indexes = {AmountKeys.ACCOUNT: account_index}
+
+        if AmountKeys.FSLI in amounts_df.columns:
+            self.indexes[AmountKeys.FSLI] = SortedAmountIndex(self.amounts_df[AmountKeys.FSLI].to_numpy(),
+                                                              account_index.dates, sorted_amounts)
+
+    def _map_fslis(self, amounts_df: "pd.DataFrame") -> "pd.DataFrame":
+        if self.mapping_table is None or AmountKeys.FSLI in amounts_df.columns:
+            return amounts_df
+
+        return DataHelper.apply_fsli_mapping_table(amounts_df.copy(), self.mapping_table, self.unmapped)
+
+    def _lookup(self, account_id, fsli_id) -> tuple:
+        if (account_id is None) == (fsli_id is None):
+            raise ValueError("Exactly one of account_id and fsli_id is required")
+
+        self._flush()
+        if account_id is not None:
+            return self._index(AmountKeys.ACCOUNT), account_id
+
+        return self._index(AmountKeys.FSLI), fsli_id
+
+    def _index(self, key_column: str) -> SortedAmountIndex:
+        if key_column not in self.indexes:
+            raise ValueError(f"The amount store has no {key_column} column; build it with a mapping table")
+
+        return self.indexes[key_column]
+
+    @staticmethod
+    def _to_date(value):
+        return np.datetime64(pd.Timestamp(value), "ns") if value is not None else None
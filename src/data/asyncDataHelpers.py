@@ -0,0 +1,85 @@
+import asyncio
+from typing import List
+
+from ..data.amountSchema import AmountSchema
+from ..data.dataHelpers import DataHelper, UnmappedAccounts
+from ..data.referenceCache import CacheEntities
+from src.utilities.asyncDbConnection import AsyncDatabaseConnection
+from src.utilities.dbConnection import FetchEngine
+from src.utilities.lazyImport import lazy_import
+
+pd = lazy_import("pandas")
+
+
+class AsyncDataHelper:
+    def __init__(self, data_helper: DataHelper = None, max_concurrency: int = None):
+        self.data_helper = data_helper if data_helper is not None else DataHelper()
+        self.db_connection = AsyncDatabaseConnection(self.data_helper.db_connection, max_concurrency)
+
+    async def get_amount_table(self, tenant_id: str, engagement_ids: List[str] = None,
+                               engine: str = FetchEngine.FETCHALL, schema: AmountSchema = None) -> "pd.DataFrame":
+        if engagement_ids is None:
+            return await self.db_connection.run(self.data_helper._get_engagement_amounts, tenant_id, None, engine,
+                                                schema=schema)
+
+        engagements_periods = await self.get_engagements_periods(engagement_ids)
+
+        missing_ids = set(engagement_ids) - set(engagements_periods.index)
+        if missing_ids:
+            raise KeyError(f"Unknown engagement ids: {sorted(missing_ids)}")
+
+        engagements_dates = [(engagements_periods.loc[engagement_id, "period_start"].strftime("%Y-%m-%d"),
+                              engagements_periods.loc[engagement_id, "period_end"].strftime("%Y-%m-%d"))
+                             for engagement_id in engagement_ids]
+        amount_dataframes = await asyncio.gather(
+            *[self.db_connection.run(self.data_helper._get_engagement_amounts, tenant_id, engagement_dates, engine,
+                                     schema=schema)
+              for engagement_dates in engagements_dates])
+        amounts_df = pd.concat(amount_dataframes)
+
+        return schema.apply(amounts_df) if schema is not None else amounts_df
+
+    async def get_mapped_amount_table(self, tenant_id: str, engagement_id: str,
+                                      unmapped: str = UnmappedAccounts.RAISE) -> "pd.DataFrame":
+        amounts_df, mapping_table = await asyncio.gather(self.get_amount_table(tenant_id, [engagement_id]),
+                                                         self.get_fsli_mapping_table(engagement_id))
+
+        return DataHelper.apply_fsli_mapping_table(amounts_df, mapping_table, unmapped)
+
+    async def make_fsli_mappings(self, amounts_df: "pd.DataFrame", engagement_id: str,
+                                 unmapped: str = UnmappedAccounts.RAISE) -> "pd.DataFrame":
+        return DataHelper.apply_fsli_mapping_table(amounts_df, await self.get_fsli_mapping_table(engagement_id), unmapped)
+
+    async def get_flipping_id_amounts(self, amounts_df: "pd.DataFrame", engagement_id: str) -> "pd.DataFrame":
+        return DataHelper.filter_flipping_amounts(amounts_df, await self.get_fsli_mapping_table(engagement_id))
+
+    async def get_fsli_mapping_table(self, engagement_id: str) -> "pd.DataFrame":
+        reference_cache = self.data_helper.reference_cache
+        mapping_table = reference_cache.get(CacheEntities.FSLI_MAPPING_TABLE, engagement_id)
+        if mapping_table is not None:
+            return mapping_table
+
+        account_mappings, accounting_fslis = await asyncio.gather(
+            self.db_connection.run(self.data_helper._get_account_mappings, engagement_id),
+            self.db_connection.run(self.data_helper._get_accounting_fslis))
+
+        mapping_table = DataHelper.join_fsli_mapping_table(account_mappings, accounting_fslis)
+        reference_cache.set(CacheEntities.FSLI_MAPPING_TABLE, engagement_id, mapping_table)
+
+        return mapping_table
+
+    async def get_engagements_periods(self, engagement_ids: List[str]) -> "pd.DataFrame":
+        return await self.db_connection.run(self.data_helper.get_engagements_periods, engagement_ids)
+
+    async def get_engagement_info(self, engagement_id: str) -> dict:
+        return await self.db_connection.run(self.data_helper.get_engagement_info, engagement_id)
+
+    async def get_organization_info(self, organization_id: str) -> dict:
+        return await self.db_connection.run(self.data_helper.get_organization_info, organization_id)
+
+    def add_date_info(self, amounts_df: "pd.DataFrame", date_column: str, parts: List[str] = None,
+                      organization_info: dict = None) -> "pd.DataFrame":
+        return self.data_helper.add_date_info(amounts_df, date_column, parts, organization_info)
+
+    def close(self):
+        self.db_connection.close()
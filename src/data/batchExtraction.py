@@ -0,0 +1,191 @@
+import logging
+import multiprocessing
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Iterator, List
+
+from ..data.amountSchema import AmountSchema
+from ..data.dataHelpers import DataHelper, UnmappedAccounts
+from src.utilities.lazyImport import lazy_import
+from src.utilities.queryInstrumentation import query_caller
+
+pd = lazy_import("pandas")
+
+logger = logging.getLogger(__name__)
+
+
+class TransformExecutors:
+    PROCESS="process"
+    THREAD="thread"
+
+
+class ExtractionResult:
+    def __init__(self, index, tenant_id, engagement_ids, amounts_df=None, error=None, timings=None):
+        self.index = index
+        self.tenant_id = tenant_id
+        self.engagement_ids = engagement_ids
+        self.amounts_df = amounts_df
+        self.error = error
+        self.timings = timings or {}
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def to_dict(self) -> dict:
+        return {"index": self.index,
+                "tenant_id": self.tenant_id,
+                "engagement_ids": self.engagement_ids,
+                "rows": len(self.amounts_df) if self.amounts_df is not None else 0,
+                "error": repr(self.error) if self.error is not None else None,
+                "timings": dict(self.timings)}
+
+
+class ExtractionProgress:
+    def __init__(self, total):
+        self.total = total
+        self.completed = 0
+        self.failed = 0
+        self.started_at = time.perf_counter()
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started_at
+
+    def to_dict(self) -> dict:
+        return {"total": self.total, "completed": self.completed, "failed": self.failed, "elapsed": self.elapsed}
+
+
+class BatchExtractor:
+    def __init__(self, data_helper: DataHelper = None, io_workers: int = None, transform_workers: int = None,
+                 transform_executor: str = TransformExecutors.PROCESS, date_column: str = "transaction_date",
+                 fiscal_dates: bool = False, unmapped: str = UnmappedAccounts.RAISE, schema: AmountSchema = None):
+        if transform_executor not in (TransformExecutors.PROCESS, TransformExecutors.THREAD):
+            raise ValueError(f"Unknown transform executor: {transform_executor}")
+
+        self.data_helper = data_helper if data_helper is not None else DataHelper()
+        pool = self.data_helper.db_connection.pool
+        max_connections = pool.max_size if pool is not None else None
+        if io_workers is None:
+            io_workers = max_connections if max_connections is not None else 4
+        if max_connections is not None and io_workers > max_connections:
+            raise ValueError(f"io_workers={io_workers} exceeds the connection pool size ({max_connections})")
+
+        self.io_workers = io_workers
+        self.transform_workers = transform_workers
+        self.transform_executor = transform_executor
+        self.date_column = date_column
+        self.fiscal_dates = fiscal_dates
+        self.unmapped = unmapped
+        self.schema = schema
+
+    def run(self, work_items: List[tuple], progress=None) -> Iterator[ExtractionResult]:
+        work_items = [(tenant_id, list(engagement_ids) if engagement_ids is not None else None)
+                      for tenant_id, engagement_ids in work_items]
+        batch_progress = ExtractionProgress(len(work_items))
+
+        with ThreadPoolExecutor(max_workers=self.io_workers, thread_name_prefix="batch_io") as io_executor, \
+                self._make_transform_executor() as transform_executor:
+            pending = {io_executor.submit(timed_call, self._fetch_item, tenant_id, engagement_ids): (index, time.time(), {})
+                       for index, (tenant_id, engagement_ids) in enumerate(work_items)}
+            fetching = set(pending)
+            try:
+                yield from self._collect(work_items, pending, fetching, transform_executor, batch_progress, progress)
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    def _collect(self, work_items, pending, fetching, transform_executor, batch_progress, progress):
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                index, submitted_at, timings = pending.pop(future)
+                tenant_id, engagement_ids = work_items[index]
+                stage = "fetch" if future in fetching else "transform"
+                fetching.discard(future)
+
+                try:
+                    stage_result, started_at, duration = future.result()
+                except Exception as error:
+                    logger.exception("Batch extraction of tenant %s failed during %s", tenant_id, stage)
+                    result = ExtractionResult(index, tenant_id, engagement_ids, error=error, timings=timings)
+                else:
+                    timings["queued"] = timings.get("queued", 0.0) + max(0.0, started_at - submitted_at)
+                    timings[stage] = duration
+                    if stage == "fetch":
+                        transform_future = transform_executor.submit(timed_call, transform_amounts, stage_result,
+                                                                     self.date_column, self.unmapped, self.schema)
+                        pending[transform_future] = (index, time.time(), timings)
+                        continue
+
+                    result = ExtractionResult(index, tenant_id, engagement_ids, amounts_df=stage_result, timings=timings)
+
+                result.timings["total"] = sum(result.timings.values())
+                batch_progress.completed += 1
+                batch_progress.failed += 0 if result.ok else 1
+                if progress is not None:
+                    progress(batch_progress, result)
+                yield result
+
+    @query_caller
+    def _fetch_item(self, tenant_id: str, engagement_ids: List[str]) -> list:
+        if engagement_ids is None:
+            return [(None, self.data_helper.get_amount_table(tenant_id, schema=self.schema), None, None)]
+
+        engagements = []
+        for engagement_id in engagement_ids:
+            amounts_df = self.data_helper.get_amount_table(tenant_id, [engagement_id], schema=self.schema)
+            mapping_table = self.data_helper.get_fsli_mapping_table(engagement_id)
+            organization_info = None
+            if self.fiscal_dates:
+                _, organization_info = self.data_helper.get_engagement_context(engagement_id)
+
+            engagements.append((engagement_id, amounts_df, mapping_table, organization_info))
+
+        return engagements
+
+    def _make_transform_executor(self):
+        if self.transform_executor == TransformExecutors.PROCESS:
+            # Workers must not be forked from this process once the I/O threads hold pool and logging locks.
+            if sys.version_info >= (3, 7):
+                start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+                return ProcessPoolExecutor(max_workers=self.transform_workers,
+                                           mp_context=multiprocessing.get_context(start_method))
+
+            # Python 3.6 has no mp_context; its first submit starts every worker, so do it before any I/O thread exists.
+            executor = ProcessPoolExecutor(max_workers=self.transform_workers)
+            executor.submit(int).result()
+            return executor
+
+        return ThreadPoolExecutor(max_workers=self.transform_workers, thread_name_prefix="batch_transform")
+
+
+# Runs inside the worker so the duration excludes the time spent waiting in the executor queue; the wall clock
+# start is comparable across processes and gives the queue wait.
+def timed_call(function, *args) -> tuple:
+    started_at = time.time()
+    start = time.perf_counter()
+    result = function(*args)
+
+    return result, started_at, time.perf_counter() - start
+
+
+def transform_amounts(engagements: list, date_column: str, unmapped: str = UnmappedAccounts.RAISE,
+                      schema: AmountSchema = None) -> "pd.DataFrame":
+    amount_dataframes = []
+    for engagement_id, amounts_df, mapping_table, organization_info in engagements:
+        if mapping_table is not None:
+            amounts_df = DataHelper.apply_fsli_mapping_table(amounts_df, mapping_table, unmapped)
+        amounts_df = DataHelper.add_date_info(amounts_df, date_column, organization_info=organization_info)
+        if engagement_id is not None:
+            amounts_df["engagement_id"] = engagement_id
+
+        amount_dataframes.append(amounts_df)
+
+    if not amount_dataframes:
+        return pd.DataFrame()
+
+    amounts_df = pd.concat(amount_dataframes) if len(amount_dataframes) > 1 else amount_dataframes[0]
+
+    return schema.apply(amounts_df) if schema is not None else amounts_df
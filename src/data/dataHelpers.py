@@ -1,14 +1,114 @@
+import hashlib
+import json
 import os
-from typing import List
+from decimal import Decimal
+from typing import Iterator, List
 
-import numpy as np
-import pandas as pd
-from ..data.queryBuilder import QueryBuilder
-from src.utilities.dbConnection import DatabaseConnection, DbConstants
+from ..data.amountSchema import AmountSchema
+from ..data.queryBuilder import AggregateFunctions, DatePrecisions, QueryBuilder
+from ..data.referenceCache import CacheEntities, ReferenceCache
+from src.utilities.dbConnection import DatabaseConnection, DbConstants, FetchEngine
+from src.utilities.hostRouter import RoutingStrategies
+from src.utilities.lazyImport import lazy_import
+from src.utilities.queryCache import QueryResultCache
+from src.utilities.queryInstrumentation import query_caller
+from src.utilities.snapshotCache import SnapshotCache
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+
+class UnmappedAccounts:
+    RAISE="raise"
+    KEEP="keep"
+    DROP="drop"
+
+
+class UnmappedAccountError(KeyError):
+    def __init__(self, account_ids):
+        super().__init__(f"Accounts without FSLI mapping: {account_ids}")
+        self.account_ids = account_ids
+
+
+class SnapshotRefresh:
+    NONE="none"
+    INCREMENTAL="incremental"
+    FULL="full"
+
+
+class OverlapModes:
+    DUPLICATE="duplicate"
+    DEDUPLICATE="deduplicate"
 
 
 class DataHelper:
-    def __init__(self):
+    AMOUNT_SELECTS = ["accounting_amounts.id",
+                      "accounting_amounts.amount as amount",
+                      "accounting_amounts.description as amount_description",
+                      "accounting_amounts.type as amount_type",
+                      "accounting_amounts.account_id as account_id",
+
+                      "accounting_accounts.name as account_description",
+                      "accounting_accounts.currency as account_currency",
+
+                      "accounting_amounts.entry_id as transaction_id",
+                      "accounting_entries.context as  transaction_context",
+                      "accounting_entries.date as transaction_date",
+                      "accounting_entries.external_created_at as transaction_external_date",
+                      "accounting_entries.discarded_at as transaction_discarded_at"]
+
+    AMOUNT_COPY_DTYPES = {"id": "object",
+                          "amount": "float64",
+                          "amount_description": "object",
+                          "amount_type": "object",
+                          "account_id": "object",
+                          "account_description": "object",
+                          "account_currency": "object",
+                          "transaction_id": "object",
+                          "transaction_context": "object"}
+    AMOUNT_DATE_COLUMNS = ["transaction_date", "transaction_external_date", "transaction_discarded_at"]
+
+    DATE_PART_DTYPES = {"year": "int16",
+                        "month": "int8",
+                        "day": "int8",
+                        "week_day": "int8",
+                        "quarter": "int8",
+                        "day_of_year": "int16",
+                        "iso_week": "int8",
+                        "iso_year": "int16",
+                        "fiscal_year": "int16",
+                        "fiscal_period": "int8",
+                        "fiscal_quarter": "int8"}
+    DEFAULT_DATE_PARTS = ["year", "month", "day", "week_day"]
+    FISCAL_DATE_PARTS = ["fiscal_year", "fiscal_period"]
+
+    ENGAGEMENT_INFO_COLUMNS = ["id", "period_start", "period_end", "type", "organization_id", "multi_currency", "tax_services", "materiality"]
+    ENGAGEMENT_DATE_COLUMNS = ["period_start", "period_end"]
+    ORGANIZATION_INFO_COLUMNS = ["id", "financial_year_end_day", "financial_year_end_month", "business_type"]
+    ACCOUNT_MAPPING_COLUMNS = ["id", "account_id", "fsli_id"]
+    ACCOUNTING_FSLI_COLUMNS = ["id", "reverse_fsli_id"]
+
+    FSLI_MAPPING_SELECTS = ["fsli_mappings.fsli_id as fsli_id",
+                            "fsli_mappings.reverse_fsli_id as reverse_fsli_id",
+                            "fsli_mappings.account_id as mapped_account_id"]
+
+    AMOUNT_CHANGES_CONSTRAINT = ("(accounting_entries.external_created_at >= %(since)s "
+                                 "OR accounting_entries.discarded_at >= %(since)s)")
+
+    AMOUNT_TABLE = "accounting_amounts"
+    AMOUNT_JOINS = [("accounting_accounts", "accounting_amounts.account_id = accounting_accounts.id"),
+                    ("accounting_entries", "accounting_amounts.entry_id = accounting_entries.id")]
+
+    BALANCE_JOINS = [("accounting_entries", "accounting_amounts.entry_id = accounting_entries.id")]
+    BALANCE_AGGREGATES = [QueryBuilder.aggregate(AggregateFunctions.SUM, "accounting_amounts.amount", "amount"),
+                          QueryBuilder.aggregate(AggregateFunctions.COUNT, "*", "amount_count")]
+    UNMAPPED_ACCOUNTS_AGGREGATE = QueryBuilder.aggregate(AggregateFunctions.ARRAY_AGG, "accounting_amounts.account_id",
+                                                         "unmapped_account_ids", distinct=True,
+                                                         where="fsli_mappings.account_id IS NULL")
+
+    def __init__(self, pool_min_size: int = None, pool_max_size: int = None, reference_cache: ReferenceCache = None,
+                 prepare_statements: bool = False, snapshot_cache: SnapshotCache = None, query_observers: list = None,
+                 query_cache: QueryResultCache = None):
         db_config = {
             "user": os.environ[DbConstants.PSQL_USER],
             "password": os.environ[DbConstants.PSQL_PWD],
@@ -16,105 +116,746 @@ class DataHelper:
             "port": os.environ[DbConstants.PSQL_PORT],
             "database": os.environ[DbConstants.PSQL_DATABASE]
         }
-        self.db_connection = DatabaseConnection()
+        pool_min_size = pool_min_size if pool_min_size is not None else int(os.environ.get(DbConstants.PSQL_POOL_MIN_SIZE, 1))
+        pool_max_size = pool_max_size if pool_max_size is not None else int(os.environ.get(DbConstants.PSQL_POOL_MAX_SIZE, 10))
+        replica_configs = self._replica_configs(db_config, os.environ.get(DbConstants.PSQL_REPLICA_HOSTS, ""))
+        if replica_configs:
+            strategy = os.environ.get(DbConstants.PSQL_ROUTING_STRATEGY, RoutingStrategies.ROUND_ROBIN)
+            self.db_connection = DatabaseConnection.routed(db_config, replica_configs, strategy=strategy, min_size=pool_min_size,
+                                                           max_size=pool_max_size, prepare_statements=prepare_statements,
+                                                           observers=query_observers, query_cache=query_cache)
+        else:
+            self.db_connection = DatabaseConnection.pooled(db_config, min_size=pool_min_size, max_size=pool_max_size,
+                                                           prepare_statements=prepare_statements, observers=query_observers,
+                                                           query_cache=query_cache)
         self.query_builder = QueryBuilder()
+        self.reference_cache = reference_cache if reference_cache is not None else ReferenceCache()
+        self.snapshot_cache = snapshot_cache
+
+    @staticmethod
+    def _replica_configs(db_config: dict, replica_hosts: str) -> List[dict]:
+        replica_configs = []
+        for replica_host in filter(None, (host.strip() for host in replica_hosts.split(","))):
+            host, _, port = replica_host.partition(":")
+            replica_configs.append({**db_config, "host": host, "port": port or db_config["port"]})
+
+        return replica_configs
+
+    @query_caller
+    def get_amount_table(self, tenant_id: str, engagement_ids: List[str] = None, batched: bool = True,
+                         engine: str = FetchEngine.FETCHALL, snapshot_refresh: str = None,
+                         schema: AmountSchema = None, overlap: str = None) -> "pd.DataFrame":
+        if overlap not in (None, OverlapModes.DUPLICATE, OverlapModes.DEDUPLICATE):
+            raise ValueError(f"Unknown overlap mode: {overlap}")
+
+        if snapshot_refresh is not None:
+            amounts_df = self._get_snapshot_amounts(tenant_id, engagement_ids, engine, snapshot_refresh)
+            return schema.apply(amounts_df) if schema is not None else amounts_df
 
-    def get_amount_table(self, tenant_id: str, engagement_ids: str = None) -> pd.DataFrame:
         if engagement_ids is None:
-            return self._get_engagement_amounts(tenant_id, None)
+            return self._get_engagement_amounts(tenant_id, None, engine, schema=schema)
+
+        if overlap is not None:
+            return self._get_coalesced_amounts(tenant_id, engagement_ids, engine, overlap, schema=schema)
 
+        if batched:
+            return self._get_engagements_amounts(tenant_id, engagement_ids, engine, schema=schema)
+
+        engagements_info = [self.get_engagement_info(engagement_id) for engagement_id in engagement_ids]
         engagements_dates = [
-            (self.get_engagement_info(engagement_id)["period_start"].strftime("%Y-%m-%d"),
-             self.get_engagement_info(engagement_id)["period_end"].strftime("%Y-%m-%d"))
+            (engagement_info["period_start"].strftime("%Y-%m-%d"), engagement_info["period_end"].strftime("%Y-%m-%d"))
+            for engagement_info in engagements_info]
+        amount_dataframes = [self._get_engagement_amounts(tenant_id, engagement_dates, engine, schema=schema)
+                             for engagement_dates in engagements_dates]
+        amounts_df = pd.concat(amount_dataframes)
+
+        return schema.apply(amounts_df) if schema is not None else amounts_df
+
+    @query_caller
+    def sync_amount_table(self, tenant_id: str, amounts_df: "pd.DataFrame", watermark: str = None,
+                          engagement_ids: List[str] = None, engine: str = FetchEngine.FETCHALL,
+                          drop_discarded: bool = False, schema: AmountSchema = None) -> tuple:
+        watermark = self._utc_watermark(watermark if watermark is not None else self._amount_watermark(amounts_df))
+        if watermark is None:
+            amounts_df = self.get_amount_table(tenant_id, engagement_ids, engine=engine, schema=schema)
+        else:
+            if engagement_ids is None:
+                changes_df = self._get_engagement_amounts(tenant_id, None, engine, since=watermark, schema=schema)
+            else:
+                changes_df = self._get_engagements_amounts(tenant_id, engagement_ids, engine, since=watermark, schema=schema)
+
+            if not changes_df.empty:
+                amounts_df = self._merge_amount_changes(amounts_df, changes_df)
+                amounts_df = schema.apply(amounts_df) if schema is not None else amounts_df
+
+        new_watermark = self._utc_watermark(self._amount_watermark(amounts_df))
+        if watermark is not None and (new_watermark is None or pd.Timestamp(new_watermark) < pd.Timestamp(watermark)):
+            new_watermark = watermark
+
+        if drop_discarded:
+            amounts_df = amounts_df[amounts_df["transaction_discarded_at"].isna()]
+
+        return amounts_df, new_watermark
+
+    @classmethod
+    def add_date_info(cls, amounts_df: "pd.DataFrame", date_column: str, parts: List[str] = None,
+                      organization_info: dict = None) -> "pd.DataFrame":
+        if parts is None:
+            parts = cls.DEFAULT_DATE_PARTS + (cls.FISCAL_DATE_PARTS if organization_info is not None else [])
+
+        unknown_parts = set(parts) - set(cls.DATE_PART_DTYPES)
+        if unknown_parts:
+            raise ValueError(f"Unknown date parts: {sorted(unknown_parts)}")
+
+        if any(part in cls.FISCAL_DATE_PARTS for part in parts) and organization_info is None:
+            raise ValueError("Fiscal date parts require organization_info")
+
+        dates = amounts_df[date_column]
+        if not pd.api.types.is_datetime64_any_dtype(dates):
+            dates = pd.to_datetime(dates)
+
+        date_parts = cls._compute_date_parts(dates.dt, parts, organization_info)
+        has_missing_dates = dates.isna().any()
+
+        for part in parts:
+            values = date_parts[part]
+            dtype = cls.DATE_PART_DTYPES[part]
+            amounts_df[f'{date_column}_{part}'] = values.astype(dtype.capitalize() if has_missing_dates else dtype)
+
+        return amounts_df
+
+    # Only the requested parts are computed; iso and fiscal intermediates are shared between their parts and only built
+    # when one of those parts is asked for.
+    @classmethod
+    def _compute_date_parts(cls, dates_accessor, parts: List[str], organization_info: dict) -> dict:
+        intermediates = {}
+
+        def shared(name, compute):
+            if name not in intermediates:
+                intermediates[name] = compute()
+            return intermediates[name]
+
+        def iso_parts():
+            return shared("iso", lambda: cls._compute_iso_parts(dates_accessor))
+
+        def fiscal_periods():
+            return shared("fiscal", lambda: cls._compute_fiscal_periods(dates_accessor, organization_info))
+
+        def fiscal_period():
+            return shared("fiscal_period", lambda: cls._fiscal_period(*fiscal_periods(), organization_info))
+
+        part_functions = {"year": lambda: dates_accessor.year,
+                          "month": lambda: dates_accessor.month,
+                          "day": lambda: dates_accessor.day,
+                          "week_day": lambda: dates_accessor.weekday,
+                          "quarter": lambda: dates_accessor.quarter,
+                          "day_of_year": lambda: dates_accessor.dayofyear,
+                          "iso_week": lambda: iso_parts()["iso_week"],
+                          "iso_year": lambda: iso_parts()["iso_year"],
+                          "fiscal_year": lambda: cls._fiscal_year(*fiscal_periods(), organization_info),
+                          "fiscal_period": fiscal_period,
+                          "fiscal_quarter": lambda: (fiscal_period() - 1) // 3 + 1}
+
+        return {part: part_functions[part]() for part in parts}
+
+    @staticmethod
+    def _compute_iso_parts(dates_accessor) -> dict:
+        if hasattr(dates_accessor, "isocalendar"):
+            iso_calendar = dates_accessor.isocalendar()
+            return {"iso_week": iso_calendar["week"], "iso_year": iso_calendar["year"]}
+
+        week_of_previous_year = (dates_accessor.month == 1) & (dates_accessor.week > 50)
+        week_of_next_year = (dates_accessor.month == 12) & (dates_accessor.week == 1)
+        return {"iso_week": dates_accessor.week,
+                "iso_year": dates_accessor.year - week_of_previous_year + week_of_next_year}
+
+    @staticmethod
+    def _compute_fiscal_periods(dates_accessor, organization_info: dict) -> tuple:
+        year_end_day = int(organization_info["financial_year_end_day"])
+
+        period_end_day = np.minimum(year_end_day, dates_accessor.days_in_month)
+        rolls_to_next_period = (dates_accessor.day > period_end_day).astype("int64")
+        period_end_index = dates_accessor.year * 12 + dates_accessor.month - 1 + rolls_to_next_period
+
+        return period_end_index, period_end_index % 12
+
+    @staticmethod
+    def _fiscal_period(period_end_index, period_end_month, organization_info: dict):
+        fiscal_period = (period_end_month - (int(organization_info["financial_year_end_month"]) - 1)) % 12
+
+        return fiscal_period.where(fiscal_period != 0, 12)
+
+    @staticmethod
+    def _fiscal_year(period_end_index, period_end_month, organization_info: dict):
+        year_end_month = int(organization_info["financial_year_end_month"])
+
+        return period_end_index // 12 + (period_end_month > year_end_month - 1).astype("int64")
+
+    @query_caller
+    def make_fsli_mappings(self, amounts_df: "pd.DataFrame", engagement_id: str,
+                           unmapped: str = UnmappedAccounts.RAISE) -> "pd.DataFrame":
+        return self.apply_fsli_mapping_table(amounts_df, self.get_fsli_mapping_table(engagement_id), unmapped)
+
+    @staticmethod
+    def apply_fsli_mapping_table(amounts_df: "pd.DataFrame", mapping_table: "pd.DataFrame",
+                                 unmapped: str = UnmappedAccounts.RAISE) -> "pd.DataFrame":
+        positions = mapping_table.index.get_indexer(amounts_df["account_id"])
+
+        unmapped_mask = positions == -1
+        if unmapped_mask.any():
+            if unmapped == UnmappedAccounts.RAISE:
+                raise UnmappedAccountError(pd.unique(amounts_df["account_id"].to_numpy()[unmapped_mask]).tolist())
+            if unmapped == UnmappedAccounts.DROP:
+                amounts_df = amounts_df[~unmapped_mask].copy()
+                positions = positions[~unmapped_mask]
+            elif unmapped != UnmappedAccounts.KEEP:
+                raise ValueError(f"Unknown unmapped accounts policy: {unmapped}")
+
+        fsli_ids = np.append(mapping_table["fsli_id"].to_numpy(dtype=object), np.nan)
+        amounts_df["fsli_id"] = fsli_ids[positions]
+
+        return amounts_df
+
+    @query_caller
+    def get_fsli_mapping_table(self, engagement_id: str) -> "pd.DataFrame":
+        return self.reference_cache.get_or_load(CacheEntities.FSLI_MAPPING_TABLE, engagement_id,
+                                                lambda: self._build_fsli_mapping_table(engagement_id))
+
+    def _build_fsli_mapping_table(self, engagement_id: str) -> "pd.DataFrame":
+        return self.join_fsli_mapping_table(*self._get_mapping_reference_tables(engagement_id))
+
+    @query_caller
+    def _get_mapping_reference_tables(self, engagement_id: str) -> tuple:
+        account_mappings = self.reference_cache.get(CacheEntities.ACCOUNT_MAPPINGS, engagement_id)
+        accounting_fslis = self.reference_cache.get(CacheEntities.ACCOUNTING_FSLIS, None)
+        if account_mappings is not None and accounting_fslis is not None:
+            return account_mappings, accounting_fslis
+
+        queries, columns = [], []
+        if account_mappings is None:
+            queries.append(self._build_account_mappings_query(engagement_id))
+            columns.append(self.ACCOUNT_MAPPING_COLUMNS)
+        if accounting_fslis is None:
+            queries.append(self._build_accounting_fslis_query())
+            columns.append(self.ACCOUNTING_FSLI_COLUMNS)
+
+        results = iter(self.db_connection.execute_batch(queries, columns=columns))
+        if account_mappings is None:
+            account_mappings = next(results)
+            self.reference_cache.set(CacheEntities.ACCOUNT_MAPPINGS, engagement_id, account_mappings)
+        if accounting_fslis is None:
+            accounting_fslis = next(results)
+            self.reference_cache.set(CacheEntities.ACCOUNTING_FSLIS, None, accounting_fslis)
+
+        return account_mappings, accounting_fslis
+
+    @staticmethod
+    def join_fsli_mapping_table(account_mappings: "pd.DataFrame", accounting_fslis: "pd.DataFrame") -> "pd.DataFrame":
+        mapping_table = account_mappings[["account_id", "fsli_id"]].drop_duplicates("account_id", keep="last")
+        mapping_table = mapping_table.set_index("account_id")
+        mapping_table["reverse_fsli_id"] = accounting_fslis["reverse_fsli_id"].reindex(mapping_table["fsli_id"]).to_numpy()
+
+        return mapping_table
+
+    @query_caller
+    def iter_amount_table(self, tenant_id: str, engagement_ids: List[str] = None, chunk_size: int = 100000,
+                          schema: AmountSchema = None) -> "Iterator[pd.DataFrame]":
+        if engagement_ids is None:
+            query = self._build_engagement_amounts_query(tenant_id, None)
+        else:
+            query = self._build_engagements_amounts_query(tenant_id, engagement_ids)
+
+        for amounts_chunk in self.db_connection.execute_query_chunks(query, chunk_size):
+            if "engagement_id" in amounts_chunk.columns:
+                amounts_chunk = amounts_chunk.drop(columns="engagement_id")
+            if schema is not None:
+                amounts_chunk = schema.apply(amounts_chunk)
+            yield amounts_chunk
+
+    @query_caller
+    def _get_engagement_amounts(self, tenant_id: str, engagement_dates: List[str], engine: str = FetchEngine.FETCHALL,
+                                since: str = None, schema: AmountSchema = None) -> "pd.DataFrame":
+        query = self._build_engagement_amounts_query(tenant_id, engagement_dates, since)
+
+        return self._execute_amount_query(query, engine, schema)
+
+    def _get_snapshot_amounts(self, tenant_id: str, engagement_ids: List[str], engine: str, snapshot_refresh: str) -> "pd.DataFrame":
+        if self.snapshot_cache is None:
+            raise ValueError("snapshot_refresh requires a DataHelper built with a snapshot_cache")
+
+        if engagement_ids is None:
+            return self._load_amount_snapshot(tenant_id, None, engine, snapshot_refresh)
+
+        engagements_periods = self.get_engagements_periods(engagement_ids)
+        missing_ids = set(engagement_ids) - set(engagements_periods.index)
+        if missing_ids:
+            raise KeyError(f"Unknown engagement ids: {sorted(missing_ids)}")
+
+        amount_dataframes = [
+            self._load_amount_snapshot(tenant_id, (engagements_periods.loc[engagement_id, "period_start"].strftime("%Y-%m-%d"),
+                                                   engagements_periods.loc[engagement_id, "period_end"].strftime("%Y-%m-%d")),
+                                       engine, snapshot_refresh)
             for engagement_id in engagement_ids]
-        amount_dataframes = [self._get_engagement_amounts(tenant_id, engagement_dates) for engagement_dates in engagements_dates]
 
         return pd.concat(amount_dataframes)
 
-    def add_date_info(self, amounts_df: pd.DataFrame, date_column: str) -> pd.DataFrame:
-        amounts_df[f'{date_column}_year'] = [date.year for date in amounts_df[date_column]]
-        amounts_df[f'{date_column}_month'] = [date.month for date in amounts_df[date_column]]
-        amounts_df[f'{date_column}_day'] = [date.day for date in amounts_df[date_column]]
-        amounts_df[f'{date_column}_week_day'] = [date.weekday() for date in amounts_df[date_column]]
+    def _load_amount_snapshot(self, tenant_id: str, engagement_dates: tuple, engine: str, snapshot_refresh: str) -> "pd.DataFrame":
+        snapshot_key = [tenant_id, list(engagement_dates) if engagement_dates is not None else None, self._amount_query_shape()]
+        snapshot = self.snapshot_cache.get(snapshot_key) if snapshot_refresh != SnapshotRefresh.FULL else None
 
-        return amounts_df
+        if snapshot is None:
+            amounts_df = self._get_engagement_amounts(tenant_id, engagement_dates, engine)
+        else:
+            amounts_df, metadata = snapshot
+            if snapshot_refresh == SnapshotRefresh.NONE or metadata.get("watermark") is None:
+                return amounts_df
+
+            changes_df = self._get_engagement_amounts(tenant_id, engagement_dates, engine, since=metadata["watermark"])
+            if changes_df.empty:
+                return amounts_df
+            amounts_df = self._merge_amount_changes(amounts_df, changes_df)
 
-    def make_fsli_mappings(self, amounts_df: pd.DataFrame, engagement_id: str) -> pd.DataFrame:
-        fsli_dict = self._get_mapping_dict(engagement_id)
-        fsli_list = [fsli_dict[account_id]["fsli_id"] for account_id in amounts_df["account_id"]]
-        amounts_df["fsli_id"] = fsli_list
+        self.snapshot_cache.put(snapshot_key, amounts_df, {"watermark": self._amount_watermark(amounts_df)})
 
         return amounts_df
 
-    def _get_engagement_amounts(self, tenant_id: str, engagement_dates: List[str]) -> pd.DataFrame:
-        selects = ["accounting_amounts.id",
-                   "accounting_amounts.amount as amount",
-                   "accounting_amounts.description as amount_description",
-                   "accounting_amounts.type as amount_type",
-                   "accounting_amounts.account_id as account_id",
+    def _amount_query_shape(self) -> str:
+        return hashlib.sha1(json.dumps([self.AMOUNT_SELECTS, self.AMOUNT_TABLE, self.AMOUNT_JOINS]).encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _amount_watermark(amounts_df: "pd.DataFrame"):
+        timestamps = pd.concat([amounts_df["transaction_external_date"], amounts_df["transaction_discarded_at"]]).dropna()
+        if timestamps.empty:
+            return None
+
+        return pd.Timestamp(timestamps.max()).isoformat()
+
+    # Naive watermarks are taken as UTC so they compare with watermarks read from tz-aware amounts.
+    @staticmethod
+    def _utc_watermark(watermark):
+        if watermark is None:
+            return None
+
+        timestamp = pd.Timestamp(watermark)
+        timestamp = timestamp.tz_localize("UTC") if timestamp.tzinfo is None else timestamp.tz_convert("UTC")
+        return timestamp.isoformat()
+
+    @staticmethod
+    def _merge_amount_changes(amounts_df: "pd.DataFrame", changes_df: "pd.DataFrame") -> "pd.DataFrame":
+        return pd.concat([amounts_df[~amounts_df.index.isin(changes_df.index)], changes_df])
+
+    def _execute_amount_query(self, query: tuple, engine: str, schema: AmountSchema = None,
+                              columns: List[str] = None) -> "pd.DataFrame":
+        if engine == FetchEngine.COPY:
+            dtypes = schema.copy_dtypes(self.AMOUNT_COPY_DTYPES) if schema is not None else self.AMOUNT_COPY_DTYPES
+            parse_dates = self.AMOUNT_DATE_COLUMNS
+            if columns is not None:
+                dtypes = {column: dtype for column, dtype in dtypes.items() if column in columns}
+                parse_dates = [column for column in parse_dates if column in columns]
+            amounts_df = self.db_connection.execute_query(query, engine=engine, dtypes=dtypes, parse_dates=parse_dates)
+        elif engine == FetchEngine.ARROW:
+            amounts_df = self.db_connection.execute_query(query, engine=engine, column_types=self._amount_arrow_types())
+        else:
+            amounts_df = self.db_connection.execute_queries([query])[0]
+
+        return schema.apply(amounts_df) if schema is not None else amounts_df
+
+    def _build_engagement_amounts_query(self, tenant_id: str, engagement_dates: List[str], since: str = None,
+                                        selects: List[str] = None) -> tuple:
+        selects = selects if selects is not None else self.AMOUNT_SELECTS
+        table = self.AMOUNT_TABLE
+        joins = self.AMOUNT_JOINS
+
+        constraints = [QueryBuilder.equals("accounting_amounts.tenant_id", "tenant_id")]
+        params = {"tenant_id": tenant_id}
 
-                   "accounting_accounts.name as account_description",
-                   "accounting_accounts.currency as account_currency",
+        if engagement_dates is not None:
+            constraints.append(QueryBuilder.between("accounting_entries.date", "period_start", "period_end"))
+            params.update({"period_start": engagement_dates[0], "period_end": engagement_dates[1]})
 
-                   "accounting_amounts.entry_id as transaction_id",
-                   "accounting_entries.context as  transaction_context",
-                   "accounting_entries.date as transaction_date",
-                   "accounting_entries.external_created_at as transaction_external_date",
-                   "accounting_entries.discarded_at as transaction_discarded_at"]
+        if since is not None:
+            constraints.append(self.AMOUNT_CHANGES_CONSTRAINT)
+            params["since"] = since
 
-        table = "accounting_amounts"
-        joins = [("accounting_accounts", "accounting_amounts.account_id = accounting_accounts.id"),
-                 ("accounting_entries", "accounting_amounts.entry_id = accounting_entries.id")]
+        return self.query_builder.build_parameterized_query(selects, table, joins, constraints, params)
 
-        constraints = [f"accounting_amounts.tenant_id ='{tenant_id}'"]
+    @query_caller
+    def _get_engagements_amounts(self, tenant_id: str, engagement_ids: List[str], engine: str = FetchEngine.FETCHALL,
+                                 schema: AmountSchema = None, since: str = None) -> "pd.DataFrame":
+        query = self._build_engagements_amounts_query(tenant_id, engagement_ids, since)
+        amounts_df = self._execute_amount_query(query, engine, schema)
 
-        if engagement_dates is not None:
-            constraints.append(f"accounting_entries.date BETWEEN '{engagement_dates[0]}' AND '{engagement_dates[1]}'")
+        order = self._engagement_order(amounts_df["engagement_id"], engagement_ids)
+
+        return amounts_df.iloc[order].drop(columns="engagement_id")
+
+    @query_caller
+    def _get_coalesced_amounts(self, tenant_id: str, engagement_ids: List[str], engine: str, overlap: str,
+                               schema: AmountSchema = None, since: str = None) -> "pd.DataFrame":
+        periods = self._get_known_engagements_periods(engagement_ids)
+        period_starts, period_ends = self._period_bounds(periods)
+        range_starts, range_ends = self._coalesce_ranges(period_starts, period_ends)
+
+        query = self._build_coalesced_amounts_query(tenant_id, range_starts, range_ends, since)
+        amounts_df = self._execute_amount_query(query, engine, schema)
+        if overlap == OverlapModes.DEDUPLICATE:
+            return amounts_df
+
+        return self._fan_out_engagements(amounts_df, engagement_ids, period_starts, period_ends)
+
+    @staticmethod
+    def _period_bounds(periods: "pd.DataFrame") -> tuple:
+        return (pd.to_datetime(periods["period_start"]).to_numpy().astype("datetime64[D]"),
+                pd.to_datetime(periods["period_end"]).to_numpy().astype("datetime64[D]"))
+
+    @staticmethod
+    def _coalesce_ranges(period_starts: "np.ndarray", period_ends: "np.ndarray") -> tuple:
+        if len(period_starts) == 0:
+            return period_starts, period_ends
+
+        order = np.argsort(period_starts, kind="stable")
+        starts, ends = period_starts[order], period_ends[order]
+        running_ends = np.maximum.accumulate(ends)
+        # Dates are whole days, so a range starting the day after the previous one ends is merged as well.
+        range_heads = np.flatnonzero(np.r_[True, starts[1:] > running_ends[:-1] + np.timedelta64(1, "D")])
+
+        return starts[range_heads], np.maximum.reduceat(ends, range_heads)
 
-        query = self.query_builder.build_query(selects, table, joins, constraints)
+    @staticmethod
+    def _fan_out_engagements(amounts_df: "pd.DataFrame", engagement_ids: List[str], period_starts: "np.ndarray",
+                             period_ends: "np.ndarray") -> "pd.DataFrame":
+        dates = pd.to_datetime(amounts_df["transaction_date"]).to_numpy().astype("datetime64[D]")
+        date_order = np.argsort(dates, kind="stable")
+        sorted_dates = dates[date_order]
 
-        return self.db_connection.execute_queries([query])[0]
+        lows = np.searchsorted(sorted_dates, period_starts, side="left")
+        highs = np.searchsorted(sorted_dates, period_ends, side="right")
+        positions = np.concatenate([np.sort(date_order[low:high]) for low, high in zip(lows, highs)]
+                                   or [np.empty(0, dtype=np.intp)])
 
-    def get_flipping_id_amounts(self, amounts_df: pd.DataFrame, engagement_id: str) -> pd.DataFrame:
-        account_fsli_dict = self._get_mapping_dict(engagement_id)
-        accounts_mapping_flips = []
+        engagement_column = np.repeat(np.asarray(engagement_ids, dtype=object), highs - lows)
 
-        for account_id in account_fsli_dict:
-            value = account_fsli_dict[account_id]
-            if value["reverse_fsli_id"] is not None:
+        return amounts_df.iloc[positions].assign(engagement_id=engagement_column)
 
-                accounts_mapping_flips.append({account_id: {"fsli_id": value["fsli_id"], "reverse_fsli_id": value["reverse_fsli_id"]}})
+    def _get_known_engagements_periods(self, engagement_ids: List[str]) -> "pd.DataFrame":
+        engagements_periods = self.get_engagements_periods(engagement_ids)
 
-        accounts_id = [list(account.keys())[0] for account in accounts_mapping_flips]
+        missing_ids = set(engagement_ids) - set(engagements_periods.index)
+        if missing_ids:
+            raise KeyError(f"Unknown engagement ids: {sorted(missing_ids)}")
 
-        flip_amounts_table = amounts_df[amounts_df["account_id"].isin(pd.Series(accounts_id))]
+        return engagements_periods.loc[engagement_ids]
+
+    def _build_coalesced_amounts_query(self, tenant_id: str, range_starts: "np.ndarray", range_ends: "np.ndarray",
+                                       since: str = None) -> tuple:
+        params = {"tenant_id": tenant_id,
+                  "range_starts": QueryBuilder.array_parameter(np.datetime_as_string(range_starts, unit="D")),
+                  "range_ends": QueryBuilder.array_parameter(np.datetime_as_string(range_ends, unit="D"))}
+
+        joins = self.AMOUNT_JOINS + [
+            ("unnest(%(range_starts)s::date[], %(range_ends)s::date[]) AS coalesced_periods (period_start, period_end)",
+             "accounting_entries.date BETWEEN coalesced_periods.period_start AND coalesced_periods.period_end")]
+        constraints = [QueryBuilder.equals("accounting_amounts.tenant_id", "tenant_id")]
+
+        if since is not None:
+            constraints.append(self.AMOUNT_CHANGES_CONSTRAINT)
+            params["since"] = since
+
+        return self.query_builder.build_parameterized_query(self.AMOUNT_SELECTS, self.AMOUNT_TABLE, joins, constraints, params)
+
+    @query_caller
+    def get_amount_arrow_table(self, tenant_id: str, engagement_ids: List[str] = None):
+        if engagement_ids is None:
+            return self.db_connection.execute_query_arrow(self._build_engagement_amounts_query(tenant_id, None),
+                                                          self._amount_arrow_types())
+
+        table = self.db_connection.execute_query_arrow(self._build_engagements_amounts_query(tenant_id, engagement_ids),
+                                                       self._amount_arrow_types())
+        order = self._engagement_order(table.column("engagement_id").to_pandas(), engagement_ids)
+        table = table.take(order)
+
+        return table.remove_column(table.schema.get_field_index("engagement_id"))
+
+    @staticmethod
+    def _engagement_order(engagement_column: "pd.Series", engagement_ids: List[str]) -> "np.ndarray":
+        engagement_positions = {engagement_id: position for position, engagement_id in reversed(list(enumerate(engagement_ids)))}
+
+        return np.argsort(engagement_column.map(engagement_positions).to_numpy(), kind="stable")
+
+    @staticmethod
+    def _amount_arrow_types() -> dict:
+        import pyarrow as pa
+
+        timestamp = pa.timestamp("us", tz="UTC")
+        return {"id": pa.string(),
+                "amount": pa.float64(),
+                "amount_description": pa.string(),
+                "amount_type": pa.string(),
+                "account_id": pa.string(),
+                "account_description": pa.string(),
+                "account_currency": pa.string(),
+                "transaction_id": pa.string(),
+                "transaction_context": pa.string(),
+                "transaction_date": pa.date32(),
+                "transaction_external_date": timestamp,
+                "transaction_discarded_at": timestamp,
+                "engagement_id": pa.string()}
+
+    def _build_engagements_amounts_query(self, tenant_id: str, engagement_ids: List[str], since: str = None) -> tuple:
+        periods = self._get_known_engagements_periods(engagement_ids)
+        params = {"tenant_id": tenant_id,
+                  "engagement_ids": QueryBuilder.array_parameter(engagement_ids),
+                  "period_starts": QueryBuilder.array_parameter([period.strftime("%Y-%m-%d") for period in periods["period_start"]]),
+                  "period_ends": QueryBuilder.array_parameter([period.strftime("%Y-%m-%d") for period in periods["period_end"]])}
+
+        selects = self.AMOUNT_SELECTS + ["engagement_periods.engagement_id as engagement_id"]
+        joins = self.AMOUNT_JOINS + [
+            ("unnest(%(engagement_ids)s::text[], %(period_starts)s::date[], %(period_ends)s::date[]) "
+             "AS engagement_periods (engagement_id, period_start, period_end)",
+             "accounting_entries.date BETWEEN engagement_periods.period_start AND engagement_periods.period_end")]
+        constraints = [QueryBuilder.equals("accounting_amounts.tenant_id", "tenant_id")]
+
+        if since is not None:
+            constraints.append(self.AMOUNT_CHANGES_CONSTRAINT)
+            params["since"] = since
+
+        return self.query_builder.build_parameterized_query(selects, self.AMOUNT_TABLE, joins, constraints, params)
+
+    @query_caller
+    def get_engagements_periods(self, engagement_ids: List[str]) -> "pd.DataFrame":
+        engagements_info = {engagement_id: self.reference_cache.get(CacheEntities.ENGAGEMENT, engagement_id)
+                            for engagement_id in dict.fromkeys(engagement_ids)}
+
+        missing_ids = [engagement_id for engagement_id, engagement_info in engagements_info.items() if engagement_info is None]
+        if missing_ids:
+            fetched_info = self.db_connection.execute_queries(
+                [(f"SELECT {', '.join(self.ENGAGEMENT_INFO_COLUMNS)} FROM engagements WHERE id = ANY(%(engagement_ids)s);",
+                  {"engagement_ids": QueryBuilder.array_parameter(missing_ids)})])[0]
+
+            for engagement_id, engagement_info in fetched_info.to_dict("index").items():
+                self.reference_cache.set(CacheEntities.ENGAGEMENT, engagement_id, engagement_info)
+                engagements_info[engagement_id] = engagement_info
+
+        periods = [(engagement_id, engagement_info["period_start"], engagement_info["period_end"])
+                   for engagement_id, engagement_info in engagements_info.items() if engagement_info is not None]
+
+        return pd.DataFrame(periods, columns=["id", "period_start", "period_end"]).set_index("id")
+
+    @query_caller
+    def get_flipping_id_amounts(self, amounts_df: "pd.DataFrame", engagement_id: str) -> "pd.DataFrame":
+        return self.filter_flipping_amounts(amounts_df, self.get_fsli_mapping_table(engagement_id))
+
+    @query_caller
+    def get_fsli_amount_table(self, tenant_id: str, engagement_id: str, unmapped: str = UnmappedAccounts.RAISE,
+                              engine: str = FetchEngine.FETCHALL, schema: AmountSchema = None) -> "pd.DataFrame":
+        if unmapped not in (UnmappedAccounts.RAISE, UnmappedAccounts.KEEP, UnmappedAccounts.DROP):
+            raise ValueError(f"Unknown unmapped accounts policy: {unmapped}")
+
+        query = self._build_fsli_amounts_query(tenant_id, engagement_id, mapped_only=unmapped == UnmappedAccounts.DROP)
+        amounts_df = self._execute_amount_query(query, engine, schema)
+
+        unmapped_mask = amounts_df["mapped_account_id"].isna().to_numpy()
+        if unmapped == UnmappedAccounts.RAISE and unmapped_mask.any():
+            raise UnmappedAccountError(pd.unique(amounts_df["account_id"].to_numpy()[unmapped_mask]).tolist())
+
+        return amounts_df.drop(columns="mapped_account_id")
+
+    @query_caller
+    def get_flipping_amount_table(self, tenant_id: str, engagement_id: str, engine: str = FetchEngine.FETCHALL,
+                                  schema: AmountSchema = None) -> "pd.DataFrame":
+        query = self._build_fsli_amounts_query(tenant_id, engagement_id, mapped_only=True, flipping_only=True)
+
+        return self._execute_amount_query(query, engine, schema).drop(columns="mapped_account_id")
+
+    @query_caller
+    def get_account_balances(self, tenant_id: str, engagement_id: str = None, period: str = DatePrecisions.MONTH,
+                             include_discarded: bool = False) -> "pd.DataFrame":
+        query = self._build_balances_query(tenant_id, engagement_id, "accounting_amounts.account_id", "account_id", period,
+                                           include_discarded)
+
+        return self._execute_balances_query(query, "account_id", period)
+
+    @query_caller
+    def get_fsli_balances(self, tenant_id: str, engagement_id: str, period: str = DatePrecisions.MONTH,
+                          unmapped: str = UnmappedAccounts.RAISE, include_discarded: bool = False) -> "pd.DataFrame":
+        if unmapped not in (UnmappedAccounts.RAISE, UnmappedAccounts.KEEP, UnmappedAccounts.DROP):
+            raise ValueError(f"Unknown unmapped accounts policy: {unmapped}")
+
+        extra_selects = [self.UNMAPPED_ACCOUNTS_AGGREGATE] if unmapped == UnmappedAccounts.RAISE else []
+        query = self._build_balances_query(tenant_id, engagement_id, "fsli_mappings.fsli_id", "fsli_id", period,
+                                           include_discarded, [self._build_fsli_mapping_join(unmapped == UnmappedAccounts.DROP)],
+                                           extra_selects)
+        balances_df = self._execute_balances_query(query, "fsli_id", period)
+
+        if unmapped == UnmappedAccounts.RAISE:
+            unmapped_account_ids = balances_df.pop("unmapped_account_ids").dropna()
+            if not unmapped_account_ids.empty:
+                raise UnmappedAccountError(sorted({account_id for account_ids in unmapped_account_ids for account_id in account_ids}))
+
+        return balances_df
+
+    def _build_balances_query(self, tenant_id: str, engagement_id: str, group_column: str, group_alias: str, period: str,
+                              include_discarded: bool, joins: list = None, extra_selects: List[str] = None) -> tuple:
+        group_by = [group_column]
+        selects = [f"{group_column} as {group_alias}"]
+        if period is not None:
+            period_expression = QueryBuilder.date_trunc(period, "accounting_entries.date")
+            group_by.append(period_expression)
+            selects.append(f"{period_expression} as period")
+
+        constraints = [QueryBuilder.equals("accounting_amounts.tenant_id", "tenant_id")]
+        params = {"tenant_id": tenant_id}
+        if engagement_id is not None:
+            engagement_info = self.get_engagement_info(engagement_id)
+            constraints.append(QueryBuilder.between("accounting_entries.date", "period_start", "period_end"))
+            params.update({"engagement_id": engagement_id,
+                           "period_start": engagement_info["period_start"].strftime("%Y-%m-%d"),
+                           "period_end": engagement_info["period_end"].strftime("%Y-%m-%d")})
+        if not include_discarded:
+            constraints.append("accounting_entries.discarded_at IS NULL")
+
+        return self.query_builder.build_parameterized_query(selects + self.BALANCE_AGGREGATES + (extra_selects or []),
+                                                            self.AMOUNT_TABLE, self.BALANCE_JOINS + (joins or []), constraints,
+                                                            params, order_by=group_by, group_by=group_by)
+
+    def _execute_balances_query(self, query: tuple, index_column: str, period: str) -> "pd.DataFrame":
+        balances_df = self.db_connection.execute_queries([query], id_column=index_column)[0]
+        balances_df["amount"] = balances_df["amount"].astype("float64")
+        balances_df["amount_count"] = balances_df["amount_count"].astype("int64")
+        if period is None:
+            return balances_df
+
+        balances_df["period"] = pd.to_datetime(balances_df["period"])
+        return balances_df.set_index("period", append=True)
+
+    def _build_fsli_amounts_query(self, tenant_id: str, engagement_id: str, mapped_only: bool = False,
+                                  flipping_only: bool = False, selects: List[str] = None,
+                                  extra_constraints: List[str] = None) -> tuple:
+        engagement_info = self.get_engagement_info(engagement_id)
+        selects = selects if selects is not None else self.AMOUNT_SELECTS + self.FSLI_MAPPING_SELECTS
+
+        joins = self.AMOUNT_JOINS + [self._build_fsli_mapping_join(mapped_only)]
+        constraints = [QueryBuilder.equals("accounting_amounts.tenant_id", "tenant_id"),
+                       QueryBuilder.between("accounting_entries.date", "period_start", "period_end")]
+        if flipping_only:
+            constraints.append("fsli_mappings.reverse_fsli_id IS NOT NULL")
+        constraints.extend(extra_constraints or [])
+
+        params = {"tenant_id": tenant_id,
+                  "engagement_id": engagement_id,
+                  "period_start": engagement_info["period_start"].strftime("%Y-%m-%d"),
+                  "period_end": engagement_info["period_end"].strftime("%Y-%m-%d")}
+
+        return self.query_builder.build_parameterized_query(selects, self.AMOUNT_TABLE, joins, constraints, params)
+
+    def _build_fsli_mapping_join(self, mapped_only: bool) -> tuple:
+        mapping_subquery = self.query_builder.build_subquery(
+            ["DISTINCT ON (account_mappings.account_id) account_mappings.account_id", "account_mappings.fsli_id",
+             "accounting_fslis.reverse_fsli_id"],
+            "account_mappings",
+            [QueryBuilder.left_join("accounting_fslis", "account_mappings.fsli_id = accounting_fslis.id")],
+            [QueryBuilder.equals("account_mappings.engagement_id", "engagement_id")],
+            "fsli_mappings",
+            order_by=["account_mappings.account_id", "account_mappings.id DESC"])
+        mapping_join = (mapping_subquery, "accounting_amounts.account_id = fsli_mappings.account_id")
+
+        return mapping_join if mapped_only else QueryBuilder.left_join(*mapping_join)
+
+    @staticmethod
+    def filter_flipping_amounts(amounts_df: "pd.DataFrame", mapping_table: "pd.DataFrame") -> "pd.DataFrame":
+        flipping_accounts = mapping_table.index[mapping_table["reverse_fsli_id"].notna()]
+
+        flip_amounts_table = amounts_df[amounts_df["account_id"].isin(flipping_accounts)]
 
         return flip_amounts_table
 
     def _get_mapping_dict(self, engagement_id: str) -> dict:
-        mapping_dict = {}
+        return self.get_fsli_mapping_table(engagement_id).to_dict("index")
+
+    @query_caller
+    def _get_account_mappings(self, engagement_id: str) -> "pd.DataFrame":
+        query_mapping = self._build_account_mappings_query(engagement_id)
 
-        query_mapping = f"SELECT id, account_id, fsli_id FROM account_mappings WHERE engagement_id = '{engagement_id}';"
-        account_mappings = self.db_connection.execute_queries([query_mapping])[0]
+        return self.reference_cache.get_or_load(CacheEntities.ACCOUNT_MAPPINGS, engagement_id,
+                                                lambda: self.db_connection.execute_queries([query_mapping])[0])
 
-        query_fsli = "SELECT id ,reverse_fsli_id FROM accounting_fslis;"
-        accounting_fslis = self.db_connection.execute_queries([query_fsli])[0]
+    def _build_account_mappings_query(self, engagement_id: str) -> tuple:
+        return (f"SELECT {', '.join(self.ACCOUNT_MAPPING_COLUMNS)} FROM account_mappings WHERE engagement_id = %(engagement_id)s;",
+                {"engagement_id": engagement_id})
 
-        for account_id, fsli_id in zip(account_mappings["account_id"], account_mappings["fsli_id"]):
-            reverse_fsli = accounting_fslis.loc[fsli_id].reverse_fsli_id
-            mapping_dict[account_id] = {
-                "fsli_id": fsli_id, "reverse_fsli_id": reverse_fsli}
+    @query_caller
+    def _get_accounting_fslis(self) -> "pd.DataFrame":
+        query_fsli = self._build_accounting_fslis_query()
 
-        return mapping_dict
+        return self.reference_cache.get_or_load(CacheEntities.ACCOUNTING_FSLIS, None,
+                                                lambda: self.db_connection.execute_queries([query_fsli])[0])
 
+    def _build_accounting_fslis_query(self) -> str:
+        return f"SELECT {', '.join(self.ACCOUNTING_FSLI_COLUMNS)} FROM accounting_fslis;"
+
+    @query_caller
     def get_engagement_info(self, engagement_id: str) -> dict:
+        engagement_info = self.reference_cache.get_or_load(CacheEntities.ENGAGEMENT, engagement_id,
+                                                           lambda: self._fetch_engagement_info(engagement_id))
+
+        return dict(engagement_info)
+
+    def _fetch_engagement_info(self, engagement_id: str) -> dict:
         engagement_info = self.db_connection.execute_queries(
-            [f"SELECT id, period_start, period_end, type, organization_id, multi_currency, tax_services, materiality FROM engagements WHERE id = '{engagement_id}';"])[0]
+            [(f"SELECT {', '.join(self.ENGAGEMENT_INFO_COLUMNS)} FROM engagements WHERE id = %(engagement_id)s;",
+              {"engagement_id": engagement_id})])[0]
 
         return engagement_info.to_dict("records")[0]
 
+    @query_caller
     def get_organization_info(self, organization_id: str) -> dict:
+        organization_info = self.reference_cache.get_or_load(CacheEntities.ORGANIZATION, organization_id,
+                                                             lambda: self._fetch_organization_info(organization_id))
+
+        return dict(organization_info)
+
+    def _fetch_organization_info(self, organization_id: str) -> dict:
         organization_info = self.db_connection.execute_queries(
-            [f"SELECT id, financial_year_end_day, financial_year_end_month, business_type FROM organizations WHERE id = '{organization_id}';"])[0]
+            [(f"SELECT {', '.join(self.ORGANIZATION_INFO_COLUMNS)} FROM organizations WHERE id = %(organization_id)s;",
+              {"organization_id": organization_id})])[0]
 
         return organization_info.to_dict("records")[0]
+
+    # The batch round trip goes through JSON, so convert back to the date and Decimal values execute_queries returns
+    # before sharing the row with get_engagement_info through the engagement cache.
+    @classmethod
+    def _restore_engagement_types(cls, engagement_info: dict) -> dict:
+        engagement_info = dict(engagement_info)
+        for column in cls.ENGAGEMENT_DATE_COLUMNS:
+            if column in engagement_info:
+                value = engagement_info[column]
+                engagement_info[column] = None if pd.isna(value) else pd.Timestamp(value).date()
+        if "materiality" in engagement_info:
+            value = engagement_info["materiality"]
+            engagement_info["materiality"] = None if pd.isna(value) else Decimal(str(value))
+
+        return engagement_info
+
+    @query_caller
+    def get_engagement_context(self, engagement_id: str) -> tuple:
+        engagement_info = self.reference_cache.get(CacheEntities.ENGAGEMENT, engagement_id)
+        if engagement_info is not None:
+            return dict(engagement_info), self.get_organization_info(engagement_info["organization_id"])
+
+        engagement_query = (f"SELECT {', '.join(self.ENGAGEMENT_INFO_COLUMNS)} FROM engagements WHERE id = %(engagement_id)s;",
+                            {"engagement_id": engagement_id})
+        organization_query = (f"SELECT {', '.join(self.ORGANIZATION_INFO_COLUMNS)} FROM organizations "
+                              "WHERE id = (SELECT organization_id FROM engagements WHERE id = %(engagement_id)s);",
+                              {"engagement_id": engagement_id})
+        engagements_info, organizations_info = self.db_connection.execute_batch(
+            [engagement_query, organization_query], columns=[self.ENGAGEMENT_INFO_COLUMNS, self.ORGANIZATION_INFO_COLUMNS],
+            parse_dates=self.ENGAGEMENT_DATE_COLUMNS)
+
+        engagement_info = self._restore_engagement_types(engagements_info.to_dict("records")[0])
+        self.reference_cache.set(CacheEntities.ENGAGEMENT, engagement_id, engagement_info)
+        organization_info = None
+        if not organizations_info.empty:
+            organization_info = organizations_info.to_dict("records")[0]
+            self.reference_cache.set(CacheEntities.ORGANIZATION, engagement_info["organization_id"], organization_info)
+
+        return dict(engagement_info), dict(organization_info) if organization_info is not None else None
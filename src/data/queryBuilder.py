@@ -1,3 +1,28 @@
+from psycopg2 import sql
+
+
+
+
+class JoinTypes:
+    INNER="JOIN"
+    LEFT="LEFT JOIN"
+
+
+class AggregateFunctions:
+    SUM="sum"
+    COUNT="count"
+    MIN="min"
+    MAX="max"
+    AVG="avg"
+    ARRAY_AGG="array_agg"
+
+
+class DatePrecisions:
+    DAY="day"
+    WEEK="week"
+    MONTH="month"
+    QUARTER="quarter"
+    YEAR="year"
 
 
 class QueryBuilder:
@@ -7,6 +32,85 @@ class QueryBuilder:
     def build_query(self, selects, table, joins, constraints):
         return f"{self._build_selects(selects)} {self._build_froms( table, joins)} {self._build_constraints(constraints)};"
 
+    def build_parameterized_query(self, selects, table, joins, constraints, params=None, order_by=None, group_by=None):
+        query = self._build_parameterized_body(selects, table, joins, constraints, order_by, group_by)
+
+        return query + sql.SQL(";"), dict(params or {})
+
+    def build_subquery(self, selects, table, joins, constraints, alias, order_by=None, group_by=None):
+        return sql.SQL("({}) AS {}").format(self._build_parameterized_body(selects, table, joins, constraints, order_by, group_by),
+                                            sql.SQL(alias))
+
+    @staticmethod
+    def left_join(table, condition):
+        return table, condition, JoinTypes.LEFT
+
+    @staticmethod
+    def equals(column, parameter_name):
+        return sql.SQL("{} = {}").format(QueryBuilder._column(column), sql.Placeholder(parameter_name))
+
+    @staticmethod
+    def between(column, start_parameter_name, end_parameter_name):
+        return sql.SQL("{} BETWEEN {} AND {}").format(QueryBuilder._column(column), sql.Placeholder(start_parameter_name),
+                                                      sql.Placeholder(end_parameter_name))
+
+    @staticmethod
+    def in_array(column, parameter_name):
+        return sql.SQL("{} = ANY({})").format(QueryBuilder._column(column), sql.Placeholder(parameter_name))
+
+    @staticmethod
+    def aggregate(function, column, alias, distinct=False, where=None):
+        if function not in (AggregateFunctions.SUM, AggregateFunctions.COUNT, AggregateFunctions.MIN, AggregateFunctions.MAX,
+                            AggregateFunctions.AVG, AggregateFunctions.ARRAY_AGG):
+            raise ValueError(f"Unknown aggregate function: {function}")
+
+        aggregate_filter = f" FILTER (WHERE {where})" if where is not None else ""
+        return f"{function}({'DISTINCT ' if distinct else ''}{column}){aggregate_filter} AS {alias}"
+
+    @staticmethod
+    def date_trunc(precision, column):
+        if precision not in (DatePrecisions.DAY, DatePrecisions.WEEK, DatePrecisions.MONTH, DatePrecisions.QUARTER,
+                             DatePrecisions.YEAR):
+            raise ValueError(f"Unknown date precision: {precision}")
+
+        return f"date_trunc('{precision}', {column})::date"
+
+    @staticmethod
+    def array_parameter(values):
+        escaped_values = ['"' + str(value).replace("\\", "\\\\").replace('"', '\\"') + '"' for value in values]
+        return "{" + ",".join(escaped_values) + "}"
+
+    def _build_parameterized_body(self, selects, table, joins, constraints, order_by=None, group_by=None):
+        query_parts = [sql.SQL(self._build_selects(selects)), self._build_parameterized_froms(table, joins)]
+        if constraints is not None:
+            query_parts.append(sql.SQL("WHERE ") + sql.SQL(" AND ").join([self._to_composable(c) for c in constraints]))
+        if group_by is not None:
+            query_parts.append(sql.SQL(f"GROUP BY {', '.join(group_by)}"))
+        if order_by is not None:
+            query_parts.append(sql.SQL(f"ORDER BY {', '.join(order_by)}"))
+
+        return sql.SQL(" ").join(query_parts)
+
+    def _build_parameterized_froms(self, table, joins=None):
+        froms = [sql.SQL("FROM ") + self._to_composable(table)]
+        for join in joins or []:
+            join_table, condition = join[0], join[1]
+            join_type = join[2] if len(join) > 2 else JoinTypes.INNER
+            froms.append(sql.SQL(f"{join_type} ") + self._to_composable(join_table) + sql.SQL(" ON ")
+                         + self._to_composable(condition))
+
+        return sql.SQL(" ").join(froms)
+
+    @staticmethod
+    def _column(column):
+        return sql.SQL(column)
+
+    @staticmethod
+    def _to_composable(constraint):
+        if isinstance(constraint, sql.Composable):
+            return constraint
+        return sql.SQL(constraint)
+
     def _build_selects(self, selects=None):
         if selects is not None:
             return f"SELECT {', '.join(selects)}"
@@ -15,7 +119,7 @@ class QueryBuilder:
 
     def _build_froms(self,  table, joins=None):
         if joins is not None:
-            joins_query = " ".join([f"JOIN {f[0]} ON {f[1]}" for f in joins])
+            joins_query = " ".join([f"{f[2] if len(f) > 2 else JoinTypes.INNER} {f[0]} ON {f[1]}" for f in joins])
             return f"FROM {table} {joins_query}"
         else:
             return f"FROM {table}"
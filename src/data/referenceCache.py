@@ -0,0 +1,67 @@
+from src.utilities.lruCache import LRUCache
+
+
+class CacheEntities:
+    ENGAGEMENT="engagement"
+    ORGANIZATION="organization"
+    ACCOUNT_MAPPINGS="account_mappings"
+    ACCOUNTING_FSLIS="accounting_fslis"
+    FSLI_MAPPING_TABLE="fsli_mapping_table"
+
+
+class ReferenceCache:
+    DEFAULT_TTLS = {CacheEntities.ENGAGEMENT: 300,
+                    CacheEntities.ORGANIZATION: 300,
+                    CacheEntities.ACCOUNT_MAPPINGS: 300,
+                    CacheEntities.ACCOUNTING_FSLIS: 3600,
+                    CacheEntities.FSLI_MAPPING_TABLE: 300}
+    DEFAULT_MAX_SIZES = {CacheEntities.ENGAGEMENT: 1024,
+                         CacheEntities.ORGANIZATION: 1024,
+                         CacheEntities.ACCOUNT_MAPPINGS: 128,
+                         CacheEntities.ACCOUNTING_FSLIS: 1,
+                         CacheEntities.FSLI_MAPPING_TABLE: 128}
+
+    def __init__(self, ttls: dict = None, max_sizes: dict = None):
+        ttls = {**self.DEFAULT_TTLS, **(ttls or {})}
+        max_sizes = {**self.DEFAULT_MAX_SIZES, **(max_sizes or {})}
+
+        self.caches = {entity: LRUCache(max_size=max_sizes[entity], ttl=ttls[entity]) for entity in self.DEFAULT_TTLS}
+
+    def get(self, entity: str, key):
+        return self.caches[entity].get(key)
+
+    def set(self, entity: str, key, value):
+        self.caches[entity].set(key, value)
+
+    def get_or_load(self, entity: str, key, loader):
+        return self.caches[entity].get_or_load(key, loader)
+
+    def invalidate_engagement(self, engagement_id: str):
+        self.caches[CacheEntities.ENGAGEMENT].invalidate(engagement_id)
+        self.caches[CacheEntities.ACCOUNT_MAPPINGS].invalidate(engagement_id)
+        self.caches[CacheEntities.FSLI_MAPPING_TABLE].invalidate(engagement_id)
+
+    def invalidate_organization(self, organization_id: str):
+        self.caches[CacheEntities.ORGANIZATION].invalidate(organization_id)
+
+    def invalidate_fslis(self):
+        self.caches[CacheEntities.ACCOUNTING_FSLIS].clear()
+        self.caches[CacheEntities.FSLI_MAPPING_TABLE].clear()
+
+    def clear(self):
+        for cache in self.caches.values():
+            cache.clear()
+
+    def stats(self) -> dict:
+        return {entity: {**cache.stats.to_dict(), "size": len(cache)} for entity, cache in self.caches.items()}
+
+
+class NoReferenceCache(ReferenceCache):
+    def get(self, entity: str, key):
+        return None
+
+    def set(self, entity: str, key, value):
+        pass
+
+    def get_or_load(self, entity: str, key, loader):
+        return loader()
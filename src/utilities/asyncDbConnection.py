@@ -0,0 +1,36 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from src.utilities.dbConnection import DatabaseConnection, FetchEngine
+
+
+class AsyncDatabaseConnection:
+    def __init__(self, db_connection: DatabaseConnection, max_concurrency: int = None):
+        if max_concurrency is None:
+            max_concurrency = db_connection.pool.max_size if db_connection.pool is not None else 10
+
+        self.db_connection = db_connection
+        self.max_concurrency = max_concurrency
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="async_db")
+
+    @classmethod
+    def pooled(cls, database_config, min_size=1, max_size=10, **options):
+        return cls(DatabaseConnection.pooled(database_config, min_size=min_size, max_size=max_size, **options))
+
+    async def run(self, function, *args, **kwargs):
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(function, *args, **kwargs))
+
+    async def execute_queries(self, queries, id_column="id"):
+        return await self.run(self.db_connection.execute_queries, queries, id_column)
+
+    async def execute_query(self, query, id_column="id", engine=FetchEngine.FETCHALL, **engine_options):
+        return await self.run(self.db_connection.execute_query, query, id_column, engine, **engine_options)
+
+    async def execute_queries_concurrently(self, queries, id_column="id"):
+        return list(await asyncio.gather(*[self.execute_query(query, id_column) for query in queries]))
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        self.db_connection.close()
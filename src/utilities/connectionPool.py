@@ -0,0 +1,194 @@
+import threading
+import time
+from contextlib import contextmanager
+
+import psycopg2 as psg
+
+
+class PoolTimeoutError(Exception):
+    pass
+
+
+class PoolStatistics:
+    def __init__(self):
+        self.checkouts = 0
+        self.waits = 0
+        self.wait_time = 0.0
+        self.connects = 0
+        self.reconnects = 0
+        self.discarded = 0
+
+    def to_dict(self) -> dict:
+        return dict(vars(self))
+
+
+class ConnectionPool:
+    def __init__(self, database_config, min_size=1, max_size=10, connect_timeout=5,
+                 health_check_interval=30.0, checkout_timeout=None):
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError(f"Invalid pool size: min_size={min_size}, max_size={max_size}")
+
+        self.database_config = database_config
+        self.min_size = min_size
+        self.max_size = max_size
+        self.connect_timeout = connect_timeout
+        self.health_check_interval = health_check_interval
+        self.checkout_timeout = checkout_timeout
+        self.stats = PoolStatistics()
+
+        self._idle = []
+        self._size = 0
+        self._closed = False
+        self._condition = threading.Condition()
+
+    @contextmanager
+    def connection(self):
+        connection = self.checkout()
+        broken = False
+        try:
+            yield connection
+        except Exception:
+            broken = True
+            raise
+        finally:
+            self.checkin(connection, broken=broken)
+
+    def checkout(self):
+        with self._condition:
+            self._raise_if_closed()
+            self.stats.checkouts += 1
+
+            if not self._idle and self._size >= self.max_size:
+                self.stats.waits += 1
+                wait_start = time.monotonic()
+                ready = self._condition.wait_for(lambda: self._closed or self._idle or self._size < self.max_size,
+                                                 timeout=self.checkout_timeout)
+                self.stats.wait_time += time.monotonic() - wait_start
+                if not ready:
+                    raise PoolTimeoutError(f"No connection available after {self.checkout_timeout}s")
+                self._raise_if_closed()
+
+            if self._idle:
+                connection, last_used = self._idle.pop()
+            else:
+                connection, last_used = None, None
+                self._size += 1
+
+        if connection is None:
+            try:
+                connection = self._connect()
+            except Exception:
+                self._release_slot()
+                raise
+            with self._condition:
+                self.stats.connects += 1
+            self._fill_min_size()
+            return connection
+
+        return self._ensure_healthy(connection, last_used)
+
+    def checkin(self, connection, broken=False):
+        if not broken and not connection.closed:
+            try:
+                connection.rollback()
+            except psg.Error:
+                broken = True
+
+        if broken or connection.closed:
+            self._discard(connection)
+            return
+
+        with self._condition:
+            if self._closed:
+                self._size -= 1
+                connection.close()
+                return
+            self._idle.append((connection, time.monotonic()))
+            self._condition.notify()
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+            self._condition.notify_all()
+
+        for connection, _ in idle:
+            connection.close()
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @property
+    def idle_size(self) -> int:
+        return len(self._idle)
+
+    def _connect(self):
+        return psg.connect(**self.database_config, connect_timeout=self.connect_timeout)
+
+    def _ensure_healthy(self, connection, last_used):
+        stale = time.monotonic() - last_used > self.health_check_interval
+        if not connection.closed and (not stale or self._ping(connection)):
+            return connection
+
+        try:
+            connection.close()
+        except psg.Error:
+            pass
+
+        try:
+            connection = self._connect()
+        except Exception:
+            self._release_slot()
+            raise
+
+        with self._condition:
+            self.stats.reconnects += 1
+        return connection
+
+    def _ping(self, connection) -> bool:
+        try:
+            cursor = connection.cursor()
+            cursor.execute("SELECT 1;")
+            cursor.close()
+            connection.rollback()
+            return True
+        except psg.Error:
+            return False
+
+    def _fill_min_size(self):
+        while True:
+            with self._condition:
+                if self._closed or self._size >= self.min_size:
+                    return
+                self._size += 1
+
+            try:
+                connection = self._connect()
+            except Exception:
+                self._release_slot()
+                return
+
+            with self._condition:
+                self.stats.connects += 1
+            self.checkin(connection)
+
+    def _discard(self, connection):
+        try:
+            connection.close()
+        except psg.Error:
+            pass
+
+        with self._condition:
+            self.stats.discarded += 1
+        self._release_slot()
+
+    def _release_slot(self):
+        with self._condition:
+            self._size -= 1
+            self._condition.notify()
+
+    def _raise_if_closed(self):
+        if self._closed:
+            raise psg.InterfaceError("Connection pool is closed")
@@ -1,39 +1,365 @@
-import pandas as pd
+import io
+import json
+import re
+import tempfile
+import time
+import uuid
+from contextlib import contextmanager
+from decimal import Decimal
+
 import psycopg2 as psg
 
+from src.utilities.connectionPool import ConnectionPool
+from src.utilities.hostRouter import HostRouter, RoutingStrategies, host_name
+from src.utilities.lazyImport import lazy_import
+from src.utilities.preparedStatements import PreparedStatementCache
+from src.utilities.queryCache import QueryResultCache
+from src.utilities.queryInstrumentation import QueryEvent, QueryPhases, current_call_path, notify_observers
+
+pd = lazy_import("pandas")
+
+
 class DbConstants:
     PSQL_HOST="PSQL_HOST"
     PSQL_USER="PSQL_USER"
     PSQL_PORT="PSQL_PORT"
     PSQL_DATABASE="PSQL_DATABASE"
     PSQL_PWD="PSQL_PWD"
+    PSQL_POOL_MIN_SIZE="PSQL_POOL_MIN_SIZE"
+    PSQL_POOL_MAX_SIZE="PSQL_POOL_MAX_SIZE"
+    PSQL_REPLICA_HOSTS="PSQL_REPLICA_HOSTS"
+    PSQL_ROUTING_STRATEGY="PSQL_ROUTING_STRATEGY"
+
+
+class FetchEngine:
+    FETCHALL="fetchall"
+    COPY="copy"
+    ARROW="arrow"
 
 
 class DatabaseConnection:
-    def __init__(self, database_config):
+    BATCH_PARAMETER_PATTERN = re.compile(r"%\((\w+)\)s")
+
+    def __init__(self, database_config, pool: ConnectionPool = None, prepare_statements: bool = False, observers=None,
+                 query_cache: QueryResultCache = None, router: HostRouter = None):
         self.database_config = database_config
+        self.pool = pool
+        self.prepared_statements = PreparedStatementCache() if prepare_statements else None
+        self.observers = list(observers or [])
+        self.query_cache = query_cache
+        self.router = router
+
+    @classmethod
+    def pooled(cls, database_config, min_size=1, max_size=10, prepare_statements=False, observers=None, query_cache=None,
+               **pool_options):
+        return cls(database_config, pool=ConnectionPool(database_config, min_size=min_size, max_size=max_size, **pool_options),
+                   prepare_statements=prepare_statements, observers=observers, query_cache=query_cache)
+
+    @classmethod
+    def routed(cls, primary_config, replica_configs, strategy=RoutingStrategies.ROUND_ROBIN, min_size=1, max_size=10,
+               prepare_statements=False, observers=None, query_cache=None, **router_options):
+        router = HostRouter(primary_config, replica_configs, strategy=strategy,
+                            pool_options={"min_size": min_size, "max_size": max_size}, **router_options)
+        return cls(primary_config, prepare_statements=prepare_statements, observers=observers, query_cache=query_cache,
+                   router=router)
+
+    def add_observer(self, observer):
+        self.observers.append(observer)
+
+    def remove_observer(self, observer):
+        self.observers.remove(observer)
 
 
     def _connect(self):
         return psg.connect(**self.database_config, connect_timeout = 5)
 
+    # Every query issued here is a read, so a router may send it to any replica.
+    @contextmanager
+    def _connection(self):
+        if self.router is not None:
+            with self.router.connection(read_only=True) as (host, connection):
+                yield host, connection
+            return
+
+        if self.pool is not None:
+            with self.pool.connection() as connection:
+                yield host_name(self.database_config), connection
+            return
 
-    def execute_queries(self, queries, id_column="id"):
         connection = self._connect()
-        cursor = connection.cursor()
+        try:
+            yield host_name(self.database_config), connection
+        finally:
+            connection.close()
+
 
+    def execute_queries(self, queries, id_column="id"):
+        return self._cached_queries("fetchall", queries, [{"id_column": id_column}] * len(queries),
+                                    lambda indexes: self._execute_queries([queries[index] for index in indexes], id_column))
+
+    def _execute_queries(self, queries, id_column):
         queries_result = []
-        for query in queries:
-            cursor.execute(query)
-            columns = [desc[0] for desc in cursor.description]
-            result = cursor.fetchall()
+        connect_start = time.perf_counter()
+        with self._connection() as (host, connection):
+            connect_time = time.perf_counter() - connect_start
+            cursor = connection.cursor()
+
+            for query in queries:
+                execute_start = time.perf_counter()
+                self._execute(connection, cursor, query)
+                fetch_start = time.perf_counter()
+                columns = [desc[0] for desc in cursor.description]
+                result = cursor.fetchall()
+                dataframe_start = time.perf_counter()
+
+                df = pd.DataFrame(result, columns=columns)
+                df = df.set_index(id_column)
+
+                self._record_query(cursor, host, query, {QueryPhases.CONNECT: connect_time,
+                                                         QueryPhases.EXECUTE: fetch_start - execute_start,
+                                                         QueryPhases.FETCH: dataframe_start - fetch_start,
+                                                         QueryPhases.DATAFRAME: time.perf_counter() - dataframe_start},
+                                   len(df), self._frame_bytes(df))
+                connect_time = 0.0
+
+                queries_result.append(df)
+
+            cursor.close()
+
+        return queries_result
+
+    def execute_batch(self, queries, id_column="id", columns=None, parse_dates=None):
+        columns = columns if columns is not None else [None] * len(queries)
+        options = [{"id_column": id_column, "columns": query_columns, "parse_dates": parse_dates} for query_columns in columns]
+        return self._cached_queries("batch", queries, options,
+                                    lambda indexes: self._execute_batch([queries[index] for index in indexes], id_column,
+                                                                        [columns[index] for index in indexes], parse_dates))
+
+    def _execute_batch(self, queries, id_column, columns, parse_dates):
+        connect_start = time.perf_counter()
+        with self._connection() as (host, connection):
+            execute_start = time.perf_counter()
+            cursor = connection.cursor()
+            batch_query = self._build_batch_query(cursor, queries)
+            self._execute(connection, cursor, batch_query)
+            fetch_start = time.perf_counter()
+            results = cursor.fetchone()
+            cursor.close()
+
+        dataframe_start = time.perf_counter()
+        queries_result = [self._batch_result_to_frame(rows, query_columns, id_column, parse_dates or [])
+                          for rows, query_columns in zip(results, columns)]
+
+        self._record_query(cursor, host, batch_query, {QueryPhases.CONNECT: execute_start - connect_start,
+                                                       QueryPhases.EXECUTE: fetch_start - execute_start,
+                                                       QueryPhases.FETCH: dataframe_start - fetch_start,
+                                                       QueryPhases.DATAFRAME: time.perf_counter() - dataframe_start},
+                           sum(len(df) for df in queries_result), sum(self._frame_bytes(df) for df in queries_result))
+
+        return queries_result
+
+    def execute_query_chunks(self, query, chunk_size=100000, id_column="id"):
+        call_path = current_call_path()
+        connect_start = time.perf_counter()
+        with self._connection() as (host, connection):
+            phases = {QueryPhases.CONNECT: time.perf_counter() - connect_start,
+                      QueryPhases.EXECUTE: 0.0, QueryPhases.FETCH: 0.0, QueryPhases.DATAFRAME: 0.0}
+            rows, bytes_estimated = 0, 0
+            cursor = connection.cursor(name=f"chunk_cursor_{uuid.uuid4().hex}")
+            cursor.itersize = chunk_size
+            try:
+                execute_start = time.perf_counter()
+                cursor.execute(*self._split_query(query))
+                phases[QueryPhases.EXECUTE] = time.perf_counter() - execute_start
+                columns = None
+                while True:
+                    fetch_start = time.perf_counter()
+                    result = cursor.fetchmany(chunk_size)
+                    dataframe_start = time.perf_counter()
+                    phases[QueryPhases.FETCH] += dataframe_start - fetch_start
+                    if not result:
+                        break
+
+                    if columns is None:
+                        columns = [desc[0] for desc in cursor.description]
+
+                    df = pd.DataFrame(result, columns=columns).set_index(id_column)
+                    phases[QueryPhases.DATAFRAME] += time.perf_counter() - dataframe_start
+                    rows += len(df)
+                    bytes_estimated += self._frame_bytes(df)
+                    yield df
+
+                self._record_query(cursor, host, query, phases, rows, bytes_estimated, call_path)
+            finally:
+                cursor.close()
+
+    def execute_query_copy(self, query, id_column="id", dtypes=None, parse_dates=None, spool_max_size=None):
+        return self._cached("copy", query, {"id_column": id_column, "dtypes": dtypes, "parse_dates": parse_dates},
+                            lambda: self._execute_query_copy(query, id_column, dtypes, parse_dates, spool_max_size))
+
+    def _execute_query_copy(self, query, id_column, dtypes, parse_dates, spool_max_size):
+        with self._copy_buffer(spool_max_size) as buffer:
+            cursor, host, phases = self._copy_to_buffer(query, buffer)
 
-            df = pd.DataFrame(result, columns=columns)
+            dataframe_start = time.perf_counter()
+            df = pd.read_csv(buffer, dtype=dtypes, parse_dates=parse_dates, keep_default_na=False, na_values=[""])
             df = df.set_index(id_column)
-            
-            queries_result.append(df)
+            phases[QueryPhases.DATAFRAME] = time.perf_counter() - dataframe_start
 
-        cursor.close()
-        connection.close()
+            self._record_query(cursor, host, query, phases, len(df), self._frame_bytes(df))
+
+        return df
+
+    def execute_query_arrow(self, query, column_types=None, spool_max_size=None):
+        return self._cached("arrow", query, {"column_types": column_types},
+                            lambda: self._execute_query_arrow(query, column_types, spool_max_size))
+
+    def _execute_query_arrow(self, query, column_types, spool_max_size):
+        from pyarrow import csv
+
+        with self._copy_buffer(spool_max_size) as buffer:
+            cursor, host, phases = self._copy_to_buffer(query, buffer)
+
+            table_start = time.perf_counter()
+            table = csv.read_csv(buffer, convert_options=csv.ConvertOptions(column_types=column_types or {}, null_values=[""],
+                                                                            strings_can_be_null=True,
+                                                                            quoted_strings_can_be_null=False))
+            phases[QueryPhases.DATAFRAME] = time.perf_counter() - table_start
+
+            self._record_query(cursor, host, query, phases, table.num_rows, table.nbytes if self.observers else 0)
+
+        return table
+
+    def execute_query_arrow_frame(self, query, id_column="id", column_types=None, spool_max_size=None):
+        # Frames are cached rather than tables because arrow_to_frame destroys the table it converts.
+        return self._cached("arrow_frame", query, {"id_column": id_column, "column_types": column_types},
+                            lambda: self.arrow_to_frame(self._execute_query_arrow(query, column_types, spool_max_size),
+                                                        id_column))
+
+    @staticmethod
+    def arrow_to_frame(table, id_column="id"):
+        df = table.to_pandas(split_blocks=True, self_destruct=True, date_as_object=False)
+
+        return df.set_index(id_column)
+
+    def execute_query(self, query, id_column="id", engine=FetchEngine.FETCHALL, **engine_options):
+        if engine == FetchEngine.FETCHALL:
+            return self.execute_queries([query], id_column)[0]
+        if engine == FetchEngine.COPY:
+            return self.execute_query_copy(query, id_column, **engine_options)
+        if engine == FetchEngine.ARROW:
+            return self.execute_query_arrow_frame(query, id_column, **engine_options)
+
+        raise ValueError(f"Unknown fetch engine: {engine}")
+
+    def _cached(self, kind, query, options, loader):
+        if self.query_cache is None:
+            return loader()
+
+        return self.query_cache.get_or_load(kind, query, loader, options)
+
+    def _cached_queries(self, kind, queries, options, loader):
+        if self.query_cache is None:
+            return loader(range(len(queries)))
+
+        keys = [self.query_cache.make_key(kind, query, query_options) for query, query_options in zip(queries, options)]
+        queries_result = [self.query_cache.get(key) for key in keys]
+        missing = [index for index, df in enumerate(queries_result) if df is None]
+        if missing:
+            for index, df in zip(missing, loader(missing)):
+                queries_result[index] = self.query_cache.set(keys[index], df)
 
         return queries_result
+
+    @staticmethod
+    def _copy_buffer(spool_max_size):
+        return io.BytesIO() if spool_max_size is None else tempfile.SpooledTemporaryFile(max_size=spool_max_size)
+
+    def _copy_to_buffer(self, query, buffer):
+        connect_start = time.perf_counter()
+        with self._connection() as (host, connection):
+            execute_start = time.perf_counter()
+            cursor = connection.cursor()
+            query_text = self._inline_parameters(cursor, query)
+            copy_query = f"COPY ({query_text.strip().rstrip(';').strip()}) TO STDOUT WITH (FORMAT csv, HEADER true)"
+            cursor.copy_expert(copy_query, buffer)
+            cursor.close()
+
+        buffer.seek(0)
+        return cursor, host, {QueryPhases.CONNECT: execute_start - connect_start,
+                              QueryPhases.FETCH: time.perf_counter() - execute_start}
+
+    def _build_batch_query(self, cursor, queries):
+        result_columns = []
+        batch_params = {}
+        for index, query in enumerate(queries):
+            query, params = self._split_query(query)
+            query_text = query if isinstance(query, str) else query.as_string(cursor)
+            query_text = query_text.strip().rstrip(";").strip()
+
+            if params is None:
+                query_text = query_text.replace("%", "%%")
+            else:
+                query_text = self.BATCH_PARAMETER_PATTERN.sub(lambda match: f"%(q{index}_{match.group(1)})s", query_text)
+                batch_params.update({f"q{index}_{name}": value for name, value in params.items()})
+
+            # Fetched as text so numeric values are parsed to Decimal rather than through float.
+            result_columns.append(f"(SELECT coalesce(json_agg(batch_rows), '[]'::json)::text FROM ({query_text}) AS batch_rows) "
+                                  f"AS result_{index}")
+
+        return f"SELECT {', '.join(result_columns)};", batch_params
+
+    @staticmethod
+    def _batch_result_to_frame(rows, columns, id_column, parse_dates):
+        rows = json.loads(rows, parse_float=Decimal)
+        if columns is None:
+            columns = list(rows[0]) if rows else [id_column]
+
+        df = pd.DataFrame(rows, columns=columns)
+        for column in parse_dates:
+            if column in df.columns:
+                df[column] = pd.to_datetime(df[column])
+
+        return df.set_index(id_column)
+
+    def _record_query(self, cursor, host, query, phases, rows, bytes_estimated, call_path=None):
+        if self.router is not None:
+            self.router.record_latency(host, phases.get(QueryPhases.EXECUTE, 0.0) + phases.get(QueryPhases.FETCH, 0.0))
+        if not self.observers:
+            return
+
+        query, params = self._split_query(query)
+        query_text = query if isinstance(query, str) else query.as_string(cursor)
+        event = QueryEvent(query_text, params, phases, rows, bytes_estimated,
+                           call_path if call_path is not None else current_call_path(), host)
+        notify_observers(self.observers, event)
+
+    def _frame_bytes(self, df) -> int:
+        return int(df.memory_usage(index=True).sum()) if self.observers else 0
+
+    def _execute(self, connection, cursor, query):
+        query, params = self._split_query(query)
+        if params is not None and self.prepared_statements is not None:
+            self.prepared_statements.execute(connection, cursor, query, params)
+        else:
+            cursor.execute(query, params)
+
+    @staticmethod
+    def _split_query(query):
+        if isinstance(query, tuple):
+            return query
+        return query, None
+
+    @staticmethod
+    def _inline_parameters(cursor, query):
+        query, params = DatabaseConnection._split_query(query)
+        if params is None:
+            return query if isinstance(query, str) else query.as_string(cursor)
+
+        return cursor.mogrify(query, params).decode(psg.extensions.encodings.get(cursor.connection.encoding, "utf-8"))
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.close()
+        if self.router is not None:
+            self.router.close()
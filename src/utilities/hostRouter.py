@@ -0,0 +1,136 @@
+import itertools
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+import psycopg2 as psg
+
+from src.utilities.connectionPool import ConnectionPool
+
+logger = logging.getLogger(__name__)
+
+
+class RoutingStrategies:
+    ROUND_ROBIN="round_robin"
+    LEAST_LATENCY="least_latency"
+
+
+class NoHostAvailableError(psg.OperationalError):
+    pass
+
+
+class HostStatistics:
+    def __init__(self):
+        self.queries = 0
+        self.failures = 0
+        self.latency = None
+        self.down_until = 0.0
+
+    def to_dict(self) -> dict:
+        return dict(vars(self))
+
+
+def host_name(database_config) -> str:
+    return f"{database_config.get('host')}:{database_config.get('port', 5432)}"
+
+
+class HostRouter:
+    def __init__(self, primary_config, replica_configs=None, strategy=RoutingStrategies.ROUND_ROBIN, pool_options=None,
+                 connect_timeout=5, failure_cooldown=30.0, latency_smoothing=0.2, clock=time.monotonic):
+        if strategy not in (RoutingStrategies.ROUND_ROBIN, RoutingStrategies.LEAST_LATENCY):
+            raise ValueError(f"Unknown routing strategy: {strategy}")
+
+        self.primary = host_name(primary_config)
+        self.replicas = [host_name(config) for config in replica_configs or []]
+        self.configs = {self.primary: primary_config,
+                        **{host_name(config): config for config in replica_configs or []}}
+        self.strategy = strategy
+        self.connect_timeout = connect_timeout
+        self.failure_cooldown = failure_cooldown
+        self.latency_smoothing = latency_smoothing
+        self.stats = {host: HostStatistics() for host in self.configs}
+        self.pools = None
+        if pool_options is not None:
+            self.pools = {host: ConnectionPool(config, connect_timeout=connect_timeout, **pool_options)
+                          for host, config in self.configs.items()}
+
+        self._clock = clock
+        self._replica_turns = itertools.count()
+        self._lock = threading.Lock()
+
+    # Reads try the available replicas first, then the primary, then replicas still cooling down after a failure.
+    def candidates(self, read_only=True) -> list:
+        if not read_only or not self.replicas:
+            return [self.primary]
+
+        now = self._clock()
+        replicas = self._ordered_replicas()
+        available = [host for host in replicas if self.stats[host].down_until <= now]
+        cooling_down = [host for host in replicas if self.stats[host].down_until > now]
+
+        return available + [self.primary] + cooling_down
+
+    @contextmanager
+    def connection(self, read_only=True):
+        errors = []
+        for host in self.candidates(read_only):
+            try:
+                connection = self._checkout(host)
+            except psg.OperationalError as error:
+                logger.warning("Connection to %s failed, trying the next host: %s", host, error)
+                self.mark_failed(host)
+                errors.append(f"{host}: {error}".strip())
+                continue
+
+            broken = False
+            try:
+                yield host, connection
+            except Exception as error:
+                broken = True
+                if isinstance(error, psg.OperationalError):
+                    self.mark_failed(host)
+                raise
+            finally:
+                self._checkin(host, connection, broken)
+            return
+
+        raise NoHostAvailableError(f"No database host available: {errors}")
+
+    def record_latency(self, host, latency):
+        with self._lock:
+            host_stats = self.stats[host]
+            host_stats.queries += 1
+            if host_stats.latency is None:
+                host_stats.latency = latency
+            else:
+                host_stats.latency += self.latency_smoothing * (latency - host_stats.latency)
+
+    def mark_failed(self, host):
+        with self._lock:
+            self.stats[host].failures += 1
+            self.stats[host].down_until = self._clock() + self.failure_cooldown
+
+    def close(self):
+        for pool in (self.pools or {}).values():
+            pool.close()
+
+    def _ordered_replicas(self) -> list:
+        if self.strategy == RoutingStrategies.ROUND_ROBIN:
+            start = next(self._replica_turns) % len(self.replicas)
+            return self.replicas[start:] + self.replicas[:start]
+
+        # Replicas without a measured latency sort first so each one gets probed.
+        return sorted(self.replicas, key=lambda host: self.stats[host].latency or 0.0)
+
+    def _checkout(self, host):
+        if self.pools is not None:
+            return self.pools[host].checkout()
+
+        return psg.connect(**self.configs[host], connect_timeout=self.connect_timeout)
+
+    def _checkin(self, host, connection, broken):
+        if self.pools is not None:
+            self.pools[host].checkin(connection, broken=broken)
+        else:
+            connection.close()
@@ -0,0 +1,94 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class CacheStatistics:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def to_dict(self) -> dict:
+        return dict(vars(self))
+
+
+class LRUCache:
+    _MISSING = object()
+
+    def __init__(self, max_size=1024, ttl=None, clock=time.monotonic):
+        if max_size < 1:
+            raise ValueError(f"Invalid cache size: max_size={max_size}")
+
+        self.max_size = max_size
+        self.ttl = ttl
+        self.stats = CacheStatistics()
+
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        with self._lock:
+            return self._lookup(key) is not self._MISSING
+
+    def get(self, key, default=None):
+        with self._lock:
+            value = self._lookup(key)
+            if value is self._MISSING:
+                self.stats.misses += 1
+                return default
+
+            self.stats.hits += 1
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, self._clock())
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+
+    def get_or_load(self, key, loader):
+        value = self.get(key, self._MISSING)
+        if value is self._MISSING:
+            value = loader()
+            self.set(key, value)
+
+        return value
+
+    def invalidate(self, key) -> bool:
+        with self._lock:
+            return self._entries.pop(key, self._MISSING) is not self._MISSING
+
+    def invalidate_where(self, predicate) -> int:
+        with self._lock:
+            keys = [key for key in self._entries if predicate(key)]
+            for key in keys:
+                del self._entries[key]
+
+            return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _lookup(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return self._MISSING
+
+        value, stored_at = entry
+        if self.ttl is not None and self._clock() - stored_at >= self.ttl:
+            del self._entries[key]
+            self.stats.expirations += 1
+            return self._MISSING
+
+        self._entries.move_to_end(key)
+        return value
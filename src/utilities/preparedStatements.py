@@ -0,0 +1,81 @@
+import hashlib
+import re
+import threading
+import weakref
+from collections import OrderedDict
+
+
+class PreparedStatementStatistics:
+    def __init__(self):
+        self.prepares = 0
+        self.executions = 0
+        self.deallocations = 0
+
+    def to_dict(self) -> dict:
+        return dict(vars(self))
+
+
+class PreparedStatementCache:
+    PLACEHOLDER_PATTERN = re.compile(r"%%|%\((\w+)\)s")
+
+    def __init__(self, max_statements_per_connection=256):
+        self.max_statements_per_connection = max_statements_per_connection
+        self.stats = PreparedStatementStatistics()
+
+        self._statements = {}
+        self._prepared = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def execute(self, connection, cursor, query, params):
+        query_text = query if isinstance(query, str) else query.as_string(cursor)
+        name, parameter_names, prepare_text = self._get_statement(query_text)
+
+        with self._lock:
+            prepared = self._prepared.setdefault(connection, OrderedDict())
+            is_prepared = name in prepared
+
+        if is_prepared:
+            prepared.move_to_end(name)
+        else:
+            if len(prepared) >= self.max_statements_per_connection:
+                oldest_name, _ = prepared.popitem(last=False)
+                cursor.execute(f"DEALLOCATE {oldest_name};")
+                self.stats.deallocations += 1
+
+            cursor.execute(f"PREPARE {name} AS {prepare_text};")
+            prepared[name] = True
+            self.stats.prepares += 1
+
+        self.stats.executions += 1
+        if not parameter_names:
+            cursor.execute(f"EXECUTE {name};")
+            return
+
+        arguments = ", ".join(["%s"] * len(parameter_names))
+        cursor.execute(f"EXECUTE {name} ({arguments});", [params[parameter_name] for parameter_name in parameter_names])
+
+    def forget(self, connection):
+        with self._lock:
+            self._prepared.pop(connection, None)
+
+    def _get_statement(self, query_text):
+        statement = self._statements.get(query_text)
+        if statement is not None:
+            return statement
+
+        parameter_names = []
+
+        def to_positional(match):
+            parameter_name = match.group(1)
+            if parameter_name is None:
+                return "%"
+            if parameter_name not in parameter_names:
+                parameter_names.append(parameter_name)
+            return f"${parameter_names.index(parameter_name) + 1}"
+
+        prepare_text = self.PLACEHOLDER_PATTERN.sub(to_positional, query_text.strip().rstrip(";").strip())
+        name = "stmt_" + hashlib.sha1(query_text.encode("utf-8")).hexdigest()[:16]
+
+        statement = (name, parameter_names, prepare_text)
+        self._statements[query_text] = statement
+        return statement
@@ -0,0 +1,163 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from psycopg2 import sql
+
+from src.utilities.lazyImport import lazy_import
+from src.utilities.lruCache import CacheStatistics
+
+pd = lazy_import("pandas")
+
+
+class QueryResultCache:
+    LITERAL_OR_WHITESPACE_PATTERN = re.compile(r"('(?:[^']|'')*')|\s+")
+    TABLE_PATTERN = re.compile(r"\b(?:FROM|JOIN)\s+((?:\"[^\"]+\"|\w+)(?:\s*\.\s*(?:\"[^\"]+\"|\w+))?)", re.IGNORECASE)
+
+    def __init__(self, max_bytes=256 * 1024 ** 2, ttl=300, copy_results=True, clock=time.monotonic):
+        if max_bytes < 1:
+            raise ValueError(f"Invalid cache size: max_bytes={max_bytes}")
+
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.copy_results = copy_results
+        self.stats = CacheStatistics()
+
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def make_key(self, kind, query, options=None) -> tuple:
+        query, params = query if isinstance(query, tuple) else (query, None)
+
+        return kind, self.normalize_sql(query), self._freeze(params), self._freeze(options)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl is not None and self._clock() - entry[1] >= self.ttl:
+                self._remove(key)
+                self.stats.expirations += 1
+                entry = None
+
+            if entry is None:
+                self.stats.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+
+        return self._copy(entry[0])
+
+    # Stores the result and returns the object to hand to the caller, so the cached one is never shared mutably.
+    def set(self, key, value):
+        size = self._result_bytes(value)
+        if size > self.max_bytes:
+            return value
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = (value, self._clock(), size, self.tables(key[1]))
+            self._bytes += size
+
+            while self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.stats.evictions += 1
+
+        return self._copy(value)
+
+    def get_or_load(self, kind, query, loader, options=None):
+        key = self.make_key(kind, query, options)
+        value = self.get(key)
+        if value is None:
+            value = self.set(key, loader())
+
+        return value
+
+    def invalidate_table(self, table: str) -> int:
+        table = self._table_name(table)
+        with self._lock:
+            keys = [key for key, entry in self._entries.items() if table in entry[3]]
+            for key in keys:
+                self._remove(key)
+
+            return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    @classmethod
+    def normalize_sql(cls, query) -> str:
+        query_text = cls._query_text(query)
+        query_text = cls.LITERAL_OR_WHITESPACE_PATTERN.sub(lambda match: match.group(1) or " ", query_text)
+
+        return query_text.strip().rstrip(";").strip()
+
+    @classmethod
+    def tables(cls, query_text: str) -> frozenset:
+        tables = set()
+        for match in cls.TABLE_PATTERN.finditer(query_text):
+            table = re.sub(r"\s+", "", match.group(1))
+            tables.add(cls._table_name(table))
+            tables.add(cls._table_name(table.split(".")[-1]))
+
+        return frozenset(tables)
+
+    def _remove(self, key):
+        self._bytes -= self._entries.pop(key)[2]
+
+    def _copy(self, value):
+        if self.copy_results and isinstance(value, pd.DataFrame):
+            return value.copy()
+
+        return value
+
+    @staticmethod
+    def _result_bytes(value) -> int:
+        if isinstance(value, pd.DataFrame):
+            return int(value.memory_usage(index=True, deep=True).sum())
+
+        return int(value.nbytes)
+
+    @staticmethod
+    def _table_name(table: str) -> str:
+        return table.replace('"', "").lower()
+
+    @classmethod
+    def _query_text(cls, query) -> str:
+        if isinstance(query, str):
+            return query
+        if isinstance(query, sql.Composed):
+            return "".join(cls._query_text(part) for part in query.seq)
+        if isinstance(query, sql.SQL):
+            return query.string
+        if isinstance(query, sql.Identifier):
+            return ".".join(f'"{name}"' for name in query.strings)
+        if isinstance(query, sql.Placeholder):
+            return f"%({query.name})s" if query.name is not None else "%s"
+        if isinstance(query, sql.Literal):
+            return repr(query.wrapped)
+
+        raise TypeError(f"Cannot build a cache key for {query!r}")
+
+    @classmethod
+    def _freeze(cls, value):
+        if isinstance(value, dict):
+            return tuple(sorted((key, cls._freeze(item)) for key, item in value.items()))
+        if isinstance(value, (list, tuple)):
+            return tuple(cls._freeze(item) for item in value)
+
+        return value
@@ -0,0 +1,172 @@
+import abc
+import bisect
+import functools
+import inspect
+import logging
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+_caller_context = threading.local()
+
+
+class QueryPhases:
+    CONNECT="connect"
+    EXECUTE="execute"
+    FETCH="fetch"
+    DATAFRAME="dataframe"
+
+
+class QueryEvent:
+    def __init__(self, query_text, params, phases, rows, bytes_estimated, call_path, host=None):
+        self.query_text = query_text
+        self.params = params
+        self.phases = phases
+        self.rows = rows
+        self.bytes_estimated = bytes_estimated
+        self.call_path = call_path
+        self.host = host
+
+    @property
+    def caller(self):
+        return self.call_path[-1] if self.call_path else None
+
+    @property
+    def total_time(self) -> float:
+        return sum(self.phases.values())
+
+    def to_dict(self) -> dict:
+        return {"query_text": self.query_text,
+                "params": self.params,
+                "phases": dict(self.phases),
+                "total_time": self.total_time,
+                "rows": self.rows,
+                "bytes_estimated": self.bytes_estimated,
+                "caller": self.caller,
+                "call_path": list(self.call_path),
+                "host": self.host}
+
+
+class QueryObserver(abc.ABC):
+    @abc.abstractmethod
+    def on_query(self, event: QueryEvent):
+        pass
+
+
+class HistogramCollector(QueryObserver):
+    DEFAULT_BOUNDS = [0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0]
+
+    def __init__(self, bounds=None):
+        self.bounds = list(bounds) if bounds is not None else list(self.DEFAULT_BOUNDS)
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def on_query(self, event: QueryEvent):
+        with self._lock:
+            for phase, duration in list(event.phases.items()) + [("total", event.total_time)]:
+                self._record((event.caller, phase), duration, event.rows)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {key: {**histogram, "buckets": list(histogram["buckets"])} for key, histogram in self._histograms.items()}
+
+    def quantile(self, caller, phase, quantile) -> float:
+        histogram = self._histograms.get((caller, phase))
+        if histogram is None or histogram["count"] == 0:
+            return None
+
+        target = quantile * histogram["count"]
+        cumulative = 0
+        for bound, count in zip(self.bounds + [histogram["max"]], histogram["buckets"]):
+            cumulative += count
+            if cumulative >= target:
+                return min(bound, histogram["max"])
+
+        return histogram["max"]
+
+    def reset(self):
+        with self._lock:
+            self._histograms = {}
+
+    def _record(self, key, duration, rows):
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            histogram = {"count": 0, "sum": 0.0, "min": duration, "max": duration, "rows": 0,
+                         "buckets": [0] * (len(self.bounds) + 1)}
+            self._histograms[key] = histogram
+
+        histogram["count"] += 1
+        histogram["sum"] += duration
+        histogram["min"] = min(histogram["min"], duration)
+        histogram["max"] = max(histogram["max"], duration)
+        histogram["rows"] += rows
+        histogram["buckets"][bisect.bisect_left(self.bounds, duration)] += 1
+
+
+class SlowQueryLog(QueryObserver):
+    def __init__(self, threshold_seconds=1.0, max_entries=100, log=logger):
+        self.threshold_seconds = threshold_seconds
+        self.entries = deque(maxlen=max_entries)
+        self.log = log
+
+    def on_query(self, event: QueryEvent):
+        if event.total_time < self.threshold_seconds:
+            return
+
+        self.entries.append(event.to_dict())
+        if self.log is not None:
+            self.log.warning("Slow query in %s (%.3fs, %d rows, params=%s): %s", event.caller, event.total_time,
+                             event.rows, event.params, event.query_text)
+
+
+def current_call_path() -> tuple:
+    return tuple(getattr(_caller_context, "stack", ()))
+
+
+@contextmanager
+def caller_context(name):
+    stack = getattr(_caller_context, "stack", None)
+    if stack is None:
+        stack = _caller_context.stack = []
+
+    stack.append(name)
+    try:
+        yield
+    finally:
+        stack.pop()
+
+
+def query_caller(function):
+    if inspect.isgeneratorfunction(function):
+        @functools.wraps(function)
+        def generator_wrapper(*args, **kwargs):
+            generator = function(*args, **kwargs)
+            try:
+                while True:
+                    with caller_context(function.__name__):
+                        try:
+                            item = next(generator)
+                        except StopIteration:
+                            return
+                    yield item
+            finally:
+                generator.close()
+
+        return generator_wrapper
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        with caller_context(function.__name__):
+            return function(*args, **kwargs)
+
+    return wrapper
+
+
+def notify_observers(observers, event: QueryEvent):
+    for observer in observers:
+        try:
+            observer.on_query(event)
+        except Exception:
+            logger.exception("Query observer %r failed", observer)
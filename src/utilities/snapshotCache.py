@@ -0,0 +1,159 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+from src.utilities.lazyImport import lazy_import
+
+pd = lazy_import("pandas")
+
+
+class SnapshotFormats:
+    FEATHER="feather"
+    PARQUET="parquet"
+
+
+class SnapshotStatistics:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+
+    def to_dict(self) -> dict:
+        return dict(vars(self))
+
+
+class SnapshotCache:
+    INDEX_FILE = "index.json"
+
+    def __init__(self, directory, max_bytes=2 * 1024 ** 3, file_format=SnapshotFormats.FEATHER, memory_map=True):
+        if file_format not in (SnapshotFormats.FEATHER, SnapshotFormats.PARQUET):
+            raise ValueError(f"Unknown snapshot format: {file_format}")
+
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.file_format = file_format
+        self.memory_map = memory_map
+        self.stats = SnapshotStatistics()
+
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._index = self._read_index()
+
+    def get(self, key):
+        entry_name = self._entry_name(key)
+        with self._lock:
+            entry = self._index.get(entry_name)
+            path = os.path.join(self.directory, entry["file"]) if entry is not None else None
+            if entry is None or not os.path.exists(path):
+                self._index.pop(entry_name, None)
+                self.stats.misses += 1
+                return None
+
+            entry["last_access"] = time.time()
+            self.stats.hits += 1
+            self._write_index()
+
+        df = self._read_frame(path)
+        if entry["index"] is not None:
+            df = df.set_index(entry["index"])
+
+        return df, entry["metadata"]
+
+    def put(self, key, df: "pd.DataFrame", metadata: dict = None):
+        entry_name = self._entry_name(key)
+        file_name = f"{entry_name}.{self.file_format}"
+        path = os.path.join(self.directory, file_name)
+        temporary_path = f"{path}.{threading.get_ident()}.tmp"
+
+        index_name = df.index.name
+        self._write_frame(df.reset_index() if index_name is not None else df.reset_index(drop=True), temporary_path)
+        os.replace(temporary_path, path)
+
+        with self._lock:
+            self._index[entry_name] = {"file": file_name,
+                                       "index": index_name,
+                                       "size": os.path.getsize(path),
+                                       "last_access": time.time(),
+                                       "metadata": metadata or {}}
+            self.stats.writes += 1
+            self._evict()
+            self._write_index()
+
+    def invalidate(self, key) -> bool:
+        with self._lock:
+            entry = self._index.pop(self._entry_name(key), None)
+            if entry is not None:
+                self._remove_file(entry)
+                self._write_index()
+
+            return entry is not None
+
+    def clear(self):
+        with self._lock:
+            for entry in self._index.values():
+                self._remove_file(entry)
+            self._index = {}
+            self._write_index()
+
+    @property
+    def size_bytes(self) -> int:
+        return sum(entry["size"] for entry in self._index.values())
+
+    def _evict(self):
+        entries_by_access = sorted(self._index.items(), key=lambda item: item[1]["last_access"])
+        total_size = self.size_bytes
+
+        for entry_name, entry in entries_by_access:
+            if total_size <= self.max_bytes:
+                break
+
+            del self._index[entry_name]
+            self._remove_file(entry)
+            total_size -= entry["size"]
+            self.stats.evictions += 1
+
+    def _read_frame(self, path) -> "pd.DataFrame":
+        if self.file_format == SnapshotFormats.FEATHER:
+            from pyarrow import feather
+            return feather.read_table(path, memory_map=self.memory_map).to_pandas()
+
+        from pyarrow import parquet
+        return parquet.read_table(path, memory_map=self.memory_map).to_pandas()
+
+    def _write_frame(self, df: "pd.DataFrame", path):
+        import pyarrow as pa
+
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        if self.file_format == SnapshotFormats.FEATHER:
+            from pyarrow import feather
+            feather.write_feather(table, path, compression="uncompressed" if self.memory_map else "lz4")
+        else:
+            from pyarrow import parquet
+            parquet.write_table(table, path)
+
+    def _remove_file(self, entry):
+        try:
+            os.remove(os.path.join(self.directory, entry["file"]))
+        except FileNotFoundError:
+            pass
+
+    def _read_index(self) -> dict:
+        try:
+            with open(os.path.join(self.directory, self.INDEX_FILE)) as index_file:
+                return json.load(index_file)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _write_index(self):
+        index_path = os.path.join(self.directory, self.INDEX_FILE)
+        temporary_path = f"{index_path}.{threading.get_ident()}.tmp"
+        with open(temporary_path, "w") as index_file:
+            json.dump(self._index, index_file)
+        os.replace(temporary_path, index_path)
+
+    @staticmethod
+    def _entry_name(key) -> str:
+        return hashlib.sha1(json.dumps(key, default=str).encode("utf-8")).hexdigest()
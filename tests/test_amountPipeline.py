@@ -0,0 +1,131 @@
+import os
+import unittest
+from datetime import date
+from unittest import mock
+from unittest.mock import patch
+
+import pandas as pd
+
+from src.data.amountPipeline import AmountPipeline
+from src.data.dataHelpers import DataHelper, UnmappedAccountError
+
+
+def make_data_helper():
+    with mock.patch.dict(os.environ, {"PSQL_USER": "user", "PSQL_PWD": "pwd", "PSQL_HOST": "host",
+                                      "PSQL_PORT": "5432", "PSQL_DATABASE": "database"}):
+        data_helper = DataHelper()
+    data_helper.reference_cache.set("engagement", "engagement_id",
+                                    {"period_start": date(2020, 1, 1), "period_end": date(2020, 12, 31),
+                                     "organization_id": "organization_id"})
+    data_helper.reference_cache.set("organization", "organization_id",
+                                    {"financial_year_end_day": 30, "financial_year_end_month": 6})
+
+    return data_helper
+
+
+class TestAmountPipeline(unittest.TestCase):
+    @patch('src.data.dataHelpers.DatabaseConnection.execute_queries')
+    def test_prunes_selects_and_date_parts(self, mock_db_execute_queries):
+        # Arrange
+        amounts_df = pd.DataFrame({"id": [1, 2],
+                                   "amount": [10.0, -5.0],
+                                   "transaction_date": [date(2020, 3, 15), date(2020, 8, 1)]}).set_index("id")
+        mock_db_execute_queries.return_value = [amounts_df]
+        pipeline = (AmountPipeline(make_data_helper(), "tenant_id", "engagement_id")
+                    .add_date_info(fiscal=True)
+                    .select(["amount", "transaction_date_month", "transaction_date_fiscal_year"]))
+
+        # Act
+        result = pipeline.collect()
+
+        # Assert
+        query, params = mock_db_execute_queries.call_args[0][0][0]
+        self.assertEqual(query.as_string(None).split(" FROM ")[0],
+                         "SELECT accounting_amounts.id, accounting_amounts.amount as amount, "
+                         "accounting_entries.date as transaction_date")
+        self.assertEqual(params["period_start"], "2020-01-01")
+        self.assertEqual(pipeline.explain()["date_steps"],
+                         [{"date_column": "transaction_date", "parts": ["month", "fiscal_year"]}])
+        self.assertEqual(result.columns.tolist(), ["amount", "transaction_date_month", "transaction_date_fiscal_year"])
+        self.assertEqual(result["transaction_date_month"].tolist(), [3, 8])
+        self.assertEqual(result["transaction_date_fiscal_year"].tolist(), [2020, 2021])
+
+    @patch('src.data.dataHelpers.DatabaseConnection.execute_queries')
+    def test_pushes_flipping_filter_into_the_query(self, mock_db_execute_queries):
+        # Arrange
+        amounts_df = pd.DataFrame({"id": [3], "amount": [1.0], "account_id": ["account_id_3"],
+                                   "fsli_id": ["fsli_id_3"]}).set_index("id")
+        mock_db_execute_queries.return_value = [amounts_df]
+        pipeline = (AmountPipeline(make_data_helper(), "tenant_id", "engagement_id")
+                    .map_fslis(unmapped="keep")
+                    .flipping_only()
+                    .select(["amount", "account_id", "fsli_id"]))
+
+        # Act
+        result = pipeline.collect()
+
+        # Assert
+        query = mock_db_execute_queries.call_args[0][0][0][0].as_string(None)
+        self.assertIn("SELECT accounting_amounts.id, accounting_amounts.amount as amount, "
+                      "accounting_amounts.account_id as account_id, fsli_mappings.fsli_id as fsli_id FROM", query)
+        self.assertNotIn("LEFT JOIN (SELECT DISTINCT ON", query)
+        self.assertTrue(query.endswith("AND fsli_mappings.reverse_fsli_id IS NOT NULL;"))
+        self.assertEqual(result.columns.tolist(), ["amount", "account_id", "fsli_id"])
+
+    @patch('src.data.dataHelpers.DatabaseConnection.execute_queries')
+    def test_flipping_after_raising_mapping_keeps_unmapped_rows(self, mock_db_execute_queries):
+        # Arrange
+        amounts_df = pd.DataFrame({"id": [1, 2], "amount": [1.0, 2.0], "account_id": ["account_id_1", "account_id_2"],
+                                   "mapped_account_id": ["account_id_1", None]}).set_index("id")
+        mock_db_execute_queries.return_value = [amounts_df]
+        pipeline = AmountPipeline(make_data_helper(), "tenant_id", "engagement_id").map_fslis().flipping_only().select(["amount"])
+
+        # Act
+        with self.assertRaises(UnmappedAccountError) as raised:
+            pipeline.collect()
+
+        # Assert
+        query = mock_db_execute_queries.call_args[0][0][0][0].as_string(None)
+        self.assertIn("LEFT JOIN (SELECT DISTINCT ON", query)
+        self.assertIn(AmountPipeline.FLIPPING_OR_UNMAPPED_CONSTRAINT, query)
+        self.assertIn("fsli_mappings.account_id as mapped_account_id", query)
+        self.assertEqual(raised.exception.account_ids, ["account_id_2"])
+
+    @patch('src.data.dataHelpers.DatabaseConnection.execute_queries')
+    def test_flipping_before_raising_mapping_drops_unmapped_rows(self, mock_db_execute_queries):
+        # Arrange
+        amounts_df = pd.DataFrame({"id": [3], "amount": [1.0], "fsli_id": ["fsli_id_3"]}).set_index("id")
+        mock_db_execute_queries.return_value = [amounts_df]
+        pipeline = (AmountPipeline(make_data_helper(), "tenant_id", "engagement_id")
+                    .flipping_only()
+                    .map_fslis()
+                    .select(["amount", "fsli_id"]))
+
+        # Act
+        result = pipeline.collect()
+
+        # Assert
+        query = mock_db_execute_queries.call_args[0][0][0][0].as_string(None)
+        self.assertNotIn("LEFT JOIN (SELECT DISTINCT ON", query)
+        self.assertNotIn(AmountPipeline.FLIPPING_OR_UNMAPPED_CONSTRAINT, query)
+        self.assertNotIn("mapped_account_id", query)
+        self.assertTrue(query.endswith("AND fsli_mappings.reverse_fsli_id IS NOT NULL;"))
+        self.assertFalse(pipeline.explain()["raise_unmapped"])
+        self.assertEqual(result.columns.tolist(), ["amount", "fsli_id"])
+
+    def test_pipeline_steps_are_immutable_and_validated(self):
+        # Arrange
+        pipeline = AmountPipeline(make_data_helper(), "tenant_id", "engagement_id")
+
+        # Act
+        mapped = pipeline.map_fslis()
+
+        # Assert
+        self.assertEqual(pipeline.steps, ())
+        self.assertEqual(len(mapped.steps), 1)
+        with self.assertRaises(KeyError):
+            pipeline.select(["fsli_id"]).plan()
+        with self.assertRaises(ValueError):
+            mapped.map_fslis(unmapped="keep").plan()
+        with self.assertRaises(ValueError):
+            pipeline.add_date_info(parts=["fiscal_year"])
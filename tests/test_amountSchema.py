@@ -0,0 +1,91 @@
+import unittest
+import pandas as pd
+
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+from src.data.amountSchema import AmountSchema, AmountTypes, memory_report
+
+
+def make_amounts():
+    return pd.DataFrame({"id": ["a1", "a2", "a3"],
+                         "amount": [Decimal("10.25"), Decimal("-3.10"), Decimal("0.005")],
+                         "amount_type": ["debit", "credit", "debit"],
+                         "account_id": ["acc1", "acc1", "acc2"],
+                         "account_currency": ["EUR", "EUR", "USD"],
+                         "transaction_context": ["manual", "import", "import"],
+                         "transaction_date": [date(2020, 1, 19), date(2020, 1, 20), None],
+                         "transaction_external_date": [datetime(2020, 1, 19, tzinfo=timezone.utc),
+                                                       datetime(2020, 1, 20, tzinfo=timezone.utc), None]}).set_index("id")
+
+
+class TestAmountSchema(unittest.TestCase):
+    def test_apply_float_amounts(self):
+        # Arrange
+        schema = AmountSchema()
+
+        # Act
+        result = schema.apply(make_amounts())
+
+        # Assert
+        self.assertEqual(result["amount"].dtype, "float64")
+        self.assertEqual(result["amount"].tolist(), [10.25, -3.10, 0.005])
+        for column in ["amount_type", "account_id", "account_currency", "transaction_context"]:
+            self.assertIsInstance(result[column].dtype, pd.CategoricalDtype)
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(result["transaction_date"]))
+        self.assertTrue(pd.isna(result.loc["a3", "transaction_date"]))
+        self.assertEqual(str(result["transaction_external_date"].dt.tz), "UTC")
+
+    def test_apply_scaled_int_amounts(self):
+        # Arrange
+        schema = AmountSchema(amount_type=AmountTypes.SCALED_INT, amount_scale=2)
+
+        # Act
+        result = schema.apply(make_amounts())
+
+        # Assert
+        self.assertEqual(result["amount"].dtype, "int64")
+        self.assertEqual(result["amount"].tolist(), [1025, -310, 1])
+        self.assertEqual(schema.to_amount(result["amount"]).tolist(), [10.25, -3.10, 0.01])
+
+    def test_apply_scaled_int_amounts_exactly(self):
+        # Arrange
+        schema = AmountSchema(amount_type=AmountTypes.SCALED_INT, amount_scale=2)
+        amounts_df = pd.DataFrame({"amount": [Decimal("90071992547409.93"), Decimal("-0.125"), None, "2.675"]})
+
+        # Act
+        result = schema.apply(amounts_df)
+
+        # Assert
+        self.assertEqual(result["amount"].dtype, "Int64")
+        self.assertEqual(result["amount"].tolist(), [9007199254740993, -13, pd.NA, 268])
+        self.assertEqual(schema.copy_dtypes({"amount": "float64"})["amount"], "object")
+
+    def test_apply_is_idempotent(self):
+        # Arrange
+        schema = AmountSchema(amount_type=AmountTypes.SCALED_INT)
+        compact_df = schema.apply(make_amounts())
+
+        # Act
+        result = schema.apply(compact_df)
+
+        # Assert
+        pd.testing.assert_frame_equal(result, compact_df)
+
+    def test_unknown_amount_type(self):
+        # Act / Assert
+        with self.assertRaises(ValueError):
+            AmountSchema(amount_type="decimal")
+
+    def test_memory_report(self):
+        # Arrange
+        amounts_df = make_amounts()
+
+        # Act
+        report = memory_report(amounts_df)
+
+        # Assert
+        self.assertEqual(report.index.tolist(), ["Index"] + amounts_df.columns.tolist() + ["total"])
+        self.assertEqual(report.loc["amount_type", "dtype"], str(amounts_df["amount_type"].dtype))
+        self.assertEqual(report.loc["total", "bytes"], amounts_df.memory_usage(index=True, deep=True).sum())
+        self.assertAlmostEqual(report["share"].iloc[:-1].sum(), 1.0)
@@ -0,0 +1,118 @@
+import os
+import unittest
+from datetime import date
+from unittest import mock
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+from src.data.amountStore import AmountStore
+from src.data.dataHelpers import DataHelper
+
+
+def make_amounts(rows, seed=0):
+    random_state = np.random.RandomState(seed)
+    return pd.DataFrame({"id": [f"amount_{index}" for index in range(rows)],
+                         "account_id": random_state.choice(["account_1", "account_2", "account_3"], rows),
+                         "amount": random_state.randint(-100, 100, rows).astype("float64"),
+                         "transaction_date": pd.to_datetime("2020-01-01")
+                                             + pd.to_timedelta(random_state.randint(0, 366, rows), unit="D")}).set_index("id")
+
+
+def make_mapping_table():
+    return pd.DataFrame({"account_id": ["account_1", "account_2"],
+                         "fsli_id": ["fsli_1", "fsli_1"],
+                         "reverse_fsli_id": [None, None]}).set_index("account_id")
+
+
+class TestAmountStore(unittest.TestCase):
+    def test_select_and_total_match_boolean_masks(self):
+        # Arrange
+        amounts_df = make_amounts(500)
+        store = AmountStore(amounts_df, make_mapping_table())
+        start, end = pd.Timestamp(2020, 3, 1), pd.Timestamp(2020, 5, 31)
+        in_range = (amounts_df["transaction_date"] >= start) & (amounts_df["transaction_date"] <= end)
+        account_mask = in_range & (amounts_df["account_id"] == "account_2")
+        fsli_mask = in_range & amounts_df["account_id"].isin(["account_1", "account_2"])
+
+        # Act
+        account_rows = store.select(account_id="account_2", start=start, end=end)
+        account_total = store.total(account_id="account_2", start=start, end=end)
+        fsli_rows = store.select(fsli_id="fsli_1", start=start, end=end)
+        fsli_total = store.total(fsli_id="fsli_1", start=start, end=end)
+
+        # Assert
+        self.assertEqual(sorted(account_rows.index), sorted(amounts_df.index[account_mask]))
+        self.assertTrue(account_rows["transaction_date"].is_monotonic_increasing)
+        self.assertAlmostEqual(account_total, amounts_df.loc[account_mask, "amount"].sum())
+        self.assertEqual(sorted(fsli_rows.index), sorted(amounts_df.index[fsli_mask]))
+        self.assertAlmostEqual(fsli_total, amounts_df.loc[fsli_mask, "amount"].sum())
+        self.assertEqual(store.keys("fsli_id"), ["fsli_1"])
+        self.assertEqual(store.total(account_id="unknown_account"), 0)
+
+    def test_running_balance_includes_rows_before_start(self):
+        # Arrange
+        amounts_df = pd.DataFrame({"id": [1, 2, 3, 4],
+                                   "account_id": ["account_1", "account_1", "account_2", "account_1"],
+                                   "amount": [10.0, 5.0, 100.0, -3.0],
+                                   "transaction_date": [date(2020, 3, 1), date(2020, 1, 1), date(2020, 2, 1),
+                                                        date(2020, 2, 1)]}).set_index("id")
+        store = AmountStore(amounts_df)
+
+        # Act
+        balance = store.running_balance(account_id="account_1", start="2020-02-01")
+
+        # Assert
+        self.assertEqual(balance.index.tolist(), [4, 1])
+        self.assertEqual(balance.tolist(), [2.0, 12.0])
+
+    def test_append_replaces_changed_rows(self):
+        # Arrange
+        amounts_df = pd.DataFrame({"id": [1, 2],
+                                   "account_id": ["account_1", "account_2"],
+                                   "amount": [10.0, 20.0],
+                                   "transaction_date": [date(2020, 1, 1), date(2020, 1, 2)]}).set_index("id")
+        store = AmountStore(amounts_df, make_mapping_table())
+        changes_df = pd.DataFrame({"id": [2, 3],
+                                   "account_id": ["account_2", "account_1"],
+                                   "amount": [25.0, 1.0],
+                                   "transaction_date": [date(2020, 1, 2), date(2019, 12, 31)]}).set_index("id")
+
+        # Act
+        store.append(changes_df)
+
+        # Assert
+        self.assertEqual(len(store), 3)
+        self.assertEqual(store.select(account_id="account_1").index.tolist(), [3, 1])
+        self.assertEqual(store.total(fsli_id="fsli_1"), 36.0)
+
+    def test_lookup_requires_exactly_one_key(self):
+        # Arrange
+        store = AmountStore(make_amounts(10))
+
+        # Act / Assert
+        with self.assertRaises(ValueError):
+            store.select()
+        with self.assertRaises(ValueError):
+            store.select(account_id="account_1", fsli_id="fsli_1")
+        with self.assertRaises(ValueError):
+            store.total(fsli_id="fsli_1")
+
+    @patch('src.data.dataHelpers.DataHelper.get_fsli_mapping_table')
+    @patch('src.data.dataHelpers.DataHelper.get_amount_table')
+    def test_from_engagement(self, mock_get_amount_table, mock_get_fsli_mapping_table):
+        # Arrange
+        with mock.patch.dict(os.environ, {"PSQL_USER": "user", "PSQL_PWD": "pwd", "PSQL_HOST": "host",
+                                          "PSQL_PORT": "5432", "PSQL_DATABASE": "database"}):
+            data_helper = DataHelper()
+        mock_get_amount_table.return_value = make_amounts(20)
+        mock_get_fsli_mapping_table.return_value = make_mapping_table()
+
+        # Act
+        store = AmountStore.from_engagement(data_helper, "tenant_id", "engagement_id")
+
+        # Assert
+        mock_get_amount_table.assert_called_once_with("tenant_id", ["engagement_id"])
+        self.assertIn("fsli_id", store.amounts_df.columns)
+        self.assertEqual(len(store), 20)
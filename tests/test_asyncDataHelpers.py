@@ -0,0 +1,139 @@
+import asyncio
+import os
+import threading
+import time
+import unittest
+import pandas as pd
+
+from datetime import datetime
+from unittest import mock
+from unittest.mock import patch
+
+from src.data.asyncDataHelpers import AsyncDataHelper
+from src.data.dataHelpers import DataHelper
+
+
+def run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+class FakeDatabase:
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.active = 0
+        self.max_active = 0
+        self.queries = []
+        self._lock = threading.Lock()
+
+    def execute_queries(self, queries, id_column="id"):
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+
+        results = []
+        for query in queries:
+            query, params = query if isinstance(query, tuple) else (query, None)
+            query_text = query if isinstance(query, str) else query.as_string(None)
+            self.queries.append((query_text, params))
+            results.append(self._result(query_text, params))
+        return results
+
+    def _result(self, query_text, params):
+        if "FROM engagements" in query_text:
+            engagements = pd.DataFrame({"id": ["a", "b"],
+                                        "period_start": [datetime(2020, 1, 1), datetime(2021, 1, 1)],
+                                        "period_end": [datetime(2020, 12, 31), datetime(2021, 12, 31)]}).set_index("id")
+            if "engagement_id" in params:
+                return engagements.loc[[params["engagement_id"]]]
+            return engagements
+        if "FROM account_mappings" in query_text:
+            return pd.DataFrame({"id": ["m1", "m2"], "account_id": ["account_1", "account_2"],
+                                 "fsli_id": ["fsli_1", "fsli_2"]}).set_index("id")
+        if "FROM accounting_fslis" in query_text:
+            return pd.DataFrame({"id": ["fsli_1", "fsli_2"], "reverse_fsli_id": ["fsli_2", None]}).set_index("id")
+
+        start_year = int(params["period_start"][:4])
+        return pd.DataFrame({"id": [start_year * 10 + 1, start_year * 10 + 2],
+                             "account_id": ["account_1", "account_2"],
+                             "amount": [1.0, 2.0]}).set_index("id")
+
+
+class TestAsyncDataHelpers(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.env_patcher = mock.patch.dict(os.environ, {"PSQL_USER": "user", "PSQL_PWD": "pwd", "PSQL_HOST": "host",
+                                                       "PSQL_PORT": "5432", "PSQL_DATABASE": "database"})
+        cls.env_patcher.start()
+
+        super().setUpClass()
+
+    def test_get_amount_table_runs_engagement_queries_concurrently(self):
+        # Arrange
+        fake_database = FakeDatabase()
+        async_data_helper = AsyncDataHelper(max_concurrency=4)
+
+        # Act
+        with patch('src.data.dataHelpers.DatabaseConnection.execute_queries', side_effect=fake_database.execute_queries):
+            result = run(async_data_helper.get_amount_table("tenant_id", ["b", "a"]))
+        async_data_helper.close()
+
+        # Assert
+        self.assertEqual(result.index.tolist(), [20211, 20212, 20201, 20202])
+        self.assertEqual(fake_database.max_active, 2)
+
+    def test_get_amount_table_matches_sync_api(self):
+        # Arrange
+        fake_database = FakeDatabase(delay=0)
+        async_data_helper = AsyncDataHelper()
+
+        # Act
+        with patch('src.data.dataHelpers.DatabaseConnection.execute_queries', side_effect=fake_database.execute_queries):
+            async_result = run(async_data_helper.get_amount_table("tenant_id", ["a", "b"]))
+            sync_result = DataHelper().get_amount_table("tenant_id", ["a", "b"], batched=False)
+        async_data_helper.close()
+
+        # Assert
+        pd.testing.assert_frame_equal(async_result, sync_result)
+
+    def test_get_mapped_amount_table_fetches_references_concurrently(self):
+        # Arrange
+        fake_database = FakeDatabase()
+        async_data_helper = AsyncDataHelper(max_concurrency=4)
+
+        # Act
+        with patch('src.data.dataHelpers.DatabaseConnection.execute_queries', side_effect=fake_database.execute_queries):
+            result = run(async_data_helper.get_mapped_amount_table("tenant_id", "a"))
+            flipping = run(async_data_helper.get_flipping_id_amounts(result, "a"))
+        async_data_helper.close()
+
+        # Assert
+        self.assertEqual(result["fsli_id"].tolist(), ["fsli_1", "fsli_2"])
+        self.assertEqual(flipping["account_id"].tolist(), ["account_1"])
+        self.assertGreaterEqual(fake_database.max_active, 2)
+        self.assertEqual(len([query for query, _ in fake_database.queries if "FROM accounting_fslis" in query]), 1)
+
+    def test_concurrency_is_bounded(self):
+        # Arrange
+        fake_database = FakeDatabase()
+        async_data_helper = AsyncDataHelper(max_concurrency=1)
+
+        # Act
+        with patch('src.data.dataHelpers.DatabaseConnection.execute_queries', side_effect=fake_database.execute_queries):
+            run(async_data_helper.get_amount_table("tenant_id", ["a", "b"]))
+        async_data_helper.close()
+
+        # Assert
+        self.assertEqual(fake_database.max_active, 1)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+
+        cls.env_patcher.stop()
@@ -0,0 +1,116 @@
+import time
+import unittest
+import pandas as pd
+
+from datetime import datetime
+from unittest.mock import MagicMock
+
+from src.data.batchExtraction import BatchExtractor, TransformExecutors, transform_amounts
+
+
+def make_data_helper(failing_tenants=()):
+    data_helper = MagicMock()
+    data_helper.db_connection.pool.max_size = 2
+
+    def get_amount_table(tenant_id, engagement_ids=None, schema=None):
+        if tenant_id in failing_tenants:
+            raise RuntimeError(f"cannot load {tenant_id}")
+        return pd.DataFrame({"id": [f"{tenant_id}_1", f"{tenant_id}_2"],
+                             "account_id": ["acc1", "acc2"],
+                             "transaction_date": [datetime(2020, 1, 19), datetime(2020, 2, 20)]}).set_index("id")
+
+    data_helper.get_amount_table.side_effect = get_amount_table
+    data_helper.get_fsli_mapping_table.return_value = pd.DataFrame({"account_id": ["acc1", "acc2"],
+                                                                    "fsli_id": ["fsli1", "fsli2"],
+                                                                    "reverse_fsli_id": [None, None]}).set_index("account_id")
+    return data_helper
+
+
+class TestBatchExtractor(unittest.TestCase):
+    def test_run_streams_transformed_results(self):
+        # Arrange
+        data_helper = make_data_helper()
+        progress = MagicMock()
+        extractor = BatchExtractor(data_helper, transform_executor=TransformExecutors.THREAD)
+
+        # Act
+        results = list(extractor.run([("tenant_a", ["e1"]), ("tenant_b", ["e2", "e3"])], progress=progress))
+
+        # Assert
+        self.assertEqual(sorted(result.index for result in results), [0, 1])
+        result_b = next(result for result in results if result.tenant_id == "tenant_b")
+        self.assertTrue(result_b.ok)
+        self.assertEqual(result_b.amounts_df["engagement_id"].tolist(), ["e2", "e2", "e3", "e3"])
+        self.assertEqual(result_b.amounts_df["fsli_id"].tolist(), ["fsli1", "fsli2"] * 2)
+        self.assertEqual(result_b.amounts_df["transaction_date_month"].tolist(), [1, 2] * 2)
+        self.assertEqual(set(result_b.timings), {"queued", "fetch", "transform", "total"})
+        self.assertEqual(progress.call_count, 2)
+        self.assertEqual(progress.call_args[0][0].completed, 2)
+
+    def test_run_reports_failed_items_and_continues(self):
+        # Arrange
+        data_helper = make_data_helper(failing_tenants=["tenant_a"])
+        extractor = BatchExtractor(data_helper, transform_executor=TransformExecutors.THREAD)
+
+        # Act
+        with self.assertLogs("src.data.batchExtraction", level="ERROR"):
+            results = {result.tenant_id: result for result in extractor.run([("tenant_a", ["e1"]), ("tenant_b", ["e2"])])}
+
+        # Assert
+        self.assertFalse(results["tenant_a"].ok)
+        self.assertIsInstance(results["tenant_a"].error, RuntimeError)
+        self.assertTrue(results["tenant_b"].ok)
+
+    def test_stage_timings_exclude_queue_wait(self):
+        # Arrange
+        data_helper = make_data_helper()
+        get_amount_table = data_helper.get_amount_table.side_effect
+        data_helper.get_amount_table.side_effect = lambda *args, **kwargs: time.sleep(0.1) or get_amount_table(*args, **kwargs)
+        extractor = BatchExtractor(data_helper, io_workers=1, transform_executor=TransformExecutors.THREAD)
+
+        # Act
+        results = sorted(extractor.run([(f"tenant_{index}", ["e1"]) for index in range(4)]), key=lambda result: result.index)
+
+        # Assert
+        self.assertTrue(all(result.timings["fetch"] < 0.18 for result in results))
+        self.assertGreater(results[-1].timings["queued"], 0.25)
+
+    def test_run_with_process_pool(self):
+        # Arrange
+        extractor = BatchExtractor(make_data_helper(), transform_workers=1)
+
+        # Act
+        results = list(extractor.run([("tenant_a", ["e1"])]))
+
+        # Assert
+        self.assertEqual(results[0].amounts_df["fsli_id"].tolist(), ["fsli1", "fsli2"])
+
+    def test_run_with_fiscal_dates(self):
+        # Arrange
+        data_helper = make_data_helper()
+        data_helper.get_engagement_context.return_value = ({"organization_id": "o1"},
+                                                           {"financial_year_end_day": 31, "financial_year_end_month": 3})
+        extractor = BatchExtractor(data_helper, transform_executor=TransformExecutors.THREAD, fiscal_dates=True)
+
+        # Act
+        results = list(extractor.run([("tenant_a", ["e1"])]))
+
+        # Assert
+        data_helper.get_engagement_context.assert_called_once_with("e1")
+        self.assertEqual(results[0].amounts_df["transaction_date_fiscal_period"].tolist(), [10, 11])
+
+    def test_io_workers_bounded_by_pool_size(self):
+        # Act / Assert
+        with self.assertRaises(ValueError):
+            BatchExtractor(make_data_helper(), io_workers=3)
+
+    def test_transform_amounts_without_engagements(self):
+        # Arrange
+        amounts_df = pd.DataFrame({"id": [1], "transaction_date": [datetime(2020, 1, 19)]}).set_index("id")
+
+        # Act
+        result = transform_amounts([(None, amounts_df, None, None)], "transaction_date")
+
+        # Assert
+        self.assertEqual(result["transaction_date_year"].tolist(), [2020])
+        self.assertNotIn("engagement_id", result.columns)
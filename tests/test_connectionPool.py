@@ -0,0 +1,134 @@
+import threading
+import unittest
+
+from unittest.mock import patch, MagicMock
+
+import psycopg2 as psg
+
+from src.utilities.connectionPool import ConnectionPool, PoolTimeoutError
+
+
+def make_connection():
+    connection = MagicMock()
+    connection.closed = 0
+    return connection
+
+
+class TestConnectionPool(unittest.TestCase):
+    @patch('src.utilities.connectionPool.psg.connect')
+    def test_connection_is_reused(self, mock_connect):
+        # Arrange
+        mock_connect.side_effect = lambda **kwargs: make_connection()
+        pool = ConnectionPool({"host": "host"}, min_size=1, max_size=2)
+
+        # Act
+        with pool.connection() as first_connection:
+            pass
+        with pool.connection() as second_connection:
+            pass
+
+        # Assert
+        self.assertIs(first_connection, second_connection)
+        self.assertEqual(mock_connect.call_count, 1)
+        self.assertEqual(pool.stats.checkouts, 2)
+        self.assertEqual(pool.stats.connects, 1)
+        first_connection.rollback.assert_called()
+
+    @patch('src.utilities.connectionPool.psg.connect')
+    def test_min_size_is_filled_on_first_checkout(self, mock_connect):
+        # Arrange
+        mock_connect.side_effect = lambda **kwargs: make_connection()
+        pool = ConnectionPool({"host": "host"}, min_size=3, max_size=5)
+
+        # Act
+        with pool.connection():
+            pass
+
+        # Assert
+        self.assertEqual(pool.size, 3)
+        self.assertEqual(pool.idle_size, 3)
+
+    @patch('src.utilities.connectionPool.psg.connect')
+    def test_closed_connection_is_reconnected(self, mock_connect):
+        # Arrange
+        mock_connect.side_effect = lambda **kwargs: make_connection()
+        pool = ConnectionPool({"host": "host"}, min_size=1, max_size=1)
+        with pool.connection() as first_connection:
+            pass
+        first_connection.closed = 1
+
+        # Act
+        with pool.connection() as second_connection:
+            pass
+
+        # Assert
+        self.assertIsNot(first_connection, second_connection)
+        self.assertEqual(pool.stats.reconnects, 1)
+
+    @patch('src.utilities.connectionPool.psg.connect')
+    def test_stale_connection_failing_ping_is_reconnected(self, mock_connect):
+        # Arrange
+        mock_connect.side_effect = lambda **kwargs: make_connection()
+        pool = ConnectionPool({"host": "host"}, min_size=1, max_size=1, health_check_interval=-1)
+        with pool.connection() as first_connection:
+            pass
+        first_connection.cursor.return_value.execute.side_effect = psg.OperationalError("server closed the connection")
+
+        # Act
+        with pool.connection() as second_connection:
+            pass
+
+        # Assert
+        self.assertIsNot(first_connection, second_connection)
+        self.assertEqual(pool.stats.reconnects, 1)
+
+    @patch('src.utilities.connectionPool.psg.connect')
+    def test_connection_is_discarded_on_error(self, mock_connect):
+        # Arrange
+        mock_connect.side_effect = lambda **kwargs: make_connection()
+        pool = ConnectionPool({"host": "host"}, min_size=0, max_size=1)
+
+        # Act
+        with self.assertRaises(ValueError):
+            with pool.connection():
+                raise ValueError()
+
+        # Assert
+        self.assertEqual(pool.size, 0)
+        self.assertEqual(pool.stats.discarded, 1)
+
+    @patch('src.utilities.connectionPool.psg.connect')
+    def test_checkout_waits_for_returned_connection(self, mock_connect):
+        # Arrange
+        mock_connect.side_effect = lambda **kwargs: make_connection()
+        pool = ConnectionPool({"host": "host"}, min_size=1, max_size=1, checkout_timeout=5)
+        held_connection = pool.checkout()
+        checked_out = []
+
+        # Act
+        worker = threading.Thread(target=lambda: checked_out.append(pool.checkout()))
+        worker.start()
+        while pool.stats.waits == 0:
+            pass
+        pool.checkin(held_connection)
+        worker.join()
+
+        # Assert
+        self.assertEqual(checked_out, [held_connection])
+        self.assertEqual(pool.stats.waits, 1)
+
+    @patch('src.utilities.connectionPool.psg.connect')
+    def test_checkout_timeout(self, mock_connect):
+        # Arrange
+        mock_connect.side_effect = lambda **kwargs: make_connection()
+        pool = ConnectionPool({"host": "host"}, min_size=1, max_size=1, checkout_timeout=0.01)
+        pool.checkout()
+
+        # Act / Assert
+        with self.assertRaises(PoolTimeoutError):
+            pool.checkout()
+
+    def test_invalid_sizes(self):
+        # Act / Assert
+        with self.assertRaises(ValueError):
+            ConnectionPool({"host": "host"}, min_size=2, max_size=1)
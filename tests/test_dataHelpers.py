@@ -1,23 +1,48 @@
 import unittest
 import pandas as pd
 import os
+import tempfile
 
-from datetime import datetime
+from datetime import date, datetime
+from decimal import Decimal
 from inspect import getcallargs, signature
-from unittest.mock import patch, Mock, call, ANY, mock
+from types import SimpleNamespace
+from unittest.mock import patch, Mock, call, ANY
+from unittest import mock
 
+from src.data.amountSchema import AmountSchema, AmountTypes
 from src.data.dataHelpers import DataHelper
+from src.data.referenceCache import NoReferenceCache
+from src.utilities.snapshotCache import SnapshotCache
 
 
 class TestDataHelpers(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
-        cls.env_patcher = mock.patch.dict(os.environ)
+        cls.env_patcher = mock.patch.dict(os.environ, {"PSQL_USER": "user", "PSQL_PWD": "pwd", "PSQL_HOST": "host",
+                                                       "PSQL_PORT": "5432", "PSQL_DATABASE": "database"})
         cls.env_patcher.start()
 
         super().setUpClass()
 
-    def test_add_date_info(self, mock_os):
+    def test_replica_hosts_enable_routing(self):
+        # Arrange
+        environment = {"PSQL_REPLICA_HOSTS": "replica_1, replica_2:6432", "PSQL_ROUTING_STRATEGY": "least_latency"}
+
+        # Act
+        with mock.patch.dict(os.environ, environment):
+            data_helper = DataHelper()
+        plain_data_helper = DataHelper()
+
+        # Assert
+        router = data_helper.db_connection.router
+        self.assertEqual(router.primary, "host:5432")
+        self.assertEqual(router.replicas, ["replica_1:5432", "replica_2:6432"])
+        self.assertEqual(router.strategy, "least_latency")
+        self.assertEqual(router.configs["replica_2:6432"]["user"], "user")
+        self.assertIsNone(plain_data_helper.db_connection.router)
+
+    def test_add_date_info(self):
         # Arrange
         data_helper = DataHelper()
 
@@ -36,15 +61,107 @@ class TestDataHelpers(unittest.TestCase):
                             "col_date_day": [19, 18, 20],
                             "col_date_week_day": [6, 5, 0]}
         expected_df_break = pd.DataFrame()
-        expected_df = pd.DataFrame(data=expected_df_data, index=[0, 1, 2])
+        expected_df = pd.DataFrame(data=expected_df_data, index=[0, 1, 2]).astype(
+            {"col_date_year": "int16", "col_date_month": "int8", "col_date_day": "int8", "col_date_week_day": "int8"})
 
         # Assert
         pd.testing.assert_frame_equal(result, expected_df)
 
-    # @patch('data.dataHelpers.DataHelper.get_engagement_info')
-    # @patch('data.dataHelpers.DataHelper._get_engagement_amounts')
-    @patch('data.dataHelpers.QueryBuilder.build_query')
-    @patch('data.dataHelpers.DatabaseConnection.execute_queries')
+    def test_add_date_info_with_date_objects_and_missing_dates(self):
+        # Arrange
+        data_helper = DataHelper()
+
+        amounts_df = pd.DataFrame({"col_date": [date(2020, 12, 31), None, date(2021, 1, 4)]})
+
+        # Act
+        result = data_helper.add_date_info(amounts_df, "col_date", parts=["year", "quarter", "iso_week", "iso_year"])
+
+        # Assert
+        self.assertEqual(list(result.columns), ["col_date", "col_date_year", "col_date_quarter", "col_date_iso_week", "col_date_iso_year"])
+        self.assertEqual(result["col_date_year"].dtype, "Int16")
+        self.assertEqual(result["col_date_iso_week"].tolist(), [53, pd.NA, 1])
+        self.assertEqual(result["col_date_iso_year"].tolist(), [2020, pd.NA, 2021])
+        self.assertEqual(result["col_date_quarter"].tolist(), [4, pd.NA, 1])
+
+    def test_add_date_info_with_tz_aware_dates(self):
+        # Arrange
+        data_helper = DataHelper()
+
+        amounts_df = pd.DataFrame({"col_date": pd.to_datetime(["2020-01-19 23:30"]).tz_localize("America/Montreal")})
+
+        # Act
+        result = data_helper.add_date_info(amounts_df, "col_date", parts=["day", "week_day"])
+
+        # Assert
+        self.assertEqual(result["col_date_day"].tolist(), [19])
+        self.assertEqual(result["col_date_week_day"].tolist(), [6])
+
+    def test_add_date_info_with_fiscal_periods(self):
+        # Arrange
+        data_helper = DataHelper()
+
+        amounts_df = pd.DataFrame({"col_date": [datetime(2020, 6, 30), datetime(2020, 7, 1), datetime(2021, 1, 15), datetime(2021, 2, 28)]})
+        organization_info = {"financial_year_end_day": 30, "financial_year_end_month": 6}
+
+        # Act
+        result = data_helper.add_date_info(amounts_df, "col_date", organization_info=organization_info)
+
+        # Assert
+        self.assertEqual(result["col_date_fiscal_year"].tolist(), [2020, 2021, 2021, 2021])
+        self.assertEqual(result["col_date_fiscal_period"].tolist(), [12, 1, 7, 8])
+        self.assertEqual(result["col_date_fiscal_year"].dtype, "int16")
+        self.assertIn("col_date_week_day", result.columns)
+
+    def test_add_date_info_with_fiscal_periods_ending_mid_month(self):
+        # Arrange
+        data_helper = DataHelper()
+
+        amounts_df = pd.DataFrame({"col_date": [datetime(2020, 3, 15), datetime(2020, 3, 16), datetime(2020, 12, 20)]})
+        organization_info = {"financial_year_end_day": 15, "financial_year_end_month": 3}
+
+        # Act
+        result = data_helper.add_date_info(amounts_df, "col_date", parts=["fiscal_year", "fiscal_period", "fiscal_quarter"],
+                                           organization_info=organization_info)
+
+        # Assert
+        self.assertEqual(result["col_date_fiscal_year"].tolist(), [2020, 2021, 2021])
+        self.assertEqual(result["col_date_fiscal_period"].tolist(), [12, 1, 10])
+        self.assertEqual(result["col_date_fiscal_quarter"].tolist(), [4, 1, 4])
+
+    def test_add_date_info_computes_only_requested_parts(self):
+        # Arrange
+        data_helper = DataHelper()
+
+        amounts_df = pd.DataFrame({"col_date": [datetime(2020, 6, 30), datetime(2020, 7, 1)]})
+        organization_info = {"financial_year_end_day": 30, "financial_year_end_month": 6}
+
+        # Act
+        with patch.object(DataHelper, "_compute_fiscal_periods", wraps=DataHelper._compute_fiscal_periods) as mock_fiscal, \
+                patch.object(DataHelper, "_compute_iso_parts") as mock_iso:
+            result = data_helper.add_date_info(amounts_df, "col_date", parts=["fiscal_year", "fiscal_period", "fiscal_quarter"],
+                                               organization_info=organization_info)
+        date_parts = DataHelper._compute_date_parts(SimpleNamespace(year=2020), ["year"], None)
+
+        # Assert
+        self.assertEqual(result["col_date_fiscal_quarter"].tolist(), [4, 1])
+        self.assertEqual(mock_fiscal.call_count, 1)
+        mock_iso.assert_not_called()
+        self.assertEqual(date_parts, {"year": 2020})
+
+    def test_add_date_info_fiscal_parts_require_organization_info(self):
+        # Arrange
+        data_helper = DataHelper()
+
+        amounts_df = pd.DataFrame({"col_date": [datetime(2020, 1, 19)]})
+
+        # Act / Assert
+        with self.assertRaises(ValueError):
+            data_helper.add_date_info(amounts_df, "col_date", parts=["fiscal_year"])
+
+    # @patch('src.data.dataHelpers.DataHelper.get_engagement_info')
+    # @patch('src.data.dataHelpers.DataHelper._get_engagement_amounts')
+    @patch('src.data.dataHelpers.QueryBuilder.build_query')
+    @patch('src.data.dataHelpers.DatabaseConnection.execute_queries')
     def test_get_amount_table_engagements_with_engagements_ids_list(self,  mock_db_execute_queries, mock_qb_build_query):
         # Arrange
         data_helper = DataHelper()
@@ -54,12 +171,11 @@ class TestDataHelpers(unittest.TestCase):
 
         get_amount_side_effect3 = pd.DataFrame([{"col1": [1, 2, 3], "col2": ["A", "B", "C"]}])
         get_amount_side_effect4 = pd.DataFrame([{"col1": [4, 5, 6], "col2": ["D", "E", "F"]}])
-        mock_db_execute_queries.side_effect = [[get_info_side_effect1], [get_info_side_effect1],
-                                               [get_info_side_effect2], [get_info_side_effect2],
+        mock_db_execute_queries.side_effect = [[get_info_side_effect1], [get_info_side_effect2],
                                                [get_amount_side_effect3], [get_amount_side_effect4]]
 
         # Act
-        result = data_helper.get_amount_table(tenant_id="tenant_id", engagement_ids=["a", "b"])
+        result = data_helper.get_amount_table(tenant_id="tenant_id", engagement_ids=["a", "b"], batched=False)
 
         expected_result_df = pd.concat([pd.DataFrame([{"col1": [1, 2, 3], "col2": ["A", "B", "C"]}]),
                                        pd.DataFrame([{"col1": [4, 5, 6], "col2": ["D", "E", "F"]}])])
@@ -67,8 +183,307 @@ class TestDataHelpers(unittest.TestCase):
         # Assert
         pd.testing.assert_frame_equal(result, expected_result_df)
 
-    @patch('data.dataHelpers.QueryBuilder.build_query')
-    @patch('data.dataHelpers.DatabaseConnection.execute_queries')
+    @patch('src.data.dataHelpers.DatabaseConnection.execute_queries')
+    def test_get_amount_table_batched_single_round_trip_per_step(self,  mock_db_execute_queries):
+        # Arrange
+        data_helper = DataHelper()
+
+        periods_df = pd.DataFrame({"id": ["b", "a"],
+                                   "period_start": [datetime(2000, 12, 1), datetime(2019, 12, 1)],
+                                   "period_end": [datetime(2001, 11, 30), datetime(2020, 11, 30)]}).set_index("id")
+        amounts_df = pd.DataFrame({"id": [1, 2, 3],
+                                   "amount": [10, 20, 30],
+                                   "engagement_id": ["b", "a", "b"]}).set_index("id")
+        mock_db_execute_queries.side_effect = [[periods_df], [amounts_df]]
+
+        # Act
+        result = data_helper.get_amount_table(tenant_id="tenant_id", engagement_ids=["a", "b"])
+        expected_result_df = pd.DataFrame({"id": [2, 1, 3], "amount": [20, 10, 30]}).set_index("id")
+
+        # Assert
+        pd.testing.assert_frame_equal(result, expected_result_df)
+        self.assertEqual(mock_db_execute_queries.call_count, 2)
+        periods_query, periods_params = mock_db_execute_queries.call_args_list[0][0][0][0]
+        amounts_query, amounts_params = mock_db_execute_queries.call_args_list[1][0][0][0]
+        self.assertIn("WHERE id = ANY(%(engagement_ids)s)", periods_query)
+        self.assertEqual(periods_params, {"engagement_ids": '{"a","b"}'})
+        self.assertIn("unnest(%(engagement_ids)s::text[], %(period_starts)s::date[], %(period_ends)s::date[])", amounts_query.as_string(None))
+        self.assertIn("engagement_periods.engagement_id as engagement_id", amounts_query.as_string(None))
+        self.assertEqual(amounts_params, {"tenant_id": "tenant_id",
+                                          "engagement_ids": '{"a","b"}',
+                                          "period_starts": '{"2019-12-01","2000-12-01"}',
+                                          "period_ends": '{"2020-11-30","2001-11-30"}'})
+
+    @patch('src.data.dataHelpers.DatabaseConnection.execute_queries')
+    def test_get_amount_table_coalesces_overlapping_periods(self,  mock_db_execute_queries):
+        # Arrange
+        data_helper = DataHelper()
+
+        periods_df = pd.DataFrame({"id": ["restated", "original", "later", "separate"],
+                                   "period_start": [date(2020, 6, 1), date(2020, 1, 1), date(2021, 1, 1), date(2023, 1, 1)],
+                                   "period_end": [date(2020, 12, 31), date(2020, 12, 31), date(2021, 12, 31),
+                                                  date(2023, 12, 31)]}).set_index("id")
+        amounts_df = pd.DataFrame({"id": [1, 2, 3, 4],
+                                   "amount": [10, 20, 30, 40],
+                                   "transaction_date": [date(2021, 3, 1), date(2020, 7, 1), date(2020, 2, 1),
+                                                        date(2023, 5, 1)]}).set_index("id")
+        mock_db_execute_queries.side_effect = lambda queries, id_column="id": (
+            [periods_df] if "engagements" in str(queries[0][0]) else [amounts_df])
+        engagement_ids = ["original", "restated", "later", "separate"]
+
+        # Act
+        duplicated = data_helper.get_amount_table("tenant_id", engagement_ids, overlap="duplicate")
+        amounts_query, amounts_params = mock_db_execute_queries.call_args[0][0][0]
+        deduplicated = data_helper.get_amount_table("tenant_id", engagement_ids, overlap="deduplicate")
+
+        # Assert
+        self.assertEqual(amounts_params, {"tenant_id": "tenant_id",
+                                          "range_starts": '{"2020-01-01","2023-01-01"}',
+                                          "range_ends": '{"2021-12-31","2023-12-31"}'})
+        self.assertIn("AS coalesced_periods (period_start, period_end)", amounts_query.as_string(None))
+        self.assertEqual(duplicated.index.tolist(), [2, 3, 2, 1, 4])
+        self.assertEqual(duplicated["engagement_id"].tolist(), ["original", "original", "restated", "later", "separate"])
+        pd.testing.assert_frame_equal(deduplicated, amounts_df)
+        with self.assertRaises(ValueError):
+            data_helper.get_amount_table("tenant_id", engagement_ids, overlap="merge")
+
+    @patch('src.data.dataHelpers.DatabaseConnection.execute_queries')
+    def test_get_amount_table_with_schema(self,  mock_db_execute_queries):
+        # Arrange
+        data_helper = DataHelper()
+
+        amounts_df = pd.DataFrame({"id": [1, 2],
+                                   "amount": [Decimal("10.50"), Decimal("-2.25")],
+                                   "amount_type": ["debit", "credit"],
+                                   "transaction_date": [date(2020, 1, 1), date(2020, 1, 2)]}).set_index("id")
+        mock_db_execute_queries.side_effect = [[amounts_df]]
+
+        # Act
+        result = data_helper.get_amount_table("tenant_id", schema=AmountSchema(amount_type=AmountTypes.SCALED_INT))
+
+        # Assert
+        self.assertEqual(result["amount"].tolist(), [1050, -225])
+        self.assertIsInstance(result["amount_type"].dtype, pd.CategoricalDtype)
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(result["transaction_date"]))
+
+    @patch('src.data.dataHelpers.DatabaseConnection.execute_query_arrow')
+    @patch('src.data.dataHelpers.DatabaseConnection.execute_queries')
+    def test_get_amount_arrow_table(self,  mock_db_execute_queries, mock_execute_query_arrow):
+        # Arrange
+        import pyarrow as pa
+        data_helper = DataHelper()
+
+        periods_df = pd.DataFrame({"id": ["b", "a"],
+                                   "period_start": [datetime(2000, 12, 1), datetime(2019, 12, 1)],
+                                   "period_end": [datetime(2001, 11, 30), datetime(2020, 11, 30)]}).set_index("id")
+        mock_db_execute_queries.side_effect = [[periods_df]]
+        mock_execute_query_arrow.return_value = pa.table({"id": ["1", "2", "3"], "amount": [10.0, 20.0, 30.0],
+                                                          "engagement_id": ["b", "a", "b"]})
+
+        # Act
+        result = data_helper.get_amount_arrow_table("tenant_id", ["a", "b"])
+
+        # Assert
+        self.assertEqual(result.column_names, ["id", "amount"])
+        self.assertEqual(result.column("id").to_pylist(), ["2", "1", "3"])
+        self.assertEqual(mock_execute_query_arrow.call_args[0][1]["transaction_date"], pa.date32())
+
+    @patch('src.data.dataHelpers.DatabaseConnection.execute_queries')
+    def test_get_amount_table_batched_unknown_engagement(self,  mock_db_execute_queries):
+        # Arrange
+        data_helper = DataHelper()
+
+        periods_df = pd.DataFrame({"id": ["a"],
+                                   "period_start": [datetime(2019, 12, 1)],
+                                   "period_end": [datetime(2020, 11, 30)]}).set_index("id")
+        mock_db_execute_queries.side_effect = [[periods_df]]
+
+        # Act / Assert
+        with self.assertRaises(KeyError):
+            data_helper.get_amount_table(tenant_id="tenant_id", engagement_ids=["a", "b"])
+
+    @patch('src.data.dataHelpers.DatabaseConnection.execute_queries')
+    def test_get_amount_table_with_snapshots(self,  mock_db_execute_queries):
+        # Arrange
+        snapshot_directory = tempfile.TemporaryDirectory()
+        data_helper = DataHelper(snapshot_cache=SnapshotCache(snapshot_directory.name))
+
+        amounts_df = pd.DataFrame({"id": [1, 2],
+                                   "amount": [10.0, 20.0],
+                                   "transaction_external_date": [datetime(2020, 1, 1), datetime(2020, 1, 2)],
+                                   "transaction_discarded_at": [None, None]}).set_index("id")
+        changes_df = pd.DataFrame({"id": [2, 3],
+                                   "amount": [20.0, 30.0],
+                                   "transaction_external_date": [datetime(2020, 1, 2), datetime(2020, 1, 3)],
+                                   "transaction_discarded_at": [datetime(2020, 1, 4), None]}).set_index("id")
+        mock_db_execute_queries.side_effect = [[amounts_df], [changes_df], [changes_df.iloc[:0]]]
+
+        # Act
+        first_result = data_helper.get_amount_table("tenant_id", snapshot_refresh="incremental")
+        second_result = data_helper.get_amount_table("tenant_id", snapshot_refresh="incremental")
+        third_result = data_helper.get_amount_table("tenant_id", snapshot_refresh="none")
+        fourth_result = data_helper.get_amount_table("tenant_id", snapshot_refresh="incremental")
+        snapshot_directory.cleanup()
+
+        # Assert
+        pd.testing.assert_frame_equal(first_result, amounts_df)
+        self.assertEqual(second_result.index.tolist(), [1, 2, 3])
+        self.assertEqual(second_result.loc[2, "transaction_discarded_at"], datetime(2020, 1, 4))
+        self.assertEqual(third_result["amount"].tolist(), [10.0, 20.0, 30.0])
+        self.assertEqual(fourth_result.index.tolist(), [1, 2, 3])
+        self.assertEqual(mock_db_execute_queries.call_count, 3)
+        self.assertEqual(mock_db_execute_queries.call_args_list[1][0][0][0][1]["since"], "2020-01-02T00:00:00")
+        self.assertEqual(mock_db_execute_queries.call_args_list[2][0][0][0][1]["since"], "2020-01-04T00:00:00")
+
+    @patch('src.data.dataHelpers.DatabaseConnection.execute_queries')
+    def test_sync_amount_table(self,  mock_db_execute_queries):
+        # Arrange
+        data_helper = DataHelper()
+
+        amounts_df = pd.DataFrame({"id": [1, 2],
+                                   "amount": [10.0, 20.0],
+                                   "transaction_external_date": [datetime(2020, 1, 1), datetime(2020, 1, 2)],
+                                   "transaction_discarded_at": [None, None]}).set_index("id")
+        changes_df = pd.DataFrame({"id": [2, 3],
+                                   "amount": [20.0, 30.0],
+                                   "transaction_external_date": [datetime(2020, 1, 2), datetime(2020, 1, 3)],
+                                   "transaction_discarded_at": [datetime(2020, 1, 4), None]}).set_index("id")
+        mock_db_execute_queries.side_effect = [[changes_df], [changes_df.iloc[:0]]]
+
+        # Act
+        synced_df, watermark = data_helper.sync_amount_table("tenant_id", amounts_df, drop_discarded=True)
+        unchanged_df, unchanged_watermark = data_helper.sync_amount_table("tenant_id", synced_df, watermark)
+
+        # Assert
+        query, params = mock_db_execute_queries.call_args_list[0][0][0][0]
+        self.assertIn("accounting_entries.discarded_at >= %(since)s", query.as_string(None))
+        self.assertEqual(params["since"], "2020-01-02T00:00:00+00:00")
+        self.assertEqual(synced_df.index.tolist(), [1, 3])
+        self.assertEqual(watermark, "2020-01-04T00:00:00+00:00")
+        self.assertEqual(mock_db_execute_queries.call_args_list[1][0][0][0][1]["since"], "2020-01-04T00:00:00+00:00")
+        self.assertEqual(unchanged_watermark, watermark)
+        pd.testing.assert_frame_equal(unchanged_df, synced_df)
+
+    @patch('src.data.dataHelpers.DatabaseConnection.execute_queries')
+    def test_sync_amount_table_with_naive_watermark_and_tz_aware_amounts(self,  mock_db_execute_queries):
+        # Arrange
+        data_helper = DataHelper()
+
+        amounts_df = pd.DataFrame({"id": [1],
+                                   "amount": [10.0],
+                                   "transaction_external_date": [pd.Timestamp("2020-01-01 12:00", tz="UTC")],
+                                   "transaction_discarded_at": [pd.NaT]}).set_index("id")
+        changes_df = pd.DataFrame({"id": [2],
+                                   "amount": [20.0],
+                                   "transaction_external_date": [pd.Timestamp("2020-01-01 20:00", tz="America/Montreal")],
+                                   "transaction_discarded_at": [pd.NaT]}).set_index("id")
+        mock_db_execute_queries.return_value = [changes_df]
+
+        # Act
+        synced_df, watermark = data_helper.sync_amount_table("tenant_id", amounts_df, "2020-01-02")
+
+        # Assert
+        self.assertEqual(mock_db_execute_queries.call_args[0][0][0][1]["since"], "2020-01-02T00:00:00+00:00")
+        self.assertEqual(synced_df.index.tolist(), [1, 2])
+        self.assertEqual(watermark, "2020-01-02T01:00:00+00:00")
+
+    @patch('src.data.dataHelpers.DatabaseConnection.execute_queries')
+    def test_sync_amount_table_with_scaled_int_schema(self,  mock_db_execute_queries):
+        # Arrange
+        data_helper = DataHelper()
+        schema = AmountSchema(amount_type=AmountTypes.SCALED_INT)
+
+        amounts_df = schema.apply(pd.DataFrame({"id": [1, 2],
+                                                "amount": [1.0, 2.5],
+                                                "account_id": ["account_1", "account_2"],
+                                                "transaction_external_date": [datetime(2020, 1, 1), datetime(2020, 1, 2)],
+                                                "transaction_discarded_at": [None, None]}).set_index("id"))
+        changes_df = pd.DataFrame({"id": [3],
+                                   "amount": [4.0],
+                                   "account_id": ["account_3"],
+                                   "transaction_external_date": [datetime(2020, 1, 3)],
+                                   "transaction_discarded_at": [None]}).set_index("id")
+        mock_db_execute_queries.return_value = [changes_df]
+
+        # Act
+        synced_df, _ = data_helper.sync_amount_table("tenant_id", amounts_df, schema=schema)
+
+        # Assert
+        self.assertEqual(synced_df["amount"].tolist(), [100, 250, 400])
+        self.assertEqual(synced_df["amount"].dtype, "int64")
+        self.assertIsInstance(synced_df["account_id"].dtype, pd.CategoricalDtype)
+
+    @patch('src.data.dataHelpers.DatabaseConnection.execute_queries')
+    def test_sync_amount_table_for_engagements(self,  mock_db_execute_queries):
+        # Arrange
+        data_helper = DataHelper()
+
+        periods_df = pd.DataFrame({"id": ["a"], "period_start": [datetime(2020, 1, 1)],
+                                   "period_end": [datetime(2020, 12, 31)]}).set_index("id")
+        amounts_df = pd.DataFrame({"id": [1], "amount": [10.0], "transaction_external_date": [datetime(2020, 1, 1)],
+                                   "transaction_discarded_at": [None]}).set_index("id")
+        changes_df = pd.DataFrame({"id": [2], "amount": [20.0], "transaction_external_date": [datetime(2020, 1, 5)],
+                                   "transaction_discarded_at": [None], "engagement_id": ["a"]}).set_index("id")
+        mock_db_execute_queries.side_effect = [[periods_df], [changes_df]]
+
+        # Act
+        synced_df, watermark = data_helper.sync_amount_table("tenant_id", amounts_df, "2020-01-01T00:00:00", ["a"])
+
+        # Assert
+        query, params = mock_db_execute_queries.call_args_list[1][0][0][0]
+        self.assertIn("unnest(", query.as_string(None))
+        self.assertEqual(params["since"], "2020-01-01T00:00:00+00:00")
+        self.assertEqual(synced_df.index.tolist(), [1, 2])
+        self.assertNotIn("engagement_id", synced_df.columns)
+        self.assertEqual(watermark, "2020-01-05T00:00:00+00:00")
+
+    def test_get_amount_table_snapshot_requires_cache(self):
+        # Arrange
+        data_helper = DataHelper()
+
+        # Act / Assert
+        with self.assertRaises(ValueError):
+            data_helper.get_amount_table("tenant_id", snapshot_refresh="incremental")
+
+    @patch('src.data.dataHelpers.DatabaseConnection.execute_query_copy')
+    def test_get_engagement_amounts_with_copy_engine(self,  mock_db_execute_query_copy):
+        # Arrange
+        data_helper = DataHelper()
+
+        copy_df = pd.DataFrame({"id": ["id1"], "amount": [1.5]}).set_index("id")
+        mock_db_execute_query_copy.return_value = copy_df
+
+        # Act
+        result = data_helper._get_engagement_amounts(tenant_id="tenant_id", engagement_dates=None, engine="copy")
+
+        # Assert
+        pd.testing.assert_frame_equal(result, copy_df)
+        self.assertEqual(mock_db_execute_query_copy.call_args[1]["dtypes"], DataHelper.AMOUNT_COPY_DTYPES)
+        self.assertEqual(mock_db_execute_query_copy.call_args[1]["parse_dates"], DataHelper.AMOUNT_DATE_COLUMNS)
+
+    @patch('src.data.dataHelpers.DatabaseConnection.execute_query_chunks')
+    def test_iter_amount_table(self,  mock_db_execute_query_chunks):
+        # Arrange
+        data_helper = DataHelper()
+
+        first_chunk = pd.DataFrame({"id": [1, 2], "amount": [10, 20]}).set_index("id")
+        second_chunk = pd.DataFrame({"id": [3], "amount": [30]}).set_index("id")
+        mock_db_execute_query_chunks.return_value = iter([first_chunk, second_chunk])
+
+        # Act
+        result = list(data_helper.iter_amount_table(tenant_id="tenant_id", chunk_size=2))
+
+        # Assert
+        self.assertEqual(len(result), 2)
+        pd.testing.assert_frame_equal(result[0], first_chunk)
+        pd.testing.assert_frame_equal(result[1], second_chunk)
+        self.assertEqual(mock_db_execute_query_chunks.call_args[0][1], 2)
+        query, params = mock_db_execute_query_chunks.call_args[0][0]
+        self.assertIn("accounting_amounts.tenant_id = %(tenant_id)s", query.as_string(None))
+        self.assertEqual(params, {"tenant_id": "tenant_id"})
+
+    @patch('src.data.dataHelpers.QueryBuilder.build_query')
+    @patch('src.data.dataHelpers.DatabaseConnection.execute_queries')
     def test_get_amount_table_with_no_engagement_ids(self,  mock_db_execute_queries, mock_qb_build_query):
         # Arrange
         data_helper = DataHelper()
@@ -82,8 +497,8 @@ class TestDataHelpers(unittest.TestCase):
         # Assert
         pd.testing.assert_frame_equal(result, expected_result)
 
-    @ patch('data.dataHelpers.QueryBuilder.build_query')
-    @ patch('data.dataHelpers.DatabaseConnection.execute_queries')
+    @ patch('src.data.dataHelpers.QueryBuilder.build_query')
+    @ patch('src.data.dataHelpers.DatabaseConnection.execute_batch')
     def test_make_fsli_mappings(self,  mock_db_execute_queries, mock_querybuilder):
         # Arrange
         data_helper = DataHelper()
@@ -97,7 +512,7 @@ class TestDataHelpers(unittest.TestCase):
                            "reverse_fsli_id": ["reverse_fsli_id_1", "reverse_fsli_id_2", "reverse_fsli_id_3"]}
         query_fsli_df = pd.DataFrame(data=query_fsli_data, index=query_fsli_data["id"])
 
-        mock_db_execute_queries.side_effect = [[query_mapping_df], [query_fsli_df]]
+        mock_db_execute_queries.return_value = [query_mapping_df, query_fsli_df]
 
         amounts_df_data = {"col1": [1, 2, 3],
                            "account_id": ["account_id_1", "account_id_2", "account_id_3"],
@@ -116,13 +531,56 @@ class TestDataHelpers(unittest.TestCase):
         # Assert
         pd.testing.assert_frame_equal(result, expected_amounts_df)
 
-    @ patch('data.dataHelpers.QueryBuilder.build_query')
-    @ patch('data.dataHelpers.DatabaseConnection.execute_queries')
+    @ patch('src.data.dataHelpers.DatabaseConnection.execute_batch')
+    def test_make_fsli_mappings_unmapped_accounts(self,  mock_db_execute_queries):
+        # Arrange
+        data_helper = DataHelper()
+
+        query_mapping_df = pd.DataFrame({"id": ["id1"], "account_id": ["account_id_1"], "fsli_id": ["fsli_id_1"]})
+        query_fsli_df = pd.DataFrame({"reverse_fsli_id": [None]}, index=["fsli_id_1"])
+        mock_db_execute_queries.return_value = [query_mapping_df, query_fsli_df]
+
+        amounts_df = pd.DataFrame({"col1": [1, 2, 3], "account_id": ["account_id_1", "account_id_2", "account_id_1"]})
+
+        # Act
+        with self.assertRaises(KeyError) as raised:
+            data_helper.make_fsli_mappings(amounts_df.copy(), "engagement_id")
+        kept = data_helper.make_fsli_mappings(amounts_df.copy(), "engagement_id", unmapped="keep")
+        dropped = data_helper.make_fsli_mappings(amounts_df.copy(), "engagement_id", unmapped="drop")
+
+        # Assert
+        self.assertEqual(raised.exception.account_ids, ["account_id_2"])
+        self.assertEqual(kept["fsli_id"].tolist()[0], "fsli_id_1")
+        self.assertTrue(pd.isna(kept["fsli_id"].tolist()[1]))
+        self.assertEqual(dropped.index.tolist(), [0, 2])
+        self.assertEqual(dropped["fsli_id"].tolist(), ["fsli_id_1", "fsli_id_1"])
+        self.assertEqual(mock_db_execute_queries.call_count, 1)
+
+    @ patch('src.data.dataHelpers.DatabaseConnection.execute_batch')
+    def test_get_fsli_mapping_table(self,  mock_db_execute_queries):
+        # Arrange
+        data_helper = DataHelper()
+
+        query_mapping_df = pd.DataFrame({"id": ["id1", "id2"], "account_id": ["account_id_1", "account_id_2"],
+                                         "fsli_id": ["fsli_id_1", "fsli_id_unknown"]})
+        query_fsli_df = pd.DataFrame({"reverse_fsli_id": ["reverse_fsli_id_1"]}, index=["fsli_id_1"])
+        mock_db_execute_queries.return_value = [query_mapping_df, query_fsli_df]
+
+        # Act
+        result = data_helper.get_fsli_mapping_table("engagement_id")
+
+        # Assert
+        self.assertEqual(result.index.tolist(), ["account_id_1", "account_id_2"])
+        self.assertEqual(result.loc["account_id_1", "reverse_fsli_id"], "reverse_fsli_id_1")
+        self.assertTrue(pd.isna(result.loc["account_id_2", "reverse_fsli_id"]))
+
+    @ patch('src.data.dataHelpers.QueryBuilder.build_parameterized_query')
+    @ patch('src.data.dataHelpers.DatabaseConnection.execute_queries')
     def test_get_engagement_amount_query_with_no_engagement_dates(self,  mock_db_execute_queries, mock_qb_build_query):
         # Arrange
         data_helper = DataHelper()
 
-        query = ['SELECT a  FROM b JOIN c ON d']
+        query = [('SELECT a  FROM b JOIN c ON d', {"tenant_id": "tenant_id"})]
         mock_qb_build_query.side_effect = query
 
         execute_queries_data = {"col1": [1, 2, 3],
@@ -140,13 +598,13 @@ class TestDataHelpers(unittest.TestCase):
         mock_db_execute_queries.assert_has_calls(calls)
         pd.testing.assert_frame_equal(result, expected_result_return)
 
-    @ patch('data.dataHelpers.QueryBuilder.build_query')
-    @ patch('data.dataHelpers.DatabaseConnection.execute_queries')
+    @ patch('src.data.dataHelpers.QueryBuilder.build_parameterized_query')
+    @ patch('src.data.dataHelpers.DatabaseConnection.execute_queries')
     def test_get_engagement_amounts_query_with_engagment_dates_list(self,  mock_db_execute_queries, mock_qb_build_query):
         # Arrange
         data_helper = DataHelper()
 
-        query = ["SELECT a  FROM b JOIN c ON d"]
+        query = [("SELECT a  FROM b JOIN c ON d", {})]
         mock_qb_build_query.side_effect = query
 
         execute_queries_data = {"col1": [1, 2, 3],
@@ -160,12 +618,15 @@ class TestDataHelpers(unittest.TestCase):
         data_helper._get_engagement_amounts(tenant_id="tenant_id", engagement_dates=engagement_dates_list)
 
         # Assert
-        mock_db_execute_queries.assert_called_with(['SELECT a  FROM b JOIN c ON d'])
+        mock_db_execute_queries.assert_called_with([("SELECT a  FROM b JOIN c ON d", {})])
         self.assertEqual(mock_qb_build_query.call_args_list, [call(
-            ANY, ANY, ANY, ["accounting_amounts.tenant_id ='tenant_id'", "accounting_entries.date BETWEEN 'engagement_id1' AND 'engagement_id2'"])])
+            ANY, ANY, ANY, ANY, {"tenant_id": "tenant_id", "period_start": "engagement_id1", "period_end": "engagement_id2"})])
+        constraints = [constraint.as_string(None) for constraint in mock_qb_build_query.call_args[0][3]]
+        self.assertEqual(constraints, ["accounting_amounts.tenant_id = %(tenant_id)s",
+                                       "accounting_entries.date BETWEEN %(period_start)s AND %(period_end)s"])
 
-    @ patch('data.dataHelpers.QueryBuilder')
-    @ patch('data.dataHelpers.DatabaseConnection.execute_queries')
+    @ patch('src.data.dataHelpers.QueryBuilder')
+    @ patch('src.data.dataHelpers.DatabaseConnection.execute_batch')
     def test_get_flipping_id_amounts(self,  mock_db_execute_queries, mock_query_builder):
         # Arrange
         data_helper = DataHelper()
@@ -179,7 +640,7 @@ class TestDataHelpers(unittest.TestCase):
                            "reverse_fsli_id": ["reverse_fsli_id_1", None, "reverse_fsli_id_3"]}
         query_fsli_df = pd.DataFrame(data=query_fsli_data, index=query_fsli_data["id"])
 
-        mock_db_execute_queries.side_effect = [[query_mapping_df], [query_fsli_df]]
+        mock_db_execute_queries.return_value = [query_mapping_df, query_fsli_df]
 
         amounts_df_data = {"col1": [1, 2, 3],
                            "account_id": ["account_id_1", "account_id_2", "account_id_3"]}
@@ -195,7 +656,7 @@ class TestDataHelpers(unittest.TestCase):
         # Assert
         pd.testing.assert_frame_equal(result, expected_amounts_df_return)
 
-    @ patch('data.dataHelpers.DatabaseConnection.execute_queries')
+    @ patch('src.data.dataHelpers.DatabaseConnection.execute_batch')
     def test_get_mapping_dict(self,  mock_connect):
         # Arrange
         data_helper = DataHelper()
@@ -209,7 +670,7 @@ class TestDataHelpers(unittest.TestCase):
                            "reverse_fsli_id": ["reverse_fsli_id_1", "reverse_fsli_id_2", "reverse_fsli_id_3"]}
         query_fsli_df = pd.DataFrame(data=query_fsli_data, index=query_fsli_data["id"])
 
-        mock_connect.side_effect = [[query_mapping_df], [query_fsli_df]]
+        mock_connect.return_value = [query_mapping_df, query_fsli_df]
 
         # Act
         result = data_helper._get_mapping_dict("engagement_id")
@@ -220,7 +681,130 @@ class TestDataHelpers(unittest.TestCase):
         # Assert
         self.assertEqual(result, expected_mapping_dict)
 
-    @ patch('data.dataHelpers.DatabaseConnection.execute_queries')
+    @ patch('src.data.dataHelpers.DatabaseConnection.execute_queries')
+    def test_get_fsli_amount_table(self,  mock_db_execute_queries):
+        # Arrange
+        data_helper = DataHelper()
+        data_helper.reference_cache.set("engagement", "engagement_id",
+                                        {"period_start": date(2020, 1, 1), "period_end": date(2020, 12, 31)})
+
+        amounts_df = pd.DataFrame({"id": [1, 2, 3],
+                                   "account_id": ["account_id_1", "account_id_2", "account_id_3"],
+                                   "fsli_id": ["fsli_id_1", None, "fsli_id_3"],
+                                   "reverse_fsli_id": [None, None, "reverse_fsli_id_3"],
+                                   "mapped_account_id": ["account_id_1", None, "account_id_3"]}).set_index("id")
+        mock_db_execute_queries.return_value = [amounts_df]
+
+        # Act
+        with self.assertRaises(KeyError) as raised:
+            data_helper.get_fsli_amount_table("tenant_id", "engagement_id")
+        kept = data_helper.get_fsli_amount_table("tenant_id", "engagement_id", unmapped="keep")
+        kept_query, _ = mock_db_execute_queries.call_args[0][0][0]
+        data_helper.get_fsli_amount_table("tenant_id", "engagement_id", unmapped="drop")
+        dropped_query, dropped_params = mock_db_execute_queries.call_args[0][0][0]
+
+        # Assert
+        self.assertEqual(raised.exception.account_ids, ["account_id_2"])
+        self.assertEqual(kept.columns.tolist(), ["account_id", "fsli_id", "reverse_fsli_id"])
+        self.assertIn("LEFT JOIN (SELECT DISTINCT ON (account_mappings.account_id)", kept_query.as_string(None))
+        self.assertIn(" JOIN (SELECT DISTINCT ON (account_mappings.account_id)", dropped_query.as_string(None))
+        self.assertNotIn("LEFT JOIN (SELECT DISTINCT ON", dropped_query.as_string(None))
+        self.assertEqual(dropped_params, {"tenant_id": "tenant_id", "engagement_id": "engagement_id",
+                                          "period_start": "2020-01-01", "period_end": "2020-12-31"})
+
+    @ patch('src.data.dataHelpers.DatabaseConnection.execute_queries')
+    def test_get_flipping_amount_table(self,  mock_db_execute_queries):
+        # Arrange
+        data_helper = DataHelper()
+        data_helper.reference_cache.set("engagement", "engagement_id",
+                                        {"period_start": date(2020, 1, 1), "period_end": date(2020, 12, 31)})
+
+        amounts_df = pd.DataFrame({"id": [3], "account_id": ["account_id_3"], "fsli_id": ["fsli_id_3"],
+                                   "reverse_fsli_id": ["reverse_fsli_id_3"], "mapped_account_id": ["account_id_3"]}).set_index("id")
+        mock_db_execute_queries.return_value = [amounts_df]
+
+        # Act
+        result = data_helper.get_flipping_amount_table("tenant_id", "engagement_id")
+
+        # Assert
+        query, _ = mock_db_execute_queries.call_args[0][0][0]
+        self.assertIn("AND fsli_mappings.reverse_fsli_id IS NOT NULL;", query.as_string(None))
+        self.assertEqual(result.index.tolist(), [3])
+        self.assertNotIn("mapped_account_id", result.columns)
+
+    @ patch('src.data.dataHelpers.DatabaseConnection.execute_queries')
+    def test_get_account_balances(self,  mock_db_execute_queries):
+        # Arrange
+        data_helper = DataHelper()
+        data_helper.reference_cache.set("engagement", "engagement_id",
+                                        {"period_start": date(2020, 1, 1), "period_end": date(2020, 12, 31)})
+
+        balances_df = pd.DataFrame({"account_id": ["account_id_1", "account_id_1"],
+                                    "period": [date(2020, 1, 1), date(2020, 2, 1)],
+                                    "amount": [Decimal("10.50"), Decimal("-3.25")],
+                                    "amount_count": [2, 1]}).set_index("account_id")
+        mock_db_execute_queries.side_effect = lambda queries, id_column: [balances_df.copy()]
+
+        # Act
+        result = data_helper.get_account_balances("tenant_id", "engagement_id")
+        query, params = mock_db_execute_queries.call_args[0][0][0]
+        data_helper.get_account_balances("tenant_id", period=None, include_discarded=True)
+        tenant_query, tenant_params = mock_db_execute_queries.call_args[0][0][0]
+
+        # Assert
+        self.assertEqual(query.as_string(None),
+                         "SELECT accounting_amounts.account_id as account_id, "
+                         "date_trunc('month', accounting_entries.date)::date as period, "
+                         "sum(accounting_amounts.amount) AS amount, count(*) AS amount_count "
+                         "FROM accounting_amounts JOIN accounting_entries ON accounting_amounts.entry_id = accounting_entries.id "
+                         "WHERE accounting_amounts.tenant_id = %(tenant_id)s "
+                         "AND accounting_entries.date BETWEEN %(period_start)s AND %(period_end)s "
+                         "AND accounting_entries.discarded_at IS NULL "
+                         "GROUP BY accounting_amounts.account_id, date_trunc('month', accounting_entries.date)::date "
+                         "ORDER BY accounting_amounts.account_id, date_trunc('month', accounting_entries.date)::date;")
+        self.assertEqual(params["period_start"], "2020-01-01")
+        self.assertEqual(mock_db_execute_queries.call_args[1], {"id_column": "account_id"})
+        self.assertEqual(result.index.names, ["account_id", "period"])
+        self.assertEqual(result.loc[("account_id_1", pd.Timestamp(2020, 2, 1)), "amount"], -3.25)
+        self.assertEqual(result["amount"].dtype, "float64")
+        self.assertNotIn("date_trunc", tenant_query.as_string(None))
+        self.assertNotIn("discarded_at", tenant_query.as_string(None))
+        self.assertEqual(tenant_params, {"tenant_id": "tenant_id"})
+
+    @ patch('src.data.dataHelpers.DatabaseConnection.execute_queries')
+    def test_get_fsli_balances(self,  mock_db_execute_queries):
+        # Arrange
+        data_helper = DataHelper()
+        data_helper.reference_cache.set("engagement", "engagement_id",
+                                        {"period_start": date(2020, 1, 1), "period_end": date(2020, 12, 31)})
+
+        balances_df = pd.DataFrame({"fsli_id": ["fsli_id_1", None],
+                                    "period": [date(2020, 1, 1), date(2020, 1, 1)],
+                                    "amount": [Decimal("10.50"), Decimal("1.00")],
+                                    "amount_count": [2, 1],
+                                    "unmapped_account_ids": [None, ["account_id_3", "account_id_2"]]}).set_index("fsli_id")
+        mock_db_execute_queries.side_effect = lambda queries, id_column: [balances_df.copy()]
+
+        # Act
+        with self.assertRaises(KeyError) as raised:
+            data_helper.get_fsli_balances("tenant_id", "engagement_id", period=None)
+        raised_query, _ = mock_db_execute_queries.call_args[0][0][0]
+        mock_db_execute_queries.side_effect = lambda queries, id_column: [balances_df.drop(columns="unmapped_account_ids")]
+        dropped = data_helper.get_fsli_balances("tenant_id", "engagement_id", period="quarter", unmapped="drop")
+        dropped_query, _ = mock_db_execute_queries.call_args[0][0][0]
+
+        # Assert
+        self.assertEqual(raised.exception.account_ids, ["account_id_2", "account_id_3"])
+        self.assertIn("array_agg(DISTINCT accounting_amounts.account_id) FILTER (WHERE fsli_mappings.account_id IS NULL)",
+                      raised_query.as_string(None))
+        self.assertIn("LEFT JOIN (SELECT DISTINCT ON (account_mappings.account_id)", raised_query.as_string(None))
+        self.assertIn("GROUP BY fsli_mappings.fsli_id, date_trunc('quarter', accounting_entries.date)::date",
+                      dropped_query.as_string(None))
+        self.assertNotIn("LEFT JOIN (SELECT DISTINCT ON", dropped_query.as_string(None))
+        self.assertNotIn("array_agg", dropped_query.as_string(None))
+        self.assertEqual(dropped["amount_count"].tolist(), [2, 1])
+
+    @ patch('src.data.dataHelpers.DatabaseConnection.execute_queries')
     def test_get_engagement_info(self,  mock_connect):
         # Arrange
         data_helper = DataHelper()
@@ -241,7 +825,7 @@ class TestDataHelpers(unittest.TestCase):
         # Assert
         self.assertEqual(result, expected_dict_return)
 
-    @ patch('data.dataHelpers.DatabaseConnection.execute_queries')
+    @ patch('src.data.dataHelpers.DatabaseConnection.execute_queries')
     def test_get_organization_info(self,  mock_connect):
         # Arrange
         data_helper = DataHelper()
@@ -262,6 +846,112 @@ class TestDataHelpers(unittest.TestCase):
         # Assert
         self.assertEqual(result, expected_dict_return)
 
+    @ patch('src.data.dataHelpers.DatabaseConnection.execute_batch')
+    @ patch('src.data.dataHelpers.DatabaseConnection.execute_queries')
+    def test_reference_lookups_are_cached(self,  mock_connect, mock_execute_batch):
+        # Arrange
+        data_helper = DataHelper()
+
+        engagement_info_df = pd.DataFrame({"id": ["engagement_id_1"], "period_start": [datetime(2020, 1, 1)],
+                                           "period_end": [datetime(2020, 12, 31)]})
+        query_mapping_df = pd.DataFrame({"id": ["id1"], "account_id": ["account_id_1"], "fsli_id": ["fsli_id_1"]})
+        query_fsli_df = pd.DataFrame({"reverse_fsli_id": [None]}, index=["fsli_id_1"])
+        mock_connect.side_effect = [[engagement_info_df]]
+        mock_execute_batch.return_value = [query_mapping_df, query_fsli_df]
+
+        # Act
+        data_helper.get_engagement_info("engagement_id_1")
+        data_helper.get_engagement_info("engagement_id_1")
+        data_helper._get_mapping_dict("engagement_id_1")
+        data_helper._get_mapping_dict("engagement_id_1")
+        periods = data_helper.get_engagements_periods(["engagement_id_1"])
+
+        # Assert
+        self.assertEqual(mock_connect.call_count, 1)
+        self.assertEqual(mock_execute_batch.call_count, 1)
+        self.assertEqual(periods.loc["engagement_id_1", "period_start"], datetime(2020, 1, 1))
+        stats = data_helper.reference_cache.stats()
+        self.assertEqual(stats["engagement"]["misses"], 1)
+        self.assertEqual(stats["engagement"]["hits"], 2)
+        self.assertEqual(stats["fsli_mapping_table"]["hits"], 1)
+
+    @ patch('src.data.dataHelpers.DatabaseConnection.execute_batch')
+    def test_mapping_reference_tables_only_fetch_missing(self,  mock_execute_batch):
+        # Arrange
+        data_helper = DataHelper()
+
+        query_mapping_df = pd.DataFrame({"id": ["id1"], "account_id": ["account_id_1"], "fsli_id": ["fsli_id_1"]})
+        query_fsli_df = pd.DataFrame({"reverse_fsli_id": [None]}, index=["fsli_id_1"])
+        mock_execute_batch.side_effect = [[query_mapping_df, query_fsli_df], [query_mapping_df]]
+
+        # Act
+        data_helper.get_fsli_mapping_table("engagement_id_1")
+        data_helper.get_fsli_mapping_table("engagement_id_2")
+
+        # Assert
+        self.assertEqual(len(mock_execute_batch.call_args_list[0][0][0]), 2)
+        second_queries = mock_execute_batch.call_args_list[1][0][0]
+        self.assertEqual(len(second_queries), 1)
+        self.assertEqual(second_queries[0][1], {"engagement_id": "engagement_id_2"})
+
+    @ patch('src.data.dataHelpers.DatabaseConnection.execute_batch')
+    def test_get_engagement_context(self,  mock_execute_batch):
+        # Arrange
+        data_helper = DataHelper()
+
+        engagement_df = pd.DataFrame({"id": ["engagement_id_1"], "organization_id": ["organization_id_1"],
+                                      "period_start": [pd.Timestamp(2020, 1, 1)], "period_end": [pd.NaT],
+                                      "materiality": [Decimal("1234567890123456.785")]}).set_index("id")
+        organization_df = pd.DataFrame({"id": ["organization_id_1"], "financial_year_end_day": [31],
+                                        "financial_year_end_month": [12]}).set_index("id")
+        mock_execute_batch.return_value = [engagement_df, organization_df]
+
+        # Act
+        engagement_info, organization_info = data_helper.get_engagement_context("engagement_id_1")
+        cached_engagement_info = data_helper.get_engagement_info("engagement_id_1")
+        cached_organization_info = data_helper.get_organization_info("organization_id_1")
+
+        # Assert
+        mock_execute_batch.assert_called_once()
+        self.assertEqual(engagement_info, {"organization_id": "organization_id_1", "period_start": date(2020, 1, 1),
+                                           "period_end": None, "materiality": Decimal("1234567890123456.785")})
+        self.assertIs(type(engagement_info["period_start"]), date)
+        self.assertEqual(organization_info, {"financial_year_end_day": 31, "financial_year_end_month": 12})
+        self.assertEqual(cached_engagement_info, engagement_info)
+        self.assertEqual(cached_organization_info, organization_info)
+
+    @ patch('src.data.dataHelpers.DatabaseConnection.execute_queries')
+    def test_invalidate_engagement_refetches(self,  mock_connect):
+        # Arrange
+        data_helper = DataHelper()
+
+        first_info_df = pd.DataFrame({"col_2": ["col_2_value_1"]})
+        second_info_df = pd.DataFrame({"col_2": ["col_2_value_2"]})
+        mock_connect.side_effect = [[first_info_df], [second_info_df]]
+
+        # Act
+        first = data_helper.get_engagement_info("engagement_id_1")
+        data_helper.reference_cache.invalidate_engagement("engagement_id_1")
+        second = data_helper.get_engagement_info("engagement_id_1")
+
+        # Assert
+        self.assertEqual(first, {"col_2": "col_2_value_1"})
+        self.assertEqual(second, {"col_2": "col_2_value_2"})
+
+    @ patch('src.data.dataHelpers.DatabaseConnection.execute_queries')
+    def test_no_reference_cache(self,  mock_connect):
+        # Arrange
+        data_helper = DataHelper(reference_cache=NoReferenceCache())
+
+        mock_connect.return_value = [pd.DataFrame({"col_2": ["col_2_value_1"]})]
+
+        # Act
+        data_helper.get_organization_info("organization_id_1")
+        data_helper.get_organization_info("organization_id_1")
+
+        # Assert
+        self.assertEqual(mock_connect.call_count, 2)
+
     @classmethod
     def tearDownClass(cls):
         super().tearDownClass()
@@ -0,0 +1,335 @@
+import unittest
+import pandas as pd
+import psycopg2 as psg
+
+from decimal import Decimal
+
+from unittest.mock import patch, MagicMock, ANY
+
+from src.utilities.dbConnection import DatabaseConnection
+from src.utilities.queryCache import QueryResultCache
+from src.utilities.queryInstrumentation import QueryPhases, query_caller
+
+
+def make_connection(description, rows):
+    connection = MagicMock()
+    connection.closed = 0
+    cursor = connection.cursor.return_value
+    cursor.description = [(column,) for column in description]
+    cursor.fetchall.return_value = rows
+    return connection
+
+
+class TestDatabaseConnection(unittest.TestCase):
+    @patch('src.utilities.dbConnection.psg.connect')
+    def test_execute_queries_without_pool(self, mock_connect):
+        # Arrange
+        connection = make_connection(["id", "value"], [(1, "a"), (2, "b")])
+        mock_connect.return_value = connection
+        db_connection = DatabaseConnection({"host": "host"})
+
+        # Act
+        result = db_connection.execute_queries(["SELECT id, value FROM table_1;"])
+        expected_df = pd.DataFrame({"id": [1, 2], "value": ["a", "b"]}).set_index("id")
+
+        # Assert
+        pd.testing.assert_frame_equal(result[0], expected_df)
+        connection.close.assert_called_once()
+
+    @patch('src.utilities.connectionPool.psg.connect')
+    def test_execute_queries_with_pool_shares_connection(self, mock_connect):
+        # Arrange
+        connection = make_connection(["id", "value"], [(1, "a")])
+        mock_connect.return_value = connection
+        db_connection = DatabaseConnection.pooled({"host": "host"}, min_size=1, max_size=2)
+
+        # Act
+        db_connection.execute_queries(["SELECT id, value FROM table_1;"])
+        db_connection.execute_queries(["SELECT id, value FROM table_1;"])
+
+        # Assert
+        self.assertEqual(mock_connect.call_count, 1)
+        self.assertEqual(db_connection.pool.stats.checkouts, 2)
+        connection.close.assert_not_called()
+
+    @patch('src.utilities.dbConnection.psg.connect')
+    def test_execute_query_chunks_uses_named_cursor(self, mock_connect):
+        # Arrange
+        connection = make_connection(["id", "value"], [])
+        cursor = connection.cursor.return_value
+        cursor.fetchmany.side_effect = [[(1, "a"), (2, "b")], [(3, "c")], []]
+        mock_connect.return_value = connection
+        db_connection = DatabaseConnection({"host": "host"})
+
+        # Act
+        result = list(db_connection.execute_query_chunks("SELECT id, value FROM table_1;", chunk_size=2))
+        expected_first_chunk = pd.DataFrame({"id": [1, 2], "value": ["a", "b"]}).set_index("id")
+        expected_second_chunk = pd.DataFrame({"id": [3], "value": ["c"]}).set_index("id")
+
+        # Assert
+        self.assertEqual(len(result), 2)
+        pd.testing.assert_frame_equal(result[0], expected_first_chunk)
+        pd.testing.assert_frame_equal(result[1], expected_second_chunk)
+        self.assertTrue(connection.cursor.call_args[1]["name"].startswith("chunk_cursor_"))
+        cursor.fetchmany.assert_called_with(2)
+        cursor.close.assert_called_once()
+        connection.close.assert_called_once()
+
+    @patch('src.utilities.connectionPool.psg.connect')
+    def test_execute_query_chunks_returns_connection_when_abandoned(self, mock_connect):
+        # Arrange
+        connection = make_connection(["id", "value"], [])
+        connection.cursor.return_value.fetchmany.side_effect = [[(1, "a")], [(2, "b")], []]
+        mock_connect.return_value = connection
+        db_connection = DatabaseConnection.pooled({"host": "host"}, min_size=1, max_size=1)
+
+        # Act
+        chunks = db_connection.execute_query_chunks("SELECT id, value FROM table_1;", chunk_size=1)
+        next(chunks)
+        chunks.close()
+
+        # Assert
+        self.assertEqual(db_connection.pool.idle_size, 1)
+
+    @patch('src.utilities.dbConnection.psg.connect')
+    def test_execute_query_copy(self, mock_connect):
+        # Arrange
+        connection = make_connection([], [])
+        cursor = connection.cursor.return_value
+        cursor.copy_expert.side_effect = lambda query, buffer: buffer.write(
+            b'id,amount,description,date\na1,1.5,,2020-01-19\na2,-2,"NA",2020-01-20\n')
+        mock_connect.return_value = connection
+        db_connection = DatabaseConnection({"host": "host"})
+
+        # Act
+        result = db_connection.execute_query_copy("SELECT id, amount, description, date FROM table_1 ;",
+                                                  dtypes={"id": "object", "amount": "float64", "description": "object"},
+                                                  parse_dates=["date"])
+
+        # Assert
+        cursor.copy_expert.assert_called_once_with(
+            "COPY (SELECT id, amount, description, date FROM table_1) TO STDOUT WITH (FORMAT csv, HEADER true)", ANY)
+        self.assertEqual(list(result.index), ["a1", "a2"])
+        self.assertEqual(result["amount"].dtype, "float64")
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(result["date"]))
+        self.assertTrue(pd.isna(result.loc["a1", "description"]))
+        self.assertEqual(result.loc["a2", "description"], "NA")
+
+    @patch('src.utilities.dbConnection.psg.connect')
+    def test_execute_query_copy_with_spooled_buffer(self, mock_connect):
+        # Arrange
+        connection = make_connection([], [])
+        connection.cursor.return_value.copy_expert.side_effect = lambda query, buffer: buffer.write(b'id,amount\n1,2.5\n')
+        mock_connect.return_value = connection
+        db_connection = DatabaseConnection({"host": "host"})
+
+        # Act
+        result = db_connection.execute_query_copy("SELECT id, amount FROM table_1;", spool_max_size=1)
+        expected_df = pd.DataFrame({"id": [1], "amount": [2.5]}).set_index("id")
+
+        # Assert
+        pd.testing.assert_frame_equal(result, expected_df)
+
+    def test_execute_query_unknown_engine(self):
+        # Arrange
+        db_connection = DatabaseConnection({"host": "host"})
+
+        # Act / Assert
+        with self.assertRaises(ValueError):
+            db_connection.execute_query("SELECT 1;", engine="unknown")
+
+    @patch('src.utilities.dbConnection.psg.connect')
+    def test_execute_queries_with_parameters(self, mock_connect):
+        # Arrange
+        connection = make_connection(["id", "value"], [(1, "a")])
+        mock_connect.return_value = connection
+        db_connection = DatabaseConnection({"host": "host"})
+
+        # Act
+        db_connection.execute_queries([("SELECT id, value FROM table_1 WHERE id = %(id)s;", {"id": 1})])
+
+        # Assert
+        connection.cursor.return_value.execute.assert_called_once_with("SELECT id, value FROM table_1 WHERE id = %(id)s;", {"id": 1})
+
+    @patch('src.utilities.connectionPool.psg.connect')
+    def test_execute_queries_with_prepared_statements(self, mock_connect):
+        # Arrange
+        connection = make_connection(["id", "value"], [(1, "a")])
+        mock_connect.return_value = connection
+        db_connection = DatabaseConnection.pooled({"host": "host"}, prepare_statements=True)
+        query = "SELECT id, value FROM table_1 WHERE id = %(id)s;"
+
+        # Act
+        db_connection.execute_queries([(query, {"id": 1})])
+        db_connection.execute_queries([(query, {"id": 2})])
+
+        # Assert
+        executed = [executed_call[0][0] for executed_call in connection.cursor.return_value.execute.call_args_list]
+        self.assertEqual(len([statement for statement in executed if statement.startswith("PREPARE")]), 1)
+        self.assertEqual(len([statement for statement in executed if statement.startswith("EXECUTE")]), 2)
+
+    @patch('src.utilities.dbConnection.psg.connect')
+    def test_execute_queries_notifies_observers(self, mock_connect):
+        # Arrange
+        connection = make_connection(["id", "value"], [(1, "a"), (2, "b")])
+        mock_connect.return_value = connection
+        observer = MagicMock()
+        db_connection = DatabaseConnection({"host": "host"}, observers=[observer])
+
+        @query_caller
+        def load_values():
+            return db_connection.execute_queries([("SELECT id, value FROM table_1 WHERE id < %(id)s;", {"id": 3})])
+
+        # Act
+        load_values()
+        event = observer.on_query.call_args[0][0]
+
+        # Assert
+        observer.on_query.assert_called_once()
+        self.assertEqual(event.query_text, "SELECT id, value FROM table_1 WHERE id < %(id)s;")
+        self.assertEqual(event.params, {"id": 3})
+        self.assertEqual(event.rows, 2)
+        self.assertGreater(event.bytes_estimated, 0)
+        self.assertEqual(event.caller, "load_values")
+        self.assertEqual(set(event.phases), {QueryPhases.CONNECT, QueryPhases.EXECUTE, QueryPhases.FETCH, QueryPhases.DATAFRAME})
+
+    @patch('src.utilities.dbConnection.psg.connect')
+    def test_execute_query_chunks_notifies_observers_once(self, mock_connect):
+        # Arrange
+        connection = make_connection(["id", "value"], [])
+        connection.cursor.return_value.fetchmany.side_effect = [[(1, "a"), (2, "b")], [(3, "c")], []]
+        mock_connect.return_value = connection
+        observer = MagicMock()
+        db_connection = DatabaseConnection({"host": "host"})
+        db_connection.add_observer(observer)
+
+        # Act
+        list(db_connection.execute_query_chunks("SELECT id, value FROM table_1;", chunk_size=2))
+
+        # Assert
+        observer.on_query.assert_called_once()
+        self.assertEqual(observer.on_query.call_args[0][0].rows, 3)
+
+    @patch('src.utilities.dbConnection.psg.connect')
+    def test_failing_observer_does_not_break_query(self, mock_connect):
+        # Arrange
+        mock_connect.return_value = make_connection(["id", "value"], [(1, "a")])
+        observer = MagicMock()
+        observer.on_query.side_effect = RuntimeError("observer failure")
+        db_connection = DatabaseConnection({"host": "host"}, observers=[observer])
+
+        # Act
+        with self.assertLogs("src.utilities.queryInstrumentation", level="ERROR"):
+            result = db_connection.execute_queries(["SELECT id, value FROM table_1;"])
+
+        # Assert
+        self.assertEqual(len(result[0]), 1)
+
+    @patch('src.utilities.dbConnection.psg.connect')
+    def test_execute_batch_single_round_trip(self, mock_connect):
+        # Arrange
+        connection = make_connection([], [])
+        cursor = connection.cursor.return_value
+        cursor.fetchone.return_value = ('[{"id": "e1", "period_start": "2020-01-01", "materiality": 1234567890123456.785}]', "[]")
+        mock_connect.return_value = connection
+        db_connection = DatabaseConnection({"host": "host"})
+
+        # Act
+        result = db_connection.execute_batch(
+            [("SELECT id, period_start FROM engagements WHERE id = %(engagement_id)s;", {"engagement_id": "e1"}),
+             "SELECT id, name FROM accounts WHERE name LIKE 'A%';"],
+            columns=[None, ["id", "name"]], parse_dates=["period_start"])
+
+        # Assert
+        cursor.execute.assert_called_once()
+        batch_query, batch_params = cursor.execute.call_args[0]
+        self.assertEqual(batch_params, {"q0_engagement_id": "e1"})
+        self.assertIn("FROM (SELECT id, period_start FROM engagements WHERE id = %(q0_engagement_id)s) AS batch_rows", batch_query)
+        self.assertIn("FROM (SELECT id, name FROM accounts WHERE name LIKE 'A%%') AS batch_rows", batch_query)
+        self.assertEqual(result[0].loc["e1", "period_start"], pd.Timestamp(2020, 1, 1))
+        self.assertEqual(result[0].loc["e1", "materiality"], Decimal("1234567890123456.785"))
+        self.assertIn("'[]'::json)::text FROM", batch_query)
+        self.assertTrue(result[1].empty)
+        self.assertEqual(list(result[1].columns), ["name"])
+
+    @patch('src.utilities.dbConnection.psg.connect')
+    def test_execute_query_arrow(self, mock_connect):
+        # Arrange
+        import pyarrow as pa
+        connection = make_connection([], [])
+        connection.cursor.return_value.copy_expert.side_effect = lambda query, buffer: buffer.write(
+            b'id,amount,description,date\na1,1.5,"",2020-01-19\na2,,,\n')
+        mock_connect.return_value = connection
+        db_connection = DatabaseConnection({"host": "host"})
+        column_types = {"id": pa.string(), "amount": pa.float64(), "description": pa.string(), "date": pa.date32(),
+                        "missing_column": pa.string()}
+
+        # Act
+        table = db_connection.execute_query_arrow("SELECT id, amount, description, date FROM table_1;", column_types)
+        result = db_connection.execute_query("SELECT id, amount, description, date FROM table_1;", engine="arrow",
+                                             column_types=column_types)
+
+        # Assert
+        self.assertEqual(table.schema.field("date").type, pa.date32())
+        self.assertEqual(table.column("description").to_pylist(), ["", None])
+        self.assertEqual(list(result.index), ["a1", "a2"])
+        self.assertEqual(result["amount"].dtype, "float64")
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(result["date"]))
+        self.assertEqual(result.loc["a1", "description"], "")
+        self.assertTrue(pd.isna(result.loc["a2", "description"]))
+
+    @patch('src.utilities.dbConnection.psg.connect')
+    def test_execute_queries_serves_repeated_queries_from_cache(self, mock_connect):
+        # Arrange
+        connection = make_connection(["id", "value"], [(1, "a"), (2, "b")])
+        mock_connect.return_value = connection
+        db_connection = DatabaseConnection({"host": "host"}, query_cache=QueryResultCache())
+
+        # Act
+        first = db_connection.execute_queries([("SELECT id, value FROM table_1 WHERE id > %(id)s;", {"id": 0})])[0]
+        first.loc[1, "value"] = "changed"
+        second = db_connection.execute_queries([("SELECT id,   value\n FROM table_1 WHERE id > %(id)s", {"id": 0})])[0]
+        other = db_connection.execute_queries([("SELECT id, value FROM table_1 WHERE id > %(id)s;", {"id": 1})])[0]
+
+        # Assert
+        self.assertEqual(mock_connect.call_count, 2)
+        self.assertEqual(second.loc[1, "value"], "a")
+        self.assertEqual(len(other), 2)
+        self.assertEqual(db_connection.query_cache.stats.hits, 1)
+
+    @patch('src.utilities.dbConnection.psg.connect')
+    def test_execute_batch_only_fetches_uncached_queries(self, mock_connect):
+        # Arrange
+        connection = make_connection([], [])
+        cursor = connection.cursor.return_value
+        cursor.fetchone.side_effect = [('[{"id": "e1"}]', '[{"id": "o1"}]'), ('[{"id": "f1"}]',)]
+        mock_connect.return_value = connection
+        db_connection = DatabaseConnection({"host": "host"}, query_cache=QueryResultCache())
+        db_connection.execute_batch(["SELECT id FROM engagements;", "SELECT id FROM organizations;"])
+
+        # Act
+        result = db_connection.execute_batch(["SELECT id FROM organizations;", "SELECT id FROM accounting_fslis;"])
+
+        # Assert
+        self.assertEqual(cursor.execute.call_count, 2)
+        self.assertNotIn("organizations", cursor.execute.call_args[0][0])
+        self.assertEqual(list(result[0].index), ["o1"])
+        self.assertEqual(list(result[1].index), ["f1"])
+
+    @patch('src.utilities.connectionPool.psg.connect')
+    def test_routed_queries_report_their_host(self, mock_connect):
+        # Arrange
+        mock_connect.side_effect = [psg.OperationalError("replica down"), make_connection(["id"], [(1,)])]
+        observer = MagicMock()
+        db_connection = DatabaseConnection.routed({"host": "primary", "port": "5432"}, [{"host": "replica", "port": "5432"}],
+                                                  observers=[observer])
+
+        # Act
+        result = db_connection.execute_queries(["SELECT id FROM table_1;"])
+
+        # Assert
+        self.assertEqual(list(result[0].index), [1])
+        event = observer.on_query.call_args[0][0]
+        self.assertEqual(event.host, "primary:5432")
+        self.assertEqual(db_connection.router.stats["replica:5432"].failures, 1)
+        self.assertEqual(db_connection.router.stats["primary:5432"].queries, 1)
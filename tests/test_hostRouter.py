@@ -0,0 +1,134 @@
+import unittest
+
+from unittest.mock import patch, MagicMock
+
+import psycopg2 as psg
+
+from src.utilities.hostRouter import HostRouter, NoHostAvailableError, RoutingStrategies
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_connect(failing_hosts=()):
+    def connect(**kwargs):
+        if kwargs["host"] in failing_hosts:
+            raise psg.OperationalError(f"could not connect to {kwargs['host']}")
+
+        connection = MagicMock()
+        connection.closed = 0
+        connection.host = kwargs["host"]
+        return connection
+
+    return connect
+
+
+PRIMARY = {"host": "primary", "port": "5432"}
+REPLICAS = [{"host": "replica_1", "port": "5432"}, {"host": "replica_2", "port": "5432"}]
+
+
+class TestHostRouter(unittest.TestCase):
+    @patch('src.utilities.hostRouter.psg.connect')
+    def test_reads_rotate_over_replicas_and_writes_use_primary(self, mock_connect):
+        # Arrange
+        mock_connect.side_effect = make_connect()
+        router = HostRouter(PRIMARY, REPLICAS)
+
+        # Act
+        read_hosts = []
+        for _ in range(3):
+            with router.connection() as (host, connection):
+                read_hosts.append(host)
+        with router.connection(read_only=False) as (write_host, connection):
+            pass
+
+        # Assert
+        self.assertEqual(read_hosts, ["replica_1:5432", "replica_2:5432", "replica_1:5432"])
+        self.assertEqual(write_host, "primary:5432")
+        self.assertEqual(connection.host, "primary")
+
+    @patch('src.utilities.hostRouter.psg.connect')
+    def test_connection_errors_fail_over_to_next_host(self, mock_connect):
+        # Arrange
+        mock_connect.side_effect = make_connect(failing_hosts={"replica_1"})
+        clock = FakeClock()
+        router = HostRouter(PRIMARY, REPLICAS, failure_cooldown=10, clock=clock)
+
+        # Act
+        with router.connection() as (failed_over_host, _):
+            pass
+        candidates_during_cooldown = router.candidates()
+        clock.now = 10.0
+        candidates_after_cooldown = router.candidates()
+
+        # Assert
+        self.assertEqual(failed_over_host, "replica_2:5432")
+        self.assertEqual(router.stats["replica_1:5432"].failures, 1)
+        self.assertEqual(candidates_during_cooldown[-1], "replica_1:5432")
+        self.assertIn("replica_1:5432", candidates_after_cooldown[:2])
+
+    @patch('src.utilities.hostRouter.psg.connect')
+    def test_no_host_available(self, mock_connect):
+        # Arrange
+        mock_connect.side_effect = make_connect(failing_hosts={"primary", "replica_1", "replica_2"})
+        router = HostRouter(PRIMARY, REPLICAS)
+
+        # Act / Assert
+        with self.assertRaises(NoHostAvailableError):
+            with router.connection():
+                pass
+        self.assertEqual(mock_connect.call_count, 3)
+
+    @patch('src.utilities.hostRouter.psg.connect')
+    def test_query_errors_mark_host_failed_without_retry(self, mock_connect):
+        # Arrange
+        mock_connect.side_effect = make_connect()
+        router = HostRouter(PRIMARY, REPLICAS)
+
+        # Act
+        with self.assertRaises(psg.OperationalError):
+            with router.connection() as (host, connection):
+                raise psg.OperationalError("server closed the connection unexpectedly")
+
+        # Assert
+        self.assertEqual(mock_connect.call_count, 1)
+        self.assertEqual(router.stats[host].failures, 1)
+        connection.close.assert_called_once()
+
+    def test_least_latency_prefers_fastest_replica(self):
+        # Arrange
+        router = HostRouter(PRIMARY, REPLICAS, strategy=RoutingStrategies.LEAST_LATENCY, latency_smoothing=0.5)
+
+        # Act
+        router.record_latency("replica_1:5432", 0.2)
+        router.record_latency("replica_2:5432", 0.1)
+        router.record_latency("replica_2:5432", 0.5)
+
+        # Assert
+        self.assertAlmostEqual(router.stats["replica_2:5432"].latency, 0.3)
+        self.assertEqual(router.candidates(), ["replica_1:5432", "replica_2:5432", "primary:5432"])
+
+    @patch('src.utilities.connectionPool.psg.connect')
+    def test_pooled_hosts_reuse_connections(self, mock_connect):
+        # Arrange
+        mock_connect.side_effect = make_connect()
+        router = HostRouter(PRIMARY, REPLICAS[:1], pool_options={"min_size": 1, "max_size": 2})
+
+        # Act
+        for _ in range(3):
+            with router.connection() as (host, connection):
+                pass
+
+        # Assert
+        self.assertEqual(mock_connect.call_count, 1)
+        self.assertEqual(router.pools["replica_1:5432"].stats.checkouts, 3)
+
+    def test_unknown_strategy(self):
+        # Act / Assert
+        with self.assertRaises(ValueError):
+            HostRouter(PRIMARY, REPLICAS, strategy="random")
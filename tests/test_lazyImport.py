@@ -0,0 +1,50 @@
+import json
+import os
+import subprocess
+import sys
+import unittest
+from unittest.mock import patch
+
+from src.utilities.lazyImport import lazy_import
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+class TestLazyImport(unittest.TestCase):
+    def test_module_is_imported_on_first_attribute_access(self):
+        # Arrange
+        json_module = lazy_import("json")
+
+        # Act
+        dumped = json_module.dumps({"key": 1})
+
+        # Assert
+        self.assertEqual(dumped, '{"key": 1}')
+        self.assertIn("loaded", repr(json_module))
+        self.assertNotIn("not loaded", repr(json_module))
+
+    def test_patching_through_the_proxy_patches_the_module(self):
+        # Arrange
+        json_module = lazy_import("json")
+
+        # Act
+        with patch.object(json_module, "dumps", return_value="patched"):
+            patched = json.dumps({})
+        restored = json.dumps({})
+
+        # Assert
+        self.assertEqual(patched, "patched")
+        self.assertEqual(restored, "{}")
+
+    def test_data_package_import_does_not_load_pandas(self):
+        # Arrange
+        code = ("import json, sys\n"
+                "import src.data.dataHelpers, src.data.batchExtraction, src.data.asyncDataHelpers\n"
+                "print(json.dumps(sorted(name for name in ('pandas', 'numpy', 'pyarrow') if name in sys.modules)))")
+
+        # Act
+        output = subprocess.check_output([sys.executable, "-c", code], cwd=REPO_ROOT)
+
+        # Assert
+        self.assertEqual(json.loads(output), [])
+
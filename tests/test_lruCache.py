@@ -0,0 +1,94 @@
+import unittest
+
+from src.utilities.lruCache import LRUCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestLRUCache(unittest.TestCase):
+    def test_get_counts_hits_and_misses(self):
+        # Arrange
+        cache = LRUCache(max_size=2)
+        cache.set("key_1", "value_1")
+
+        # Act
+        hit = cache.get("key_1")
+        miss = cache.get("key_2")
+
+        # Assert
+        self.assertEqual(hit, "value_1")
+        self.assertIsNone(miss)
+        self.assertEqual(cache.stats.hits, 1)
+        self.assertEqual(cache.stats.misses, 1)
+
+    def test_least_recently_used_is_evicted(self):
+        # Arrange
+        cache = LRUCache(max_size=2)
+        cache.set("key_1", "value_1")
+        cache.set("key_2", "value_2")
+        cache.get("key_1")
+
+        # Act
+        cache.set("key_3", "value_3")
+
+        # Assert
+        self.assertIn("key_1", cache)
+        self.assertNotIn("key_2", cache)
+        self.assertIn("key_3", cache)
+        self.assertEqual(cache.stats.evictions, 1)
+
+    def test_entries_expire_after_ttl(self):
+        # Arrange
+        clock = FakeClock()
+        cache = LRUCache(max_size=2, ttl=10, clock=clock)
+        cache.set("key_1", "value_1")
+
+        # Act
+        clock.now = 9
+        before_expiration = cache.get("key_1")
+        clock.now = 10
+        after_expiration = cache.get("key_1")
+
+        # Assert
+        self.assertEqual(before_expiration, "value_1")
+        self.assertIsNone(after_expiration)
+        self.assertEqual(cache.stats.expirations, 1)
+
+    def test_get_or_load_calls_loader_once(self):
+        # Arrange
+        cache = LRUCache(max_size=2)
+        calls = []
+
+        def loader():
+            calls.append(1)
+            return "value"
+
+        # Act
+        first = cache.get_or_load("key", loader)
+        second = cache.get_or_load("key", loader)
+
+        # Assert
+        self.assertEqual((first, second), ("value", "value"))
+        self.assertEqual(len(calls), 1)
+
+    def test_invalidate(self):
+        # Arrange
+        cache = LRUCache(max_size=4)
+        cache.set(("a", 1), 1)
+        cache.set(("a", 2), 2)
+        cache.set(("b", 1), 3)
+
+        # Act
+        removed_one = cache.invalidate(("b", 1))
+        removed_where = cache.invalidate_where(lambda key: key[0] == "a")
+
+        # Assert
+        self.assertTrue(removed_one)
+        self.assertEqual(removed_where, 2)
+        self.assertEqual(len(cache), 0)
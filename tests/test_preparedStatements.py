@@ -0,0 +1,63 @@
+import unittest
+
+from unittest.mock import MagicMock, call
+
+from psycopg2 import sql
+
+from src.utilities.preparedStatements import PreparedStatementCache
+
+
+class Connection:
+    pass
+
+
+class TestPreparedStatementCache(unittest.TestCase):
+    def test_statement_is_prepared_once_per_connection(self):
+        # Arrange
+        cache = PreparedStatementCache()
+        connection = Connection()
+        cursor = MagicMock()
+        query = "SELECT * FROM table_1 WHERE tenant_id = %(tenant_id)s AND name LIKE 'a%%' AND other = %(tenant_id)s;"
+
+        # Act
+        cache.execute(connection, cursor, query, {"tenant_id": "tenant_1"})
+        cache.execute(connection, cursor, query, {"tenant_id": "tenant_2"})
+
+        # Assert
+        name = cursor.execute.call_args_list[0][0][0].split(" ")[1]
+        self.assertEqual(cursor.execute.call_args_list, [
+            call(f"PREPARE {name} AS SELECT * FROM table_1 WHERE tenant_id = $1 AND name LIKE 'a%' AND other = $1;"),
+            call(f"EXECUTE {name} (%s);", ["tenant_1"]),
+            call(f"EXECUTE {name} (%s);", ["tenant_2"])])
+        self.assertEqual(cache.stats.prepares, 1)
+        self.assertEqual(cache.stats.executions, 2)
+
+    def test_composed_query_and_new_connection(self):
+        # Arrange
+        cache = PreparedStatementCache()
+        cursor = MagicMock()
+        query = sql.SQL("SELECT * FROM table_1 WHERE a = {} AND b = {};").format(sql.Placeholder("a"), sql.Placeholder("b"))
+
+        # Act
+        cache.execute(Connection(), cursor, query, {"a": 1, "b": 2})
+        cache.execute(Connection(), cursor, query, {"a": 1, "b": 2})
+
+        # Assert
+        self.assertEqual(cache.stats.prepares, 2)
+        self.assertTrue(cursor.execute.call_args_list[0][0][0].endswith("AS SELECT * FROM table_1 WHERE a = $1 AND b = $2;"))
+        self.assertEqual(cursor.execute.call_args_list[1][0][1], [1, 2])
+
+    def test_oldest_statement_is_deallocated(self):
+        # Arrange
+        cache = PreparedStatementCache(max_statements_per_connection=1)
+        connection = Connection()
+        cursor = MagicMock()
+
+        # Act
+        cache.execute(connection, cursor, "SELECT 1 WHERE %(a)s;", {"a": True})
+        cache.execute(connection, cursor, "SELECT 2 WHERE %(a)s;", {"a": True})
+
+        # Assert
+        first_name = cursor.execute.call_args_list[0][0][0].split(" ")[1]
+        self.assertIn(call(f"DEALLOCATE {first_name};"), cursor.execute.call_args_list)
+        self.assertEqual(cache.stats.deallocations, 1)
@@ -3,7 +3,7 @@ import os
 
 from unittest import mock
 
-from src.data.queryBuilder import QueryBuilder
+from src.data.queryBuilder import AggregateFunctions, DatePrecisions, QueryBuilder
 
 
 class TestQueryBuilder(unittest.TestCase):
@@ -182,8 +182,100 @@ class TestQueryBuilder(unittest.TestCase):
 
     # endregion
 
+    # region PARAMETERS
+    def test_build_parameterized_query(self):
+        # Arrange
+        query_builder = QueryBuilder()
+        selects = ["statement_1"]
+        table = "table_1"
+        joins = [("table_join_1", "table_1.value = statement_1")]
+        constraints = [QueryBuilder.equals("table_1.tenant_id", "tenant_id"),
+                       QueryBuilder.between("table_1.date", "start", "end"),
+                       QueryBuilder.in_array("table_1.id", "ids"),
+                       "constraint_1 = something"]
+        params = {"tenant_id": "tenant", "start": "2020-01-01", "end": "2020-12-31", "ids": "{1,2}"}
+        # Act
+        query, result_params = query_builder.build_parameterized_query(selects, table, joins, constraints, params)
+        expected_query = ("SELECT statement_1 FROM table_1 JOIN table_join_1 ON table_1.value = statement_1 "
+                          "WHERE table_1.tenant_id = %(tenant_id)s AND table_1.date BETWEEN %(start)s AND %(end)s "
+                          "AND table_1.id = ANY(%(ids)s) AND constraint_1 = something;")
+        # Assert
+        self.assertEqual(query.as_string(None), expected_query)
+        self.assertEqual(result_params, params)
+
+    def test_build_parameterized_query_shape_is_independent_of_values(self):
+        # Arrange
+        query_builder = QueryBuilder()
+        constraints = [QueryBuilder.equals("table_1.tenant_id", "tenant_id")]
+        # Act
+        first_query, _ = query_builder.build_parameterized_query(None, "table_1", None, constraints, {"tenant_id": "a"})
+        second_query, _ = query_builder.build_parameterized_query(None, "table_1", None, constraints, {"tenant_id": "b"})
+        # Assert
+        self.assertEqual(first_query.as_string(None), second_query.as_string(None))
+
+    def test_build_parameterized_query_with_left_join_subquery(self):
+        # Arrange
+        query_builder = QueryBuilder()
+        subquery = query_builder.build_subquery(["table_2.key", "table_2.value"], "table_2", None,
+                                                [QueryBuilder.equals("table_2.owner", "owner")], "sub",
+                                                order_by=["table_2.key"])
+        joins = [("table_join_1", "table_1.value = table_join_1.id"),
+                 QueryBuilder.left_join(subquery, "table_1.key = sub.key")]
+        # Act
+        query, result_params = query_builder.build_parameterized_query(["table_1.id", "sub.value"], "table_1", joins,
+                                                                       None, {"owner": "owner_1"})
+        expected_query = ("SELECT table_1.id, sub.value FROM table_1 JOIN table_join_1 ON table_1.value = table_join_1.id "
+                          "LEFT JOIN (SELECT table_2.key, table_2.value FROM table_2 WHERE table_2.owner = %(owner)s "
+                          "ORDER BY table_2.key) AS sub ON table_1.key = sub.key;")
+        # Assert
+        self.assertEqual(query.as_string(None), expected_query)
+        self.assertEqual(result_params, {"owner": "owner_1"})
+
+    def test_build_query_with_left_join(self):
+        # Arrange
+        query_builder = QueryBuilder()
+        # Act
+        result = query_builder.build_query(None, "table_1", [QueryBuilder.left_join("table_2", "table_1.id = table_2.id")], None)
+        # Assert
+        self.assertEqual(result, "SELECT * FROM table_1 LEFT JOIN table_2 ON table_1.id = table_2.id ;")
+
+    def test_array_parameter(self):
+        # Act
+        result = QueryBuilder.array_parameter(["a", 'b"c', "d\\e"])
+        # Assert
+        self.assertEqual(result, '{"a","b\\"c","d\\\\e"}')
+
+    # endregion
+
     @classmethod
     def tearDownClass(cls):
         super().tearDownClass()
 
         cls.env_patcher.stop()
+
+    def test_build_parameterized_query_with_group_by(self):
+        # Arrange
+        query_builder = QueryBuilder()
+        period = QueryBuilder.date_trunc(DatePrecisions.YEAR, "entries.date")
+
+        # Act
+        query, _ = query_builder.build_parameterized_query(
+            ["amounts.account_id", f"{period} as period", QueryBuilder.aggregate(AggregateFunctions.SUM, "amounts.amount", "amount")],
+            "amounts", [("entries", "amounts.entry_id = entries.id")], None, group_by=["amounts.account_id", period])
+
+        # Assert
+        self.assertEqual(query.as_string(None),
+                         "SELECT amounts.account_id, date_trunc('year', entries.date)::date as period, "
+                         "sum(amounts.amount) AS amount FROM amounts JOIN entries ON amounts.entry_id = entries.id "
+                         "GROUP BY amounts.account_id, date_trunc('year', entries.date)::date;")
+
+    def test_aggregate_and_date_trunc_reject_unknown_names(self):
+        # Act
+        with self.assertRaises(ValueError):
+            QueryBuilder.aggregate("drop table", "amount", "amount")
+        with self.assertRaises(ValueError):
+            QueryBuilder.date_trunc("fortnight", "date")
+        counted = QueryBuilder.aggregate(AggregateFunctions.COUNT, "account_id", "accounts", distinct=True, where="amount > 0")
+
+        # Assert
+        self.assertEqual(counted, "count(DISTINCT account_id) FILTER (WHERE amount > 0) AS accounts")
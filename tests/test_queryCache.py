@@ -0,0 +1,109 @@
+import unittest
+
+import pandas as pd
+from psycopg2 import sql
+
+from src.utilities.queryCache import QueryResultCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_frame(rows):
+    return pd.DataFrame({"id": range(rows), "amount": [1.0] * rows}).set_index("id")
+
+
+class TestQueryResultCache(unittest.TestCase):
+    def test_equivalent_queries_share_a_key(self):
+        # Arrange
+        cache = QueryResultCache()
+        composed_query = sql.SQL("SELECT {} FROM {} WHERE {} = {}").format(
+            sql.Identifier("accounting_amounts", "id"), sql.Identifier("accounting_amounts"),
+            sql.Identifier("accounting_amounts", "tenant_id"), sql.Placeholder("tenant_id"))
+
+        # Act
+        text_key = cache.make_key("fetchall", ("SELECT id FROM t WHERE name = 'a  b' ;", {"b": 2, "a": 1}))
+        spaced_key = cache.make_key("fetchall", ("SELECT id\n  FROM t   WHERE name = 'a  b'", {"a": 1, "b": 2}))
+        literal_key = cache.make_key("fetchall", ("SELECT id FROM t WHERE name = 'a b'", {"a": 1, "b": 2}))
+        composed_key = cache.make_key("fetchall", (composed_query, {"tenant_id": "t1"}))
+
+        # Assert
+        self.assertEqual(text_key, spaced_key)
+        self.assertNotEqual(text_key, literal_key)
+        self.assertEqual(composed_key[1], 'SELECT "accounting_amounts"."id" FROM "accounting_amounts" '
+                                          'WHERE "accounting_amounts"."tenant_id" = %(tenant_id)s')
+
+    def test_get_returns_defensive_copies(self):
+        # Arrange
+        cache = QueryResultCache()
+        key = cache.make_key("fetchall", "SELECT id, amount FROM accounting_amounts")
+        returned = cache.set(key, make_frame(2))
+
+        # Act
+        returned.loc[0, "amount"] = 5.0
+        cached = cache.get(key)
+        cached.loc[1, "amount"] = 5.0
+
+        # Assert
+        self.assertEqual(cache.get(key)["amount"].tolist(), [1.0, 1.0])
+
+    def test_entries_expire_after_ttl(self):
+        # Arrange
+        clock = FakeClock()
+        cache = QueryResultCache(ttl=10, clock=clock)
+        key = cache.make_key("fetchall", "SELECT id FROM engagements")
+        cache.set(key, make_frame(1))
+
+        # Act
+        clock.now = 10.0
+        result = cache.get(key)
+
+        # Assert
+        self.assertIsNone(result)
+        self.assertEqual(cache.stats.expirations, 1)
+        self.assertEqual(cache.size_bytes, 0)
+
+    def test_least_recently_used_entries_are_evicted_by_size(self):
+        # Arrange
+        frame_bytes = int(make_frame(100).memory_usage(index=True, deep=True).sum())
+        cache = QueryResultCache(max_bytes=frame_bytes * 2)
+        keys = [cache.make_key("fetchall", f"SELECT id FROM table_{index}") for index in range(3)]
+        cache.set(keys[0], make_frame(100))
+        cache.set(keys[1], make_frame(100))
+        cache.get(keys[0])
+
+        # Act
+        cache.set(keys[2], make_frame(100))
+        cache.set(cache.make_key("fetchall", "SELECT id FROM too_large"), make_frame(1000))
+
+        # Assert
+        self.assertIsNotNone(cache.get(keys[0]))
+        self.assertIsNone(cache.get(keys[1]))
+        self.assertIsNotNone(cache.get(keys[2]))
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.stats.evictions, 1)
+
+    def test_invalidate_table_drops_dependent_entries(self):
+        # Arrange
+        cache = QueryResultCache()
+        amounts_key = cache.make_key("fetchall", sql.SQL("SELECT id FROM {} JOIN public.accounting_entries ON true").format(
+            sql.Identifier("accounting_amounts")))
+        entries_key = cache.make_key("fetchall", "SELECT id FROM public.accounting_entries")
+        fslis_key = cache.make_key("fetchall", "SELECT id FROM accounting_fslis")
+        for key in (amounts_key, entries_key, fslis_key):
+            cache.set(key, make_frame(1))
+
+        # Act
+        removed = cache.invalidate_table("accounting_entries")
+        removed_amounts = cache.invalidate_table("ACCOUNTING_AMOUNTS")
+
+        # Assert
+        self.assertEqual(removed, 2)
+        self.assertEqual(removed_amounts, 0)
+        self.assertIsNotNone(cache.get(fslis_key))
+        self.assertEqual(len(cache), 1)
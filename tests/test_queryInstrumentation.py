@@ -0,0 +1,98 @@
+import unittest
+
+from unittest.mock import MagicMock
+
+from src.utilities.queryInstrumentation import (HistogramCollector, QueryEvent, QueryObserver, SlowQueryLog,
+                                                caller_context, current_call_path, query_caller)
+
+
+def make_event(caller="get_amount_table", execute=0.02, fetch=0.01, rows=10):
+    return QueryEvent("SELECT 1;", None, {"execute": execute, "fetch": fetch}, rows, 100, (caller,))
+
+
+class TestQueryObserver(unittest.TestCase):
+    def test_observer_without_on_query_fails_on_creation(self):
+        # Arrange
+        class IncompleteObserver(QueryObserver):
+            pass
+
+        # Act / Assert
+        with self.assertRaises(TypeError):
+            IncompleteObserver()
+
+
+class TestHistogramCollector(unittest.TestCase):
+    def test_records_phases_per_caller(self):
+        # Arrange
+        collector = HistogramCollector(bounds=[0.01, 0.1, 1.0])
+
+        # Act
+        collector.on_query(make_event(execute=0.02))
+        collector.on_query(make_event(execute=0.5))
+        collector.on_query(make_event(caller="get_engagement_info", execute=0.005))
+        snapshot = collector.snapshot()
+
+        # Assert
+        self.assertEqual(snapshot[("get_amount_table", "execute")]["count"], 2)
+        self.assertEqual(snapshot[("get_amount_table", "execute")]["buckets"], [0, 1, 1, 0])
+        self.assertEqual(snapshot[("get_amount_table", "total")]["rows"], 20)
+        self.assertEqual(snapshot[("get_engagement_info", "execute")]["buckets"], [1, 0, 0, 0])
+
+    def test_quantile(self):
+        # Arrange
+        collector = HistogramCollector(bounds=[0.01, 0.1, 1.0])
+        for duration in [0.005, 0.005, 0.05, 2.0]:
+            collector.on_query(make_event(execute=duration))
+
+        # Act / Assert
+        self.assertEqual(collector.quantile("get_amount_table", "execute", 0.5), 0.01)
+        self.assertEqual(collector.quantile("get_amount_table", "execute", 0.75), 0.1)
+        self.assertEqual(collector.quantile("get_amount_table", "execute", 1.0), 2.0)
+        self.assertIsNone(collector.quantile("unknown", "execute", 0.5))
+
+
+class TestSlowQueryLog(unittest.TestCase):
+    def test_only_logs_queries_above_threshold(self):
+        # Arrange
+        log = MagicMock()
+        slow_query_log = SlowQueryLog(threshold_seconds=0.1, max_entries=1, log=log)
+
+        # Act
+        slow_query_log.on_query(make_event(execute=0.01))
+        slow_query_log.on_query(make_event(execute=0.2))
+        slow_query_log.on_query(make_event(caller="get_engagement_info", execute=0.3))
+
+        # Assert
+        self.assertEqual(log.warning.call_count, 2)
+        self.assertEqual(len(slow_query_log.entries), 1)
+        self.assertEqual(slow_query_log.entries[0]["caller"], "get_engagement_info")
+
+
+class TestCallerContext(unittest.TestCase):
+    def test_nested_callers(self):
+        # Arrange
+        @query_caller
+        def inner():
+            return current_call_path()
+
+        @query_caller
+        def outer():
+            return inner()
+
+        # Act / Assert
+        self.assertEqual(outer(), ("outer", "inner"))
+        self.assertEqual(current_call_path(), ())
+
+    def test_generator_caller_only_active_while_running(self):
+        # Arrange
+        @query_caller
+        def chunks():
+            yield current_call_path()
+            yield current_call_path()
+
+        # Act
+        with caller_context("consumer"):
+            paths = [(path, current_call_path()) for path in chunks()]
+
+        # Assert
+        self.assertEqual(paths, [(("consumer", "chunks"), ("consumer",))] * 2)
@@ -0,0 +1,90 @@
+import os
+import tempfile
+import unittest
+import pandas as pd
+
+from datetime import date
+from decimal import Decimal
+
+from src.utilities.snapshotCache import SnapshotCache
+
+
+def make_amounts(ids):
+    return pd.DataFrame({"id": ids,
+                         "amount": [Decimal("1.50")] * len(ids),
+                         "account_id": ["account_1"] * len(ids),
+                         "transaction_date": [date(2020, 1, 19)] * len(ids)}).set_index("id")
+
+
+class TestSnapshotCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_put_and_get_round_trip(self):
+        for file_format in ["feather", "parquet"]:
+            # Arrange
+            snapshot_cache = SnapshotCache(os.path.join(self.directory.name, file_format), file_format=file_format)
+            amounts_df = make_amounts(["a1", "a2"])
+
+            # Act
+            snapshot_cache.put(["tenant", ["2020-01-01", "2020-12-31"], "shape"], amounts_df, {"watermark": "2020-02-01"})
+            result_df, metadata = snapshot_cache.get(["tenant", ["2020-01-01", "2020-12-31"], "shape"])
+
+            # Assert
+            pd.testing.assert_frame_equal(result_df, amounts_df)
+            self.assertEqual(metadata, {"watermark": "2020-02-01"})
+            self.assertEqual(snapshot_cache.stats.hits, 1)
+
+    def test_get_missing_key(self):
+        # Arrange
+        snapshot_cache = SnapshotCache(self.directory.name)
+
+        # Act
+        result = snapshot_cache.get(["tenant", None, "shape"])
+
+        # Assert
+        self.assertIsNone(result)
+        self.assertEqual(snapshot_cache.stats.misses, 1)
+
+    def test_index_is_persisted(self):
+        # Arrange
+        SnapshotCache(self.directory.name).put(["tenant", None, "shape"], make_amounts(["a1"]))
+
+        # Act
+        result = SnapshotCache(self.directory.name).get(["tenant", None, "shape"])
+
+        # Assert
+        self.assertIsNotNone(result)
+
+    def test_least_recently_used_snapshot_is_evicted(self):
+        # Arrange
+        snapshot_cache = SnapshotCache(self.directory.name)
+        snapshot_cache.put(["tenant_1"], make_amounts(["a1"]))
+        snapshot_cache.max_bytes = snapshot_cache.size_bytes * 2
+        snapshot_cache.put(["tenant_2"], make_amounts(["a1"]))
+        snapshot_cache.get(["tenant_1"])
+
+        # Act
+        snapshot_cache.put(["tenant_3"], make_amounts(["a1"]))
+
+        # Assert
+        self.assertIsNotNone(snapshot_cache.get(["tenant_1"]))
+        self.assertIsNone(snapshot_cache.get(["tenant_2"]))
+        self.assertIsNotNone(snapshot_cache.get(["tenant_3"]))
+        self.assertEqual(snapshot_cache.stats.evictions, 1)
+        self.assertEqual(len([name for name in os.listdir(self.directory.name) if name.endswith(".feather")]), 2)
+
+    def test_invalidate(self):
+        # Arrange
+        snapshot_cache = SnapshotCache(self.directory.name)
+        snapshot_cache.put(["tenant_1"], make_amounts(["a1"]))
+
+        # Act
+        removed = snapshot_cache.invalidate(["tenant_1"])
+
+        # Assert
+        self.assertTrue(removed)
+        self.assertIsNone(snapshot_cache.get(["tenant_1"]))